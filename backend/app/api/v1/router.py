@@ -7,6 +7,10 @@ from app.domains.auth.api import router as auth_router
 from app.domains.user.api import router as user_router
 from app.domains.proposal.api import router as proposal_router
 from app.domains.case.api import router as case_router  # 新增
+from app.domains.document.api import router as document_router
+from app.domains.export.api import router as export_router
+from app.domains.counters.api import router as counters_router
+from app.domains.ops.api import router as ops_router
 
 # 建立主路由
 api_router = APIRouter()
@@ -15,4 +19,8 @@ api_router = APIRouter()
 api_router.include_router(auth_router)
 api_router.include_router(user_router) 
 api_router.include_router(proposal_router)
-api_router.include_router(case_router)  # 新增 case 路由
\ No newline at end of file
+api_router.include_router(case_router)  # 新增 case 路由
+api_router.include_router(document_router)
+api_router.include_router(export_router)
+api_router.include_router(counters_router)
+api_router.include_router(ops_router)
\ No newline at end of file
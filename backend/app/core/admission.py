@@ -0,0 +1,150 @@
+# app/core/admission.py - 准入控制與限流
+
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+
+from .config import settings
+from .database import pool_monitor
+
+
+def overloaded_response(detail: str = "服務繁忙，請稍後再試") -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": detail},
+        headers={"Retry-After": str(settings.OVERLOAD_RETRY_AFTER_SECONDS)}
+    )
+
+
+class AdmissionControlMiddleware:
+    """全域准入控制：同時處理的請求過多或 MongoDB 連線池排隊過長時直接回 503"""
+
+    # 健康檢查不受限制
+    exempt_paths = ("/health",)
+
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        if (
+            self.in_flight >= settings.MAX_IN_FLIGHT_REQUESTS
+            or pool_monitor.waiting > settings.POOL_WAIT_QUEUE_THRESHOLD
+        ):
+            self.rejected += 1
+            await overloaded_response()(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+# === 每個路由的同時處理上限 ===
+
+_route_slots: Dict[str, int] = {}
+
+
+def concurrency_limit(name: str, limit: int):
+    """路由依賴：同一路由同時處理超過 limit 個請求時回 503 (不排隊)"""
+    async def dependency():
+        in_use = _route_slots.get(name, 0)
+        if in_use >= limit:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="服務繁忙，請稍後再試",
+                headers={"Retry-After": str(settings.OVERLOAD_RETRY_AFTER_SECONDS)}
+            )
+        _route_slots[name] = in_use + 1
+        try:
+            yield
+        finally:
+            _route_slots[name] -= 1
+    return dependency
+
+
+# === Token bucket 限流 ===
+
+class TokenBucketLimiter:
+    """每個 key 一個 token bucket (worker 內計數，整體上限為 worker 數 × rate)"""
+
+    max_keys = 50000
+
+    def __init__(self, rate_per_minute: int, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def acquire(self, key: str) -> Optional[float]:
+        """取得一個 token；不足時回傳需要等待的秒數"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+        self._buckets[key] = (tokens - 1, now)
+        if len(self._buckets) > self.max_keys:
+            self._prune(now)
+        return None
+
+    def _prune(self, now: float):
+        """移除已經補滿的 bucket，控制記憶體用量"""
+        full_after = self.burst / self.rate
+        self._buckets = {
+            key: value for key, value in self._buckets.items()
+            if now - value[1] < full_after
+        }
+
+
+def by_client_ip(request: Request) -> str:
+    """未登入路由的限流 key"""
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(name: str, rate_per_minute: int, burst: int, key_func: Optional[Callable] = None):
+    """路由依賴：超過速率時回 429
+
+    key_func 預設以用戶 ID 為 key (需要登入)；未登入的路由傳入 by_client_ip。
+    """
+    limiter = TokenBucketLimiter(rate_per_minute, burst)
+
+    if key_func is None:
+        from app.domains.auth.deps import get_current_active_user
+
+        async def dependency(current_user=Depends(get_current_active_user)):
+            _check(limiter, f"{name}:{current_user.id}")
+    else:
+        async def dependency(request: Request):
+            _check(limiter, f"{name}:{key_func(request)}")
+
+    return dependency
+
+
+def _check(limiter: TokenBucketLimiter, key: str):
+    retry_after = limiter.acquire(key)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="請求過於頻繁，請稍後再試",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+        )
+
+
+# 常用的限制組合
+def list_endpoint_limits(name: str):
+    """列表類路由：每用戶限流 + 路由同時處理上限"""
+    return [
+        Depends(rate_limit(name, settings.LIST_RATE_PER_MINUTE, settings.LIST_RATE_BURST)),
+        Depends(concurrency_limit(name, settings.LIST_CONCURRENCY_LIMIT)),
+    ]
@@ -0,0 +1,129 @@
+# app/core/cache_bus.py - 跨 worker 快取失效
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Type
+
+from beanie import Document
+from pymongo.errors import OperationFailure, PyMongoError
+
+from .config import settings
+from .database import db
+
+logger = logging.getLogger(__name__)
+
+# standalone mongod 不支援 change stream 的錯誤碼
+_CHANGE_STREAM_UNSUPPORTED = {40573, 40324}
+
+# 處理函式收到文件 ID；None 表示該模型的快取都要清掉
+InvalidationHandler = Callable[[Optional[str]], None]
+
+
+class CacheInvalidationBus:
+    """以 MongoDB change stream (standalone 時改為輪詢 updated_at) 通知各 worker 失效快取
+
+    users / proposals / cases 的快取都透過這裡訂閱；只監聽有訂閱的模型。
+    """
+
+    def __init__(self):
+        self._handlers: Dict[Type[Document], List[InvalidationHandler]] = defaultdict(list)
+        self._collections: Dict[str, Type[Document]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+        self.mode: Optional[str] = None  # change_stream 或 polling
+        self.events = 0
+
+    def subscribe(self, model: Type[Document], handler: InvalidationHandler):
+        """註冊快取失效處理函式 (模型需有 updated_at 欄位才能在輪詢模式下運作)"""
+        self._handlers[model].append(handler)
+
+    def invalidate(self, model: Type[Document], doc_id: Optional[str] = None):
+        """在本 worker 內立即失效 (寫入方自己不必等 change stream)"""
+        self.events += 1
+        for handler in self._handlers.get(model, ()):
+            try:
+                handler(doc_id)
+            except Exception:
+                logger.exception("快取失效處理失敗", extra={"model": model.__name__})
+
+    def invalidate_all(self):
+        for model in list(self._handlers):
+            self.invalidate(model)
+
+    async def start(self):
+        """在 init_db 之後呼叫 (需要 Beanie 解析出實際的 collection 名稱)"""
+        if self._task is None and self._handlers:
+            self._collections = {model.get_collection_name(): model for model in self._handlers}
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                await self._watch()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAM_UNSUPPORTED:
+                    logger.info("MongoDB 不支援 change stream，快取失效改用輪詢")
+                    await self._poll()
+                    return
+                logger.error("change stream 中斷: %s", e)
+            except Exception as e:
+                logger.error("change stream 中斷: %s", e)
+
+            # 重新連線前無法確定漏掉了哪些事件，全部失效
+            self._resume_token = None
+            self.invalidate_all()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _watch(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self._collections)}}}]
+        async with db.database.watch(pipeline, resume_after=self._resume_token) as stream:
+            self.mode = "change_stream"
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                if change["operationType"] in ("drop", "rename", "dropDatabase", "invalidate"):
+                    self.invalidate_all()
+                    continue
+                model = self._collections.get(change.get("ns", {}).get("coll"))
+                doc_id = change.get("documentKey", {}).get("_id")
+                if model:
+                    self.invalidate(model, str(doc_id) if doc_id is not None else None)
+
+    async def _poll(self):
+        """輪詢 updated_at 有變動的文件 (看不到刪除；各 worker 時鐘誤差以重疊區間吸收)"""
+        self.mode = "polling"
+        interval = settings.CACHE_BUS_POLL_INTERVAL_SECONDS
+        overlap = timedelta(seconds=settings.CACHE_BUS_POLL_OVERLAP_SECONDS)
+        last_seen = {name: datetime.utcnow() for name in self._collections}
+
+        while True:
+            await asyncio.sleep(interval)
+            for name, model in self._collections.items():
+                try:
+                    cursor = db.database[name].find(
+                        {"updated_at": {"$gt": last_seen[name] - overlap}},
+                        projection={"updated_at": 1}
+                    )
+                    async for doc in cursor:
+                        self.invalidate(model, str(doc["_id"]))
+                        if doc["updated_at"] > last_seen[name]:
+                            last_seen[name] = doc["updated_at"]
+                except PyMongoError as e:
+                    logger.error("快取失效輪詢失敗: %s", e, extra={"collection": name})
+
+
+cache_bus = CacheInvalidationBus()
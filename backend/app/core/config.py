@@ -13,6 +13,14 @@ class Settings(BaseSettings):
     # MongoDB 設定 - 從 .env 讀取
     MONGODB_URL: str
     DATABASE_NAME: str = "ma_platform"
+    MONGODB_MAX_POOL_SIZE: int = 10
+    MONGODB_MIN_POOL_SIZE: int = 10
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 2000  # 等不到連線時快速失敗 (回 503)
+    SYNC_INDEXES_ON_STARTUP: bool = True  # 關閉時改由部署流程執行 scripts/sync_indexes.py，啟動時只檢查唯一索引
+    
+    # 讀寫分流 - 列表/詳情讀取走 secondaryPreferred (需要 replica set)
+    READ_FROM_SECONDARIES: bool = False
+    MONGODB_MAX_STALENESS_SECONDS: int = 90  # MongoDB 要求至少 90 秒
     
     # JWT 設定 - 從 .env 讀取
     SECRET_KEY: str
@@ -20,6 +28,95 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # 提案版本歷史：每 K 版存一次完整內容，其餘存差異
+    PROPOSAL_VERSION_SNAPSHOT_INTERVAL: int = 10
+    
+    # 審核佇列：領取的提案在租約期間內其他管理員不能審核
+    REVIEW_LEASE_SECONDS: int = 15 * 60
+    REVIEW_CLAIM_MAX: int = 20
+    
+    # 批次匯入用戶：API 單次上限 (每筆都要 bcrypt，更大的檔案使用 scripts/import_users.py)
+    USER_IMPORT_MAX_ROWS: int = 500
+    USER_IMPORT_MAX_BYTES: int = 20 * 1024 * 1024
+    PASSWORD_HASH_WORKERS: int = 0  # 雜湊密碼的行程池大小 (0 = CPU 核心數)
+    
+    # 冷資料歸檔：終止狀態超過 N 天的文件移到 *_archive collection
+    PROPOSAL_ARCHIVE_AFTER_DAYS: int = 30  # archived 提案
+    CASE_ARCHIVE_AFTER_DAYS: int = 30      # rejected case
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.5
+    ARCHIVE_LIST_LIMIT: int = 200           # 列表加上 include_archived 時最多讀取的歸檔筆數
+    
+    # 管理員匯出：同時進行的匯出數 (每個 worker)
+    EXPORT_CONCURRENCY_LIMIT: int = 2
+    
+    # 稽核紀錄：緩衝後批次寫入
+    AUDIT_FLUSH_INTERVAL_MS: int = 5
+    AUDIT_BATCH_SIZE: int = 100
+    AUDIT_MAX_BUFFER: int = 10000  # 寫入失敗時最多保留的事件數
+    
+    # case 逾期：created 狀態超過 N 天沒有回應即標記為 expired (0 = 不逾期，預設關閉；開啟後買方就看不到逾期的 case)
+    CASE_EXPIRE_AFTER_DAYS: int = 0
+    CASE_EXPIRY_BATCH_SIZE: int = 200
+    CASE_EXPIRY_BATCH_PAUSE_SECONDS: float = 0.2
+    CASE_EXPIRY_INTERVAL_SECONDS: int = 5 * 60
+    CASE_EXPIRY_TIMEOUT_SECONDS: int = 2 * 60
+    
+    # 背景排程 (每個工作同一時間只由一個 worker 執行)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_JITTER_RATIO: float = 0.1        # 間隔隨機 ±10%
+    SCHEDULER_MAX_CONCURRENT_JOBS: int = 2     # 每個 worker 同時執行的工作數
+    TOKEN_CLEANUP_INTERVAL_SECONDS: int = 60 * 60
+    TOKEN_CLEANUP_TIMEOUT_SECONDS: int = 5 * 60
+    COUNTER_REPAIR_INTERVAL_SECONDS: int = 6 * 60 * 60
+    COUNTER_REPAIR_TIMEOUT_SECONDS: int = 30 * 60
+    COUNTER_REPAIR_SETTLE_SECONDS: float = 2.0  # 重新計算後等待進行中的狀態轉換寫完計數，再確認 revision 未變
+    
+    # 資料室文件上傳上限 (bytes)
+    DOCUMENT_MAX_UPLOAD_BYTES: int = 200 * 1024 * 1024
+    
+    # 快取設定
+    PROPOSAL_SNAPSHOT_CACHE_SIZE: int = 1024  # 提案快照 LRU 快取筆數 (快照不可變，不需失效)
+    USER_CACHE_ENABLED: bool = False          # 用戶快取 (由 cache_bus 跨 worker 失效)
+    USER_CACHE_SIZE: int = 10000
+    CACHE_BUS_POLL_INTERVAL_SECONDS: float = 2.0   # standalone mongod 的輪詢間隔
+    CACHE_BUS_POLL_OVERLAP_SECONDS: float = 5.0    # 輪詢重疊區間，吸收各 worker 時鐘誤差
+    
+    # 准入控制與限流 (每個 worker 各自計算)
+    MAX_IN_FLIGHT_REQUESTS: int = 200          # 同時處理的請求上限
+    POOL_WAIT_QUEUE_THRESHOLD: int = 20        # 等待 MongoDB 連線的操作超過此數即拒絕新請求
+    OVERLOAD_RETRY_AFTER_SECONDS: int = 2
+    LOGIN_RATE_PER_MINUTE: int = 10            # 每個 IP 的登入速率
+    LOGIN_RATE_BURST: int = 10
+    LOGIN_CONCURRENCY_LIMIT: int = 8           # bcrypt 很吃 CPU，限制同時登入數
+    LIST_RATE_PER_MINUTE: int = 120            # 每個用戶的列表查詢速率
+    LIST_RATE_BURST: int = 30
+    LIST_CONCURRENCY_LIMIT: int = 32
+    
+    # 慢查詢紀錄：超過門檻的查詢自動 explain，存入 capped collection (GET /ops/slow-queries)
+    SLOW_QUERY_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS: int = 600   # 同一類查詢在此期間內只 explain 一次
+    SLOW_QUERY_COLLECTION_SIZE_MB: int = 16
+    SLOW_QUERY_QUEUE_SIZE: int = 1000
+    
+    # API GET JSON 回應的 ETag：超過此大小的回應不緩衝計算，直接傳送
+    ETAG_MAX_BODY_BYTES: int = 1024 * 1024
+    
+    # 健康檢查
+    HEALTH_PING_TIMEOUT_SECONDS: float = 1.0      # 就緒檢查 ping MongoDB 的逾時
+    HEALTH_CACHE_SECONDS: float = 1.0             # ping 結果快取，探測再頻繁也最多每秒一次
+    HEALTH_MAX_LOOP_LAG_MS: float = 500           # 事件迴圈延遲超過此值視為未就緒
+    LOOP_LAG_SAMPLE_INTERVAL_SECONDS: float = 0.5
+    HEALTH_DRAIN_SECONDS: float = 5.0             # 收到 SIGTERM 後先回報未就緒，等此秒數再停止接收連線 (0 = 不延後)
+    
+    # 日誌：json (正式環境) 或 text (開發)，寫出在背景執行緒進行
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_QUEUE_SIZE: int = 10000          # 佇列滿時丟棄新日誌，不阻塞請求
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01  # DEBUG 日誌的抽樣比例
+    LOG_REQUESTS: bool = True            # 每個請求一筆存取日誌 (路由、狀態碼、耗時)
+    
     # CORS 設定
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
     
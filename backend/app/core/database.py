@@ -1,10 +1,15 @@
 # app/core/database.py
 
+import logging
+import threading
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from beanie import init_beanie
-from typing import Optional
+import beanie
+from beanie.odm.utils.init import Initializer, get_index_attributes, get_model_fields
+from pymongo import IndexModel, monitoring
+from typing import List, Optional, Tuple
 from .config import settings
-from app.domains.case.models import Case, Comment  # 新增
+
+logger = logging.getLogger(__name__)
 
 
 class Database:
@@ -13,14 +18,118 @@ class Database:
 
 db = Database()
 
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """追蹤連線池使用量 (pymongo 在背景執行緒呼叫，計數需要加鎖)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waiting = 0      # 等待取得連線的操作數
+        self.in_use = 0       # 已借出的連線數
+
+    def _add(self, waiting: int = 0, in_use: int = 0):
+        with self._lock:
+            self.waiting += waiting
+            self.in_use += in_use
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, in_use=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1)
+
+    def connection_checked_in(self, event):
+        self._add(in_use=-1)
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+pool_monitor = PoolMonitor()
+
+
+# _Initializer 覆寫 Beanie 內部的 init_indexes，只在驗證過的版本上跳過索引同步 (requirements.txt 固定版本)
+_SKIP_INDEXES_SUPPORTED_BEANIE = "1.23."
+
+
+def _skip_indexes_supported() -> bool:
+    return beanie.__version__.startswith(_SKIP_INDEXES_SUPPORTED_BEANIE) and hasattr(Initializer, "init_indexes")
+
+
+def _unique_index_keys(cls) -> List[Tuple[str, ...]]:
+    """模型宣告的唯一索引 (Indexed(..., unique=True) 欄位與 Settings.indexes)，以欄位名稱序列表示"""
+    keys = []
+    for name, field in get_model_fields(cls).items():
+        attributes = get_index_attributes(field)
+        if attributes is not None and attributes[1].get("unique"):
+            keys.append((field.alias or name,))
+    for index in cls.get_settings().indexes or []:
+        index = getattr(index, "index", index)  # Beanie 初始化後包成 IndexModelField
+        if isinstance(index, IndexModel) and index.document.get("unique"):
+            keys.append(tuple(index.document["key"].keys()))
+    return keys
+
+
+class _Initializer(Initializer):
+    """Beanie 初始化器，可選擇跳過索引同步 (每次開機都 create_indexes 會拖慢 worker 啟動)
+
+    跳過同步時仍會檢查唯一索引是否存在：並行建立 (快照、版本、計數、已讀位置) 依賴 DuplicateKeyError，
+    缺少唯一索引時會寫入重複資料而不會報錯。缺少的索引記在 missing_unique_indexes。
+    """
+
+    def __init__(self, *args, sync_indexes: bool = True, **kwargs):
+        self.sync_indexes = sync_indexes
+        self.missing_unique_indexes: List[str] = []
+        super().__init__(*args, **kwargs)
+
+    async def init_indexes(self, cls, allow_index_dropping: bool = False):
+        if self.sync_indexes:
+            await super().init_indexes(cls, allow_index_dropping)
+            return
+
+        information = await cls.get_motor_collection().index_information()
+        existing = {
+            tuple(field for field, _ in index["key"])
+            for index in information.values() if index.get("unique")
+        }
+        for keys in _unique_index_keys(cls):
+            if keys not in existing:
+                self.missing_unique_indexes.append(f"{cls.get_collection_name()}({', '.join(keys)})")
+
+
 async def connect_to_mongo():
     """連接到 MongoDB"""
-    print("🔌 正在連接到 MongoDB...")
+    logger.info("正在連接到 MongoDB")
     
+    from .slow_queries import slow_query_monitor
+
     db.client = AsyncIOMotorClient(
         settings.MONGODB_URL,
-        maxPoolSize=10,
-        minPoolSize=10,
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        event_listeners=[pool_monitor, slow_query_monitor],
     )
     
     db.database = db.client[settings.DATABASE_NAME]
@@ -28,46 +137,67 @@ async def connect_to_mongo():
     # 測試連接
     try:
         await db.client.admin.command('ping')
-        print("✅ MongoDB 連接成功")
+        logger.info("MongoDB 連接成功")
     except Exception as e:
-        print(f"❌ MongoDB 連接失敗: {e}")
+        logger.error("MongoDB 連接失敗: %s", e)
         raise e
 
-async def init_db():
-    """初始化資料庫和 Beanie"""
-    print("🏗️ 正在初始化資料庫...")
+async def init_db(sync_indexes: Optional[bool] = None):
+    """初始化資料庫和 Beanie
+
+    sync_indexes 未指定時使用 settings.SYNC_INDEXES_ON_STARTUP；
+    關閉時改由 scripts/sync_indexes.py 在部署時同步一次索引，啟動時只檢查唯一索引是否都已建立 (缺少時啟動失敗)。
+    """
+    if sync_indexes is None:
+        sync_indexes = settings.SYNC_INDEXES_ON_STARTUP
+    if not sync_indexes and not _skip_indexes_supported():
+        logger.warning("此 Beanie 版本未驗證跳過索引同步，改為同步索引", extra={"beanie": beanie.__version__})
+        sync_indexes = True
+    logger.info("正在初始化資料庫", extra={"sync_indexes": sync_indexes})
     
-    # 導入所有模型 - 確保導入順序正確
+    # 導入所有模型 - 延遲到初始化時才導入
     from app.domains.user.models import User
     from app.domains.auth.models import RefreshToken
-    from app.domains.proposal.models import Proposal
+    from app.domains.proposal.models import Proposal, ProposalSnapshot, ProposalVersion
+    from app.domains.case.models import Case, Comment, CaseReadCursor
+    from app.domains.audit.models import AuditEvent
+    from app.domains.counters.models import StatusCounters
     
     # 初始化 Beanie - 確保連接已建立
     try:
-        await init_beanie(
+        initializer = _Initializer(
             database=db.database,
             document_models=[
                 User, 
                 RefreshToken, 
                 Proposal, 
-                Case,      # 新增
-                Comment    # 新增
-            ]
+                ProposalSnapshot,
+                ProposalVersion,
+                Case,
+                Comment,
+                CaseReadCursor,
+                AuditEvent,
+                StatusCounters
+            ],
+            sync_indexes=sync_indexes,
         )
-        
-        print("✅ 資料庫初始化完成")
-        
-        # 驗證初始化是否成功
-        user_count = await User.count()
-        print(f"📊 資料庫中有 {user_count} 個用戶")
-        
+        await initializer
     except Exception as e:
-        print(f"❌ 資料庫初始化失敗: {e}")
+        logger.error("資料庫初始化失敗: %s", e)
         raise e
 
+    if initializer.missing_unique_indexes:
+        logger.error("缺少唯一索引，請執行 scripts/sync_indexes.py", extra={"missing": initializer.missing_unique_indexes})
+        raise RuntimeError(f"缺少唯一索引: {', '.join(initializer.missing_unique_indexes)}")
+    if sync_indexes:
+        # archive collection 不是 Beanie 模型，索引另外建立
+        from app.domains.archive.services import ArchiveService
+        await ArchiveService.ensure_indexes()
+    logger.info("資料庫初始化完成")
+
 async def close_mongo_connection():
     """關閉 MongoDB 連接"""
-    print("🔌 正在關閉 MongoDB 連接...")
+    logger.info("正在關閉 MongoDB 連接")
     if db.client:
         db.client.close()
-    print("✅ MongoDB 連接已關閉")
\ No newline at end of file
+    logger.info("MongoDB 連接已關閉")
\ No newline at end of file
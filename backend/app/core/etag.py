@@ -0,0 +1,92 @@
+# app/core/etag.py - GET 回應的 ETag / 304
+
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config import settings
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # 弱比較：忽略 W/ 前綴
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def _bufferable(headers: Headers) -> bool:
+    """只緩衝一般的 JSON 回應：檔案下載、部分內容與沒有 Content-Length 的串流回應 (匯出等) 直接傳送"""
+    if not headers.get("content-type", "").startswith("application/json"):
+        return False
+    if "content-disposition" in headers or "content-range" in headers:
+        return False
+    length = headers.get("content-length")
+    return length is not None and length.isdigit() and int(length) <= settings.ETAG_MAX_BODY_BYTES
+
+
+class ETagMiddleware:
+    """API 路由 GET 的 200 JSON 回應加上 ETag；If-None-Match 相符時回 304 不帶 body
+
+    伺服器端仍會產生回應，省下的是傳輸與前端解析；搭配前端的快取層，
+    重新驗證的請求只需要一個空的 304。Range 請求與不適合緩衝的回應 (見 _bufferable) 不處理。
+    """
+
+    def __init__(self, app, path_prefix: str = "/api/"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        if "range" in request_headers:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = request_headers.get("if-none-match")
+        start_message = None
+        chunks = []
+        passthrough = False
+
+        async def send_with_etag(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or not _bufferable(headers):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers = MutableHeaders(raw=list(start_message["headers"]))
+            headers["etag"] = etag
+
+            if if_none_match and _etag_matches(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send({**start_message, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,166 @@
+# app/core/health.py - 存活 (liveness) 與就緒 (readiness) 檢查
+
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app.shared.utils.cache import SingleFlight
+
+from .config import settings
+from .database import db, pool_monitor
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """定期 sleep 並量測實際醒來的延遲；延遲大表示事件迴圈被阻塞或 CPU 不足"""
+
+    def __init__(self, samples: int = 20):
+        self.lag = 0.0                                  # 最近一次的延遲 (秒)
+        self._recent: deque = deque(maxlen=samples)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def max_recent(self) -> float:
+        return max(self._recent, default=0.0)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        interval = settings.LOOP_LAG_SAMPLE_INTERVAL_SECONDS
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.lag = max(0.0, time.perf_counter() - started - interval)
+            self._recent.append(self.lag)
+
+
+class HealthState:
+    """worker 的就緒狀態
+
+    starting (啟動暖機中) → ready → draining (關閉中)；只有 ready 且相依服務正常時才接流量
+    """
+
+    def __init__(self):
+        self.phase = "starting"
+        self.loop_monitor = EventLoopLagMonitor()
+        self._ping_flight = SingleFlight()
+        self._ping_checked_at = 0.0
+        self._ping_result: Optional[Dict[str, Any]] = None
+
+    def mark_ready(self):
+        self.phase = "ready"
+        self._ping_result = None  # 啟動前的檢查結果 (尚未連線) 不再沿用
+
+    def mark_draining(self):
+        self.phase = "draining"
+
+    def install_drain_handler(self):
+        """收到 SIGTERM 時先切到 draining，HEALTH_DRAIN_SECONDS 後才讓伺服器停止接收連線
+
+        lifespan 的關閉階段在伺服器關閉 listener 之後才執行，那時才回報未就緒已來不及讓負載平衡器移除此 worker。
+        延遲結束後送出 SIGINT，交給伺服器原本的處理優雅關閉 (uvicorn 對 SIGINT / SIGTERM 的處理相同)；
+        draining 期間再收到 SIGTERM 則立即關閉。需在伺服器註冊訊號處理之後呼叫 (uvicorn 在 lifespan 啟動前註冊)。
+        """
+        if settings.HEALTH_DRAIN_SECONDS <= 0 or threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+
+        def shutdown():
+            os.kill(os.getpid(), signal.SIGINT)
+
+        def on_sigterm():
+            if self.phase == "draining":
+                shutdown()
+                return
+            self.mark_draining()
+            logger.info("收到 SIGTERM，%s 秒後停止接收連線", settings.HEALTH_DRAIN_SECONDS)
+            loop.call_later(settings.HEALTH_DRAIN_SECONDS, shutdown)
+
+        try:
+            loop.add_signal_handler(signal.SIGTERM, on_sigterm)
+        except NotImplementedError:
+            # Windows 事件迴圈不支援，維持伺服器原本的處理
+            pass
+
+    async def mongo_status(self) -> Dict[str, Any]:
+        """MongoDB ping (結果快取 HEALTH_CACHE_SECONDS，並行的檢查共用同一次 ping)
+
+        負載平衡器頻繁探測時，對資料庫最多每秒一次 ping，不會放大負載。
+        """
+        if self._ping_result is not None and time.monotonic() - self._ping_checked_at < settings.HEALTH_CACHE_SECONDS:
+            return self._ping_result
+        return await self._ping_flight.do("ping", self._ping)
+
+    async def _ping(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        if db.client is None:
+            result = {"ok": False, "error": "尚未連線"}
+        else:
+            try:
+                await asyncio.wait_for(db.client.admin.command("ping"), timeout=settings.HEALTH_PING_TIMEOUT_SECONDS)
+                result = {"ok": True}
+            except asyncio.TimeoutError:
+                result = {"ok": False, "error": f"ping 逾時 ({settings.HEALTH_PING_TIMEOUT_SECONDS}s)"}
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if not result["ok"]:
+            logger.warning("MongoDB 健康檢查失敗", extra=result)
+
+        self._ping_result = result
+        self._ping_checked_at = time.monotonic()
+        return result
+
+    async def readiness(self) -> Dict[str, Any]:
+        """就緒檢查結果；ready 為 False 時附上 reasons"""
+        reasons = []
+        if self.phase != "ready":
+            reasons.append(self.phase)
+
+        mongo = await self.mongo_status()
+        if not mongo["ok"]:
+            reasons.append("mongo_unavailable")
+
+        pool = {
+            "in_use": pool_monitor.in_use,
+            "waiting": pool_monitor.waiting,
+            "max_size": settings.MONGODB_MAX_POOL_SIZE,
+        }
+        if pool_monitor.waiting > settings.POOL_WAIT_QUEUE_THRESHOLD:
+            reasons.append("pool_exhausted")
+
+        lag_ms = self.loop_monitor.lag * 1000
+        if lag_ms > settings.HEALTH_MAX_LOOP_LAG_MS:
+            reasons.append("event_loop_lag")
+
+        return {
+            "status": "ready" if not reasons else "not_ready",
+            "phase": self.phase,
+            "reasons": reasons,
+            "mongo": mongo,
+            "pool": pool,
+            "event_loop_lag_ms": {
+                "current": round(lag_ms, 1),
+                "max_recent": round(self.loop_monitor.max_recent * 1000, 1),
+            },
+        }
+
+
+health = HealthState()
@@ -0,0 +1,140 @@
+# app/core/identity_map.py - 請求範圍的 identity map 與批次載入
+
+import asyncio
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from beanie import Document
+
+from .config import settings
+from .read_routing import in_write_flow
+
+# 依 ID 批次讀取：回傳 {id: 文件}，找不到的 ID 可以不出現在結果中
+BatchFetch = Callable[[List[str]], Awaitable[Dict[str, Optional[Document]]]]
+SingleFetch = Callable[[str], Awaitable[Optional[Document]]]
+
+_MISSING = object()
+
+
+class IdentityMap:
+    """單一請求內的文件快取：同一份文件最多讀取一次，同一個 tick 內的讀取合併成一次 $in 查詢
+
+    文件在同一請求內共用同一個物件。寫入流程只重用從 primary 讀到的文件。
+    """
+
+    def __init__(self):
+        # (model, id) → (文件, 是否讀自 primary)
+        self._docs: Dict[Tuple[Type[Document], str], Tuple[Optional[Document], bool]] = {}
+        self._batches: Dict[Type[Document], Dict[str, asyncio.Future]] = {}
+        self.fetches = 0
+
+    def lookup(self, model: Type[Document], doc_id: str, primary_only: bool = False):
+        entry = self._docs.get((model, doc_id))
+        if entry is None or (primary_only and not entry[1]):
+            return _MISSING
+        return entry[0]
+
+    def put(self, model: Type[Document], doc_id: str, doc: Optional[Document], primary: bool):
+        self._docs[(model, doc_id)] = (doc, primary)
+
+    def forget(self, model: Type[Document], doc_id: str):
+        self._docs.pop((model, doc_id), None)
+
+    async def load(self, model: Type[Document], doc_id: str, fetch: BatchFetch) -> Optional[Document]:
+        doc = self.lookup(model, doc_id)
+        if doc is not _MISSING:
+            return doc
+
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(model)
+        if batch is None:
+            batch = self._batches[model] = {}
+            # 等同一個 tick 內的其他讀取都排進來再一起查詢
+            loop.call_soon(self._dispatch, model, fetch)
+
+        future = batch.get(doc_id)
+        if future is None:
+            future = batch[doc_id] = loop.create_future()
+        # shield：某個等待者被取消不影響同一請求中等待同一文件的其他呼叫
+        return await asyncio.shield(future)
+
+    def _dispatch(self, model: Type[Document], fetch: BatchFetch):
+        batch = self._batches.pop(model)
+        asyncio.ensure_future(self._run(model, fetch, batch))
+
+    async def _run(self, model: Type[Document], fetch: BatchFetch, batch: Dict[str, asyncio.Future]):
+        self.fetches += 1
+        try:
+            found = await fetch(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        primary = not settings.READ_FROM_SECONDARIES
+        for doc_id, future in batch.items():
+            doc = found.get(doc_id)
+            self.put(model, doc_id, doc, primary)
+            if not future.done():
+                future.set_result(doc)
+
+
+_current: ContextVar[Optional[IdentityMap]] = ContextVar("identity_map", default=None)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    return _current.get()
+
+
+async def load_document(
+    model: Type[Document],
+    doc_id: str,
+    fetch_many: BatchFetch,
+    fetch_one: SingleFetch
+) -> Optional[Document]:
+    """service 讀取單筆文件的共用入口
+
+    - 請求範圍外：直接以 fetch_many 讀取
+    - 請求範圍內：經由 identity map 去重並批次讀取
+    - 寫入流程內：以 fetch_one 讀 primary (已從 primary 讀過的文件直接重用)
+    """
+    identity = _current.get()
+    if in_write_flow():
+        if identity is not None:
+            doc = identity.lookup(model, doc_id, primary_only=True)
+            if doc is not _MISSING:
+                return doc
+        doc = await fetch_one(doc_id)
+        if identity is not None:
+            identity.put(model, doc_id, doc, primary=True)
+        return doc
+
+    if identity is None:
+        return (await fetch_many([doc_id])).get(doc_id)
+    return await identity.load(model, doc_id, fetch_many)
+
+
+def forget_document(model: Type[Document], doc_id: str):
+    """文件已被修改：之後的讀取重新從資料庫載入"""
+    identity = _current.get()
+    if identity is not None:
+        identity.forget(model, doc_id)
+
+
+class IdentityMapMiddleware:
+    """每個 HTTP 請求一個新的 identity map"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current.set(IdentityMap())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,225 @@
+# app/core/logs.py - 結構化日誌 (JSON 輸出、背景執行緒寫出)
+"""
+用法：
+    logger = logging.getLogger(__name__)
+    logger.info("建立 case", extra={"case_id": case_id})
+
+- 事件迴圈只把 LogRecord 放進佇列，寫 stdout 在 QueueListener 的背景執行緒進行；
+  佇列滿時丟棄 (不阻塞請求)，丟棄數見 dropped_log_records()
+- 請求中的日誌自動帶上 request_id / method / path / route
+- DEBUG 日誌依 LOG_DEBUG_SAMPLE_RATE 抽樣
+- 熱路徑：關閉的等級在 logger.debug(...) 第一步 (快取的 isEnabledFor) 就返回；
+  參數用 %s 延遲格式化，需要額外計算的內容先以 logger.isEnabledFor(logging.DEBUG) 判斷
+"""
+
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config import settings
+
+_request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_context", default=None)
+
+# LogRecord 內建的屬性；其餘 (extra=... 與請求資訊) 都輸出成欄位
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+access_logger = logging.getLogger("app.access")
+
+
+def current_request_id() -> Optional[str]:
+    context = _request_context.get()
+    return context["request_id"] if context else None
+
+
+class RequestContextFilter(logging.Filter):
+    """在發出日誌的執行緒上補上請求資訊 (背景執行緒讀不到 contextvars)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        if context:
+            for key, value in context.items():
+                if key not in record.__dict__:
+                    setattr(record, key, value)
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """DEBUG 以下的日誌只保留 rate 比例 (大量的除錯日誌不會塞滿佇列)"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    return {key: value for key, value in record.__dict__.items() if key not in _RESERVED and not key.startswith("_")}
+
+
+class JsonFormatter(logging.Formatter):
+    """一行一個 JSON 物件"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """開發用的單行文字格式，額外欄位以 key=value 附在後面"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = _extra_fields(record)
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        return line
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """把日誌放進有上限的佇列；佇列滿時丟棄而不是阻塞事件迴圈"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 在發出端先把訊息與例外轉成字串 (args 可能是之後會被修改的物件)，
+        # 其餘欄位原樣保留給背景執行緒的 formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging():
+    """設定 root logger (重複呼叫無作用)"""
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    # 不記錄用不到的欄位：省下每筆日誌的執行緒/行程查詢與呼叫端 stack walk
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging._srcfile = None
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _handler = NonBlockingQueueHandler(log_queue)
+    # 先抽樣再補請求資訊，被丟棄的日誌不用多做事
+    _handler.addFilter(DebugSampler(settings.LOG_DEBUG_SAMPLE_RATE))
+    _handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+
+
+def shutdown_logging():
+    """寫出佇列中剩餘的日誌並停止背景執行緒"""
+    global _listener
+    if _listener is None:
+        return
+    while True:
+        try:
+            _listener.stop()
+            break
+        except queue.Full:
+            # 結束標記放不進佇列：等背景執行緒消化一些再試
+            time.sleep(0.01)
+    _listener = None
+
+
+def dropped_log_records() -> int:
+    return _handler.dropped if _handler else 0
+
+
+def _route_template(path: str, path_params: Dict[str, Any]) -> str:
+    """/cases/abc/comments + {case_id: abc} → /cases/{case_id}/comments (日誌依路由彙總用)"""
+    segments = path.split("/")
+    names = {str(value): name for name, value in path_params.items()}
+    return "/".join(f"{{{names[segment]}}}" if segment in names else segment for segment in segments)
+
+
+class RequestLoggingMiddleware:
+    """每個請求一個 request id (沿用 X-Request-ID 標頭)，結束時記錄路由、狀態碼與耗時"""
+
+    # 健康檢查不記錄
+    quiet_paths = ("/health",)
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        context = {"request_id": request_id, "method": scope["method"], "path": scope["path"]}
+        token = _request_context.set(context)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if settings.LOG_REQUESTS and not scope["path"].startswith(self.quiet_paths):
+                path_params = scope.get("path_params")
+                access_logger.info("request", extra={
+                    "route": _route_template(scope["path"], path_params) if path_params else scope["path"],
+                    "status": status_code,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                })
+            _request_context.reset(token)
@@ -0,0 +1,119 @@
+# app/core/query_budget.py - 計算 MongoDB 指令數 (檢查每個請求的查詢預算)
+"""
+用法 (需在建立 Motor client 之前安裝，見 tests/conftest.py 與 scripts/check_query_budgets.py)：
+    counter = install_query_counter()
+    await connect_to_mongo()
+    await init_db()
+    ...
+    with counter.measure() as count:
+        await client.get("/api/v1/cases/my-sent", headers=headers)
+    count.assert_at_most(3, "GET /cases/my-sent")
+
+計數是整個行程共用的，量測期間不能有其他請求或背景工作 (排程、快取失效輪詢) 在執行。
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set, Tuple
+
+from dotenv import dotenv_values
+from pymongo import monitoring
+
+# 不算在請求內的指令：連線握手/結束 session
+IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "killCursors", "saslStart", "saslContinue"}
+
+# 環境變數與 .env 都沒設定時使用的值 (本機 MongoDB，連不上時 2 秒內失敗)
+LOCAL_DEFAULTS = {
+    "MONGODB_URL": "mongodb://localhost:27017/?serverSelectionTimeoutMS=2000",
+    "SECRET_KEY": "query-budget-local-only",
+}
+
+
+def use_local_defaults():
+    """補上必填設定，讓檢查不需要 .env 也能執行 (需在導入 app.core.config 之前呼叫)"""
+    configured = dotenv_values(".env")
+    for key, value in LOCAL_DEFAULTS.items():
+        if key not in os.environ and not configured.get(key):
+            os.environ[key] = value
+
+
+def ignored_collections() -> Set[str]:
+    """背景寫入的 collection (稽核紀錄、慢查詢、排程租約)，不算在請求內
+
+    Beanie 使用 Settings.name (預設為類別名稱)，不理會 Settings.collection，
+    所以要在 init_db 之後從模型取得實際名稱。
+    """
+    from app.domains.audit.models import AuditEvent
+    from .scheduler import LEASE_COLLECTION
+    from .slow_queries import SLOW_QUERY_COLLECTION
+    return {AuditEvent.get_motor_collection().name, SLOW_QUERY_COLLECTION, LEASE_COLLECTION}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """指令數超過預算"""
+
+
+class QueryCount:
+    """一次量測期間執行的指令 (command, collection)"""
+
+    def __init__(self):
+        self.commands: List[Tuple[str, Optional[str]]] = []
+
+    @property
+    def total(self) -> int:
+        return len(self.commands)
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {collection or ''}".strip() for name, collection in self.commands)
+
+    def assert_at_most(self, budget: int, label: str = ""):
+        if self.total > budget:
+            raise QueryBudgetExceeded(f"{label} 執行了 {self.total} 個指令 (預算 {budget}): {self.summary()}")
+
+
+class QueryCounter(monitoring.CommandListener):
+    """pymongo 指令監聽：measure() 期間記錄每個指令"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Optional[QueryCount] = None
+        self._ignored: Set[str] = set()
+
+    @contextmanager
+    def measure(self) -> Iterator[QueryCount]:
+        """量測期間的指令 (需在 init_db 之後)"""
+        count = QueryCount()
+        ignored = ignored_collections()
+        with self._lock:
+            self._ignored = ignored
+            self._active = count
+        try:
+            yield count
+        finally:
+            with self._lock:
+                self._active = None
+
+    def started(self, event):
+        name = event.command_name
+        if name in IGNORED_COMMANDS:
+            return
+        collection = event.command.get(name)
+        if not isinstance(collection, str):
+            collection = None
+        with self._lock:
+            if self._active is not None and collection not in self._ignored:
+                self._active.commands.append((name, collection))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def install_query_counter() -> QueryCounter:
+    """註冊為 pymongo 全域監聽 (只對之後建立的 client 生效)"""
+    counter = QueryCounter()
+    monitoring.register(counter)
+    return counter
@@ -0,0 +1,151 @@
+# app/core/read_routing.py - 讀寫分流
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional, Type
+
+from beanie import Document
+from beanie.odm.utils.parsing import parse_obj
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pymongo.read_preferences import SecondaryPreferred
+
+from .config import settings
+from .database import db
+
+# 目前是否在寫入流程中 (不論是否開啟讀寫分流)
+_in_write_flow: ContextVar[bool] = ContextVar("in_write_flow", default=False)
+
+# 目前請求所在的寫入流程 session (None 表示不在寫入流程中)
+_write_session: ContextVar[Optional[AsyncIOMotorClientSession]] = ContextVar("write_session", default=None)
+
+# 本 worker 最後一次寫入的 cluster/operation time，讓之後的 secondary 讀取至少讀到這個時間點
+_last_cluster_time: Optional[Dict[str, Any]] = None
+_last_operation_time = None
+
+_replica_collections: Dict[str, AsyncIOMotorCollection] = {}
+
+
+def current_session() -> Optional[AsyncIOMotorClientSession]:
+    """取得寫入流程的 session (傳給 Beanie 的 session 參數)"""
+    return _write_session.get()
+
+
+def in_write_flow() -> bool:
+    """是否在 write_flow 中 (寫入流程的讀取不能共用其他請求的結果)"""
+    return _in_write_flow.get()
+
+
+def _advance(session: AsyncIOMotorClientSession):
+    if _last_cluster_time is not None:
+        session.advance_cluster_time(_last_cluster_time)
+    if _last_operation_time is not None:
+        session.advance_operation_time(_last_operation_time)
+
+
+def _remember(session: AsyncIOMotorClientSession):
+    global _last_cluster_time, _last_operation_time
+    if session.cluster_time is not None:
+        _last_cluster_time = session.cluster_time
+    if session.operation_time is not None:
+        _last_operation_time = session.operation_time
+
+
+@asynccontextmanager
+async def causal_session():
+    """寫入流程：在 causally consistent session 中執行 (巢狀呼叫共用同一個 session)"""
+    if _in_write_flow.get():
+        yield _write_session.get()
+        return
+
+    flow_token = _in_write_flow.set(True)
+    try:
+        if not settings.READ_FROM_SECONDARIES:
+            yield None
+            return
+
+        async with await db.client.start_session(causal_consistency=True) as session:
+            _advance(session)
+            token = _write_session.set(session)
+            try:
+                yield session
+            finally:
+                _write_session.reset(token)
+                _remember(session)
+    finally:
+        _in_write_flow.reset(flow_token)
+
+
+def write_flow(func):
+    """service 方法裝飾器：整個方法在 causal_session 中執行"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with causal_session():
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def _replica_collection(model: Type[Document]) -> AsyncIOMotorCollection:
+    name = model.get_collection_name()
+    collection = _replica_collections.get(name)
+    if collection is None or collection.database is not db.database:
+        collection = model.get_motor_collection().with_options(
+            read_preference=SecondaryPreferred(max_staleness=settings.MONGODB_MAX_STALENESS_SECONDS)
+        )
+        _replica_collections[name] = collection
+    return collection
+
+
+def read_collection(model: Type[Document]) -> AsyncIOMotorCollection:
+    """大量讀取 (匯出等) 用的 collection：開啟讀寫分流時讀 secondaryPreferred"""
+    if not settings.READ_FROM_SECONDARIES:
+        return model.get_motor_collection()
+    return _replica_collection(model)
+
+
+async def find_for_read(
+    model: Type[Document],
+    query: Dict[str, Any],
+    sort: Optional[List] = None,
+    limit: int = 0
+) -> List[Document]:
+    """列表讀取：寫入流程內讀 primary，其餘讀 secondaryPreferred"""
+    if not settings.READ_FROM_SECONDARIES or current_session() is not None:
+        find = model.find(query, session=current_session())
+        if sort:
+            find = find.sort(sort)
+        if limit:
+            find = find.limit(limit)
+        return await find.to_list()
+
+    async with await db.client.start_session(causal_consistency=True) as session:
+        _advance(session)
+        cursor = _replica_collection(model).find(query, sort=sort, limit=limit, session=session)
+        return [parse_obj(model, doc) async for doc in cursor]
+
+
+async def get_many_for_read(model: Type[Document], document_ids: List[str]) -> Dict[str, Document]:
+    """依 ID 批次讀取 (一次 $in 查詢)，回傳 {id: 文件}"""
+    object_ids = [ObjectId(document_id) for document_id in document_ids if ObjectId.is_valid(document_id)]
+    if not object_ids:
+        return {}
+    docs = await find_for_read(model, {"_id": {"$in": object_ids}})
+    return {str(doc.id): doc for doc in docs}
+
+
+async def get_for_read(model: Type[Document], document_id: str) -> Optional[Document]:
+    """單筆讀取：寫入流程內讀 primary，其餘讀 secondaryPreferred"""
+    try:
+        object_id = ObjectId(document_id)
+    except (InvalidId, TypeError):
+        return None
+
+    if not settings.READ_FROM_SECONDARIES or current_session() is not None:
+        return await model.get(object_id, session=current_session())
+
+    async with await db.client.start_session(causal_consistency=True) as session:
+        _advance(session)
+        doc = await _replica_collection(model).find_one({"_id": object_id}, session=session)
+    return parse_obj(model, doc) if doc else None
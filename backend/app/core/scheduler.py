@@ -0,0 +1,243 @@
+# app/core/scheduler.py - 背景排程 (跨 worker 只由一個 worker 執行)
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from .config import settings
+from .database import db, pool_monitor
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Awaitable[Any]]
+
+# 租約存放的 collection，_id 為工作名稱
+LEASE_COLLECTION = "scheduler_leases"
+
+
+class Job:
+    """一個週期性工作與它的執行統計"""
+
+    def __init__(self, name: str, func: JobFunc, interval: float, timeout: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0              # 其他 worker 持有租約
+        self.not_due = 0              # 距上次 (任一 worker) 執行未滿一個間隔
+        self.deferred = 0             # 系統忙碌而延後
+        self.running = False
+        self.last_started: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def lease_seconds(self) -> float:
+        # 一次執行最多 timeout 秒；持有者每個間隔續約，漏掉一次也不會被搶走
+        return self.timeout + 2 * self.interval
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "timeout": self.timeout,
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "not_due": self.not_due,
+            "deferred": self.deferred,
+            "running": self.running,
+            "last_started": self.last_started,
+            "last_duration": self.last_duration,
+            "avg_duration": self.total_duration / self.runs if self.runs else None,
+            "max_duration": self.max_duration,
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    """在 lifespan 中啟動的週期性工作排程
+
+    - 每個工作各自一個迴圈：上一次執行完才開始計算下一個間隔，不會堆積
+    - 間隔加上隨機抖動，避免各 worker 同時搶租約
+    - 每次執行前以 MongoDB 租約文件確認由本 worker 負責 (同一時間只有一個 worker 執行)；
+      租約文件也記錄上次執行時間，重新部署換人接手時不會提早重跑
+    - 逾時取消；MongoDB 連線池排隊過長時延後執行，同時執行的工作數有上限
+    """
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def register(self, name: str, func: JobFunc, interval: float, timeout: Optional[float] = None):
+        """註冊工作 (在 start() 之前呼叫)；timeout 預設為間隔的一半"""
+        if name in self._jobs:
+            raise ValueError(f"排程工作 {name} 已註冊")
+        self._jobs[name] = Job(name, func, interval, timeout or interval / 2)
+
+    @property
+    def jobs(self) -> Dict[str, Job]:
+        return self._jobs
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {name: job.metrics() for name, job in self._jobs.items()}
+
+    async def start(self):
+        if not settings.SCHEDULER_ENABLED or self._tasks:
+            return
+        self._slots = asyncio.Semaphore(settings.SCHEDULER_MAX_CONCURRENT_JOBS)
+        self._tasks = [asyncio.create_task(self._loop(job)) for job in self._jobs.values()]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+
+        # 交出租約 (立即過期)，其他 worker 下一個間隔就能接手；保留 last_run_at，接手時不會提早重跑
+        if db.database is not None and self._jobs:
+            try:
+                await db.database[LEASE_COLLECTION].update_many(
+                    {"_id": {"$in": list(self._jobs)}, "owner": self.worker_id},
+                    {"$set": {"expires_at": datetime.utcnow()}, "$unset": {"owner": ""}}
+                )
+            except PyMongoError as e:
+                logger.warning("釋放排程租約失敗: %s", e)
+
+    def _jitter(self, job: Job) -> float:
+        return job.interval * random.uniform(0, settings.SCHEDULER_JITTER_RATIO)
+
+    def _delay(self, job: Job) -> float:
+        jitter = settings.SCHEDULER_JITTER_RATIO
+        return job.interval * random.uniform(1 - jitter, 1 + jitter)
+
+    async def _loop(self, job: Job):
+        # 啟動時錯開，避免所有工作與所有 worker 同時開始
+        await asyncio.sleep(min(self._jitter(job), 60))
+        while True:
+            delay = self._delay(job)
+            if pool_monitor.waiting > settings.POOL_WAIT_QUEUE_THRESHOLD:
+                job.deferred += 1
+            else:
+                lease = await self._acquire(job)
+                if lease is None:
+                    job.skipped += 1
+                else:
+                    last_run = lease.get("last_run_at")
+                    remaining = job.interval - (datetime.utcnow() - last_run).total_seconds() if last_run else 0
+                    if remaining > 0:
+                        job.not_due += 1
+                        delay = remaining + self._jitter(job)
+                    else:
+                        async with self._slots:
+                            await self._run(job)
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, job: Job) -> Optional[Dict[str, Any]]:
+        """取得或續約租約，回傳租約文件；租約由其他 worker 持有且未過期時回傳 None"""
+        now = datetime.utcnow()
+        try:
+            return await db.database[LEASE_COLLECTION].find_one_and_update(
+                {"_id": job.name, "$or": [{"owner": self.worker_id}, {"expires_at": {"$lt": now}}]},
+                {"$set": {
+                    "owner": self.worker_id,
+                    "expires_at": now + timedelta(seconds=job.lease_seconds),
+                    "renewed_at": now
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # 文件存在但條件不符 (別人持有)，upsert 撞到同一個 _id
+            return None
+        except PyMongoError as e:
+            logger.warning("取得排程租約失敗: %s", e, extra={"job": job.name})
+            return None
+
+    async def _run(self, job: Job):
+        job.running = True
+        job.last_started = datetime.utcnow()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(job.func(), timeout=job.timeout)
+            job.last_error = None
+        except asyncio.TimeoutError:
+            job.timeouts += 1
+            job.last_error = f"逾時 ({job.timeout}s)"
+            logger.warning("排程工作逾時", extra={"job": job.name, "timeout": job.timeout})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.exception("排程工作失敗", extra={"job": job.name})
+        finally:
+            duration = time.perf_counter() - started
+            job.running = False
+            job.runs += 1
+            job.last_duration = duration
+            job.total_duration += duration
+            job.max_duration = max(job.max_duration, duration)
+
+        # 失敗或逾時也算執行過，等下一個間隔再試
+        try:
+            await db.database[LEASE_COLLECTION].update_one(
+                {"_id": job.name, "owner": self.worker_id},
+                {"$set": {"last_run_at": job.last_started}}
+            )
+        except PyMongoError as e:
+            logger.warning("記錄排程執行時間失敗: %s", e, extra={"job": job.name})
+
+
+scheduler = JobScheduler()
+
+
+def register_default_jobs():
+    """註冊內建的週期性工作 (延遲導入，避免 core 在載入時依賴各 domain)"""
+    if "refresh_token_cleanup" in scheduler.jobs:
+        return
+
+    from app.domains.auth.services import AuthService
+    from app.domains.case.expiry import CaseExpiryService
+    from app.domains.counters.services import StatusCounterService
+
+    scheduler.register(
+        "refresh_token_cleanup",
+        AuthService.cleanup_refresh_tokens,
+        interval=settings.TOKEN_CLEANUP_INTERVAL_SECONDS,
+        timeout=settings.TOKEN_CLEANUP_TIMEOUT_SECONDS
+    )
+    if settings.CASE_EXPIRE_AFTER_DAYS > 0:
+        scheduler.register(
+            "case_expiry",
+            CaseExpiryService.expire_due,
+            interval=settings.CASE_EXPIRY_INTERVAL_SECONDS,
+            timeout=settings.CASE_EXPIRY_TIMEOUT_SECONDS
+        )
+    scheduler.register(
+        "status_counter_repair",
+        StatusCounterService.repair,
+        interval=settings.COUNTER_REPAIR_INTERVAL_SECONDS,
+        timeout=settings.COUNTER_REPAIR_TIMEOUT_SECONDS
+    )
@@ -1,7 +1,11 @@
 # app/core/security.py - 修正版
 
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, List, Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import settings
@@ -46,4 +50,40 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """驗證密碼"""
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+# 大量雜湊用的 process pool (bcrypt 佔用 CPU，不能在 event loop 或受 GIL 限制的執行緒中跑)
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _hash_many(passwords: List[str]) -> List[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """並行加密多個密碼，回傳順序與輸入相同"""
+    global _hash_pool
+    if not passwords:
+        return []
+
+    workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    if _hash_pool is None:
+        # 在執行中的 server 裡建立：Motor、日誌等執行緒已經在跑，fork 可能複製到被持有的鎖而卡死，改用 spawn
+        _hash_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    # 每個 worker 分到數個區塊，減少行程間傳遞的次數又不至於負載不均
+    size = max(1, -(-len(passwords) // (workers * 4)))
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(*(
+        loop.run_in_executor(_hash_pool, _hash_many, passwords[i:i + size])
+        for i in range(0, len(passwords), size)
+    ))
+    return [hashed for chunk in chunks for hashed in chunk]
+
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(cancel_futures=True)
+        _hash_pool = None
\ No newline at end of file
@@ -0,0 +1,265 @@
+# app/core/slow_queries.py - 慢查詢紀錄與自動 explain
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from app.shared.utils.cache import LRUCache
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# 慢查詢樣本存放的 capped collection (舊資料自動淘汰)
+SLOW_QUERY_COLLECTION = "slow_queries"
+
+# 會紀錄的指令 (都可以 explain)；insert / getMore 等沒有查詢計畫可看
+_EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+
+# explain 時不能帶的欄位 (session、交易、副本集相關)
+_COMMAND_ONLY_FIELDS = {
+    "lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "autocommit",
+    "startTransaction", "readConcern", "writeConcern", "signature", "maxTimeMS",
+}
+
+
+def query_shape(value: Any) -> Any:
+    """把查詢中的值換成 "?"，只保留欄位與運算子 (同樣形狀的查詢歸為一類，也不保存用戶資料)"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(item) for item in value]
+        # $in: [a, b, c] 與 $in: [a] 視為同一類
+        return shapes[:1] if all(shape == "?" for shape in shapes) else shapes
+    return "?"
+
+
+def _command_shape(name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    if name == "aggregate":
+        return {"pipeline": query_shape(command.get("pipeline", []))}
+    if name in ("update", "delete"):
+        statements = command.get("updates" if name == "update" else "deletes") or [{}]
+        return {"filter": query_shape(statements[0].get("q", {}))}
+    shape = {"filter": query_shape(command.get("filter", command.get("query", {})))}
+    if command.get("sort"):
+        # 排序欄位與方向是查詢計畫的一部分，保留原值
+        shape["sort"] = dict(command["sort"])
+    return shape
+
+
+def analyze_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """從 explain 結果找出全表掃描 (COLLSCAN) 與記憶體內排序 (SORT / $sort)"""
+    stages: List[str] = []
+    indexes: List[str] = []
+
+    def walk(node: Any):
+        if isinstance(node, dict):
+            stage = node.get("stage")
+            if isinstance(stage, str):
+                stages.append(stage)
+                if node.get("indexName"):
+                    indexes.append(node["indexName"])
+            if "$sort" in node:
+                stages.append("$sort")
+            for key, child in node.items():
+                # rejectedPlans 不會執行
+                if key != "rejectedPlans":
+                    walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+
+    walk(explain)
+    return {
+        "stages": stages,
+        "indexes": sorted(set(indexes)),
+        "collscan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages or "$sort" in stages,
+    }
+
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """pymongo 指令監聽：超過 SLOW_QUERY_THRESHOLD_MS 的查詢在背景 explain 並寫入 capped collection
+
+    - 監聽函式在 driver 的執行緒同步呼叫，只做門檻判斷，其餘交給事件迴圈上的背景工作
+    - 同一類查詢 (見 query_shape) 在 SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS 內只 explain 一次
+    - 連線池排隊時不 explain，佇列滿時丟棄樣本，慢查詢紀錄本身不會加重負載
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[Any, int], Tuple[str, str, Dict[str, Any]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._client = None
+        self._plans = LRUCache(maxsize=1000)   # fingerprint → (explain 時間, 計畫摘要)
+        self.captured = 0
+        self.dropped = 0
+        self.explained = 0
+
+    # === 指令監聽 (driver 執行緒) ===
+
+    def started(self, event):
+        if self._loop is None or event.command_name not in _EXPLAINABLE:
+            return
+        if event.database_name == "admin" or event.command.get(event.command_name) == SLOW_QUERY_COLLECTION:
+            return
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.database_name, event.command_name, event.command
+            )
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None or event.duration_micros < settings.SLOW_QUERY_THRESHOLD_MS * 1000:
+            return
+        database_name, command_name, command = pending
+        sample = {
+            "ts": datetime.utcnow(),
+            "database": database_name,
+            "command": command_name,
+            "collection": command.get(command_name),
+            "duration_ms": round(event.duration_micros / 1000, 1),
+            "failed": isinstance(event, monitoring.CommandFailedEvent),
+        }
+        try:
+            self._loop.call_soon_threadsafe(self._enqueue, sample, command)
+        except RuntimeError:
+            # 事件迴圈已關閉
+            pass
+
+    def _enqueue(self, sample: Dict[str, Any], command: Dict[str, Any]):
+        try:
+            self._queue.put_nowait((sample, command))
+            self.captured += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    # === 背景工作 (事件迴圈) ===
+
+    async def start(self, client, database):
+        """在 connect_to_mongo 之後呼叫"""
+        if not settings.SLOW_QUERY_ENABLED or self._task is not None:
+            return
+        self._client = client
+        try:
+            await database.create_collection(
+                SLOW_QUERY_COLLECTION, capped=True, size=settings.SLOW_QUERY_COLLECTION_SIZE_MB * 1024 * 1024
+            )
+        except CollectionInvalid:
+            pass  # 已存在
+        except Exception as e:
+            # 診斷功能不影響啟動；collection 不存在時第一次寫入會建立一般 collection
+            logger.warning("建立慢查詢 collection 失敗: %s", e)
+        self._queue = asyncio.Queue(maxsize=settings.SLOW_QUERY_QUEUE_SIZE)
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run(database[SLOW_QUERY_COLLECTION]))
+
+    async def stop(self):
+        self._loop = None
+        with self._lock:
+            self._pending.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run(self, collection):
+        while True:
+            sample, command = await self._queue.get()
+            try:
+                await self._record(collection, sample, command)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("紀錄慢查詢失敗")
+
+    async def _record(self, collection, sample: Dict[str, Any], command: Dict[str, Any]):
+        shape = _command_shape(sample["command"], command)
+        fingerprint = f'{sample["collection"]} {sample["command"]} {shape}'
+        # 形狀含 $ 開頭與帶點的欄位名，以字串保存
+        sample["fingerprint"] = fingerprint
+        sample["plan"] = await self._plan_for(fingerprint, sample["database"], command)
+
+        if sample["plan"].get("collscan") or sample["plan"].get("in_memory_sort"):
+            logger.warning("慢查詢", extra={
+                "collection": sample["collection"],
+                "duration_ms": sample["duration_ms"],
+                "collscan": sample["plan"].get("collscan"),
+                "in_memory_sort": sample["plan"].get("in_memory_sort"),
+            })
+        await collection.insert_one(sample)
+
+    async def _plan_for(self, fingerprint: str, database_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+        cached = self._plans.get(fingerprint)
+        if cached is not None and time.monotonic() - cached[0] < settings.SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS:
+            return cached[1]
+
+        from .database import pool_monitor
+        if pool_monitor.waiting > 0:
+            # 系統忙碌：這次不 explain，下一個樣本再試
+            return cached[1] if cached else {"skipped": "pool_busy"}
+
+        explainable = {key: value for key, value in command.items() if key not in _COMMAND_ONLY_FIELDS}
+        try:
+            explain = await self._client[database_name].command(
+                {"explain": explainable, "verbosity": "queryPlanner"}
+            )
+            plan = analyze_plan(explain)
+            self.explained += 1
+        except PyMongoError as e:
+            plan = {"error": str(e)}
+        self._plans.set(fingerprint, (time.monotonic(), plan))
+        return plan
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "explained": self.explained,
+        }
+
+
+slow_query_monitor = SlowQueryMonitor()
+
+
+async def top_slow_queries(database, limit: int = 20) -> List[Dict[str, Any]]:
+    """依查詢類型彙總慢查詢樣本，總耗時最多的排前面"""
+    pipeline = [
+        {"$sort": {"ts": 1}},
+        {"$group": {
+            "_id": "$fingerprint",
+            "collection": {"$last": "$collection"},
+            "command": {"$last": "$command"},
+            "count": {"$sum": 1},
+            "total_ms": {"$sum": "$duration_ms"},
+            "max_ms": {"$max": "$duration_ms"},
+            "avg_ms": {"$avg": "$duration_ms"},
+            "last_seen": {"$last": "$ts"},
+            "plan": {"$last": "$plan"},
+        }},
+        {"$sort": {"total_ms": -1}},
+        {"$limit": limit},
+    ]
+    results = await database[SLOW_QUERY_COLLECTION].aggregate(pipeline).to_list(length=limit)
+    for result in results:
+        result["fingerprint"] = result.pop("_id")
+    return results
@@ -0,0 +1,42 @@
+# app/core/startup.py - 啟動階段計時
+
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class StartupTimer:
+    """記錄每個啟動階段的耗時，用來量測 worker 開機時間"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float):
+        """記錄已經量好的階段耗時"""
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str):
+        """量測一個啟動階段 (例外時也會記錄)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @property
+    def total(self) -> float:
+        return sum(seconds for _, seconds in self.phases)
+
+    def as_dict(self):
+        """{階段: 毫秒}，供結構化日誌使用"""
+        durations = {name: round(seconds * 1000, 1) for name, seconds in self.phases}
+        durations["total"] = round(self.total * 1000, 1)
+        return durations
+
+    def report(self) -> str:
+        """回傳每個階段的耗時明細"""
+        lines = [f"  {name:<20} {seconds * 1000:>8.1f} ms" for name, seconds in self.phases]
+        lines.append(f"  {'total':<20} {self.total * 1000:>8.1f} ms")
+        return "\n".join(lines)
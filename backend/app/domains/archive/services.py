@@ -0,0 +1,143 @@
+# app/domains/archive/services.py - 冷資料分層
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from beanie import Document
+from beanie.odm.utils.parsing import parse_obj
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, DESCENDING, ReplaceOne
+
+from app.core.config import settings
+from app.core.database import db
+from app.domains.case.models import Case
+from app.domains.proposal.models import Proposal
+from app.shared.models.enums import CaseStatus, ProposalStatus
+
+
+class ArchivePolicy:
+    """哪些文件算冷資料，以及 archive collection 需要的索引 (列表查詢依 created_at 由新到舊)"""
+
+    def __init__(self, model: Type[Document], status: str, after_days: int, indexes: List[List[Tuple[str, int]]]):
+        self.model = model
+        self.status = status
+        self.after_days = after_days
+        self.indexes = indexes
+
+    def cold_query(self, now: datetime) -> Dict[str, Any]:
+        # 走 updated_at 索引 (終止狀態的文件之後不會再被修改)
+        return {
+            "updated_at": {"$lt": now - timedelta(days=self.after_days)},
+            "status": self.status
+        }
+
+
+POLICIES = {
+    Proposal: ArchivePolicy(Proposal, ProposalStatus.ARCHIVED.value, settings.PROPOSAL_ARCHIVE_AFTER_DAYS, [
+        [("seller_id", ASCENDING), ("created_at", DESCENDING)],
+        [("created_at", DESCENDING)],
+    ]),
+    Case: ArchivePolicy(Case, CaseStatus.REJECTED.value, settings.CASE_ARCHIVE_AFTER_DAYS, [
+        [("seller_id", ASCENDING), ("created_at", DESCENDING)],
+        [("buyer_id", ASCENDING), ("created_at", DESCENDING)],
+    ]),
+}
+
+
+def archive_collection(model: Type[Document]) -> AsyncIOMotorCollection:
+    return db.database[f"{model.get_collection_name()}_archive"]
+
+
+class ArchiveService:
+    """把終止狀態的舊文件移到 *_archive collection，讓常用 collection 與索引保持小到能放進記憶體
+
+    歸檔的文件只能讀取：單筆查詢會自動查 archive；列表只在明確要求 (include_archived) 時才讀 archive，
+    且一定帶條件與筆數上限。
+    """
+
+    @staticmethod
+    async def ensure_indexes():
+        for model, policy in POLICIES.items():
+            collection = archive_collection(model)
+            for keys in policy.indexes:
+                await collection.create_index(keys)
+
+    @staticmethod
+    async def archive_batch(model: Type[Document], batch_size: int, dry_run: bool = False) -> int:
+        """搬移一批冷資料，回傳搬移筆數
+
+        先 upsert 到 archive 再從常用 collection 刪除；中途失敗重跑也不會遺失或重複。
+        """
+        policy = POLICIES[model]
+        query = policy.cold_query(datetime.utcnow())
+        hot = model.get_motor_collection()
+        docs = await hot.find(query, limit=batch_size).to_list(None)
+        if not docs or dry_run:
+            return len(docs)
+
+        await archive_collection(model).bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs],
+            ordered=False
+        )
+        await hot.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}, "status": policy.status})
+        return len(docs)
+
+    @staticmethod
+    async def archive_cold(
+        model: Type[Document],
+        batch_size: Optional[int] = None,
+        pause_seconds: Optional[float] = None,
+        max_batches: Optional[int] = None,
+        dry_run: bool = False
+    ) -> int:
+        """分批搬移，每批之間暫停以免影響線上流量"""
+        batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        pause_seconds = settings.ARCHIVE_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = await ArchiveService.archive_batch(model, batch_size, dry_run)
+            total += moved
+            batches += 1
+            if moved < batch_size or dry_run:
+                break
+            await asyncio.sleep(pause_seconds)
+        return total
+
+    @staticmethod
+    async def get(model: Type[Document], document_id: str) -> Optional[Document]:
+        """從 archive 讀取單筆 (常用 collection 查不到時的後備)"""
+        try:
+            object_id = ObjectId(document_id)
+        except (InvalidId, TypeError):
+            return None
+        doc = await archive_collection(model).find_one({"_id": object_id})
+        return parse_obj(model, doc) if doc else None
+
+    @staticmethod
+    async def get_many(model: Type[Document], document_ids: List[str]) -> Dict[str, Document]:
+        """從 archive 批次讀取，回傳 {id: 文件}"""
+        object_ids = [ObjectId(document_id) for document_id in document_ids if ObjectId.is_valid(document_id)]
+        if not object_ids:
+            return {}
+        docs = archive_collection(model).find({"_id": {"$in": object_ids}})
+        return {str(doc["_id"]): parse_obj(model, doc) async for doc in docs}
+
+    @staticmethod
+    async def find(model: Type[Document], query: Dict[str, Any], limit: Optional[int] = None) -> List[Document]:
+        """從 archive 查詢列表，依 created_at 由新到舊，最多 limit 筆 (預設 ARCHIVE_LIST_LIMIT)
+
+        query 只能使用 POLICIES 索引的前綴欄位 (例如 seller_id)，空條件走 created_at 索引。
+        """
+        cursor = archive_collection(model).find(query, sort=[("created_at", DESCENDING)], limit=limit or settings.ARCHIVE_LIST_LIMIT)
+        return [parse_obj(model, doc) async for doc in cursor]
+
+
+def merge_newest_first(hot: List[Document], archived: List[Document]) -> List[Document]:
+    """合併常用與歸檔的列表 (依 created_at 由新到舊)"""
+    if not archived:
+        return hot
+    return sorted(hot + archived, key=lambda doc: doc.created_at, reverse=True)
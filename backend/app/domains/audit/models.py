@@ -0,0 +1,25 @@
+# app/domains/audit/models.py
+
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+from typing import Optional, Dict, Any
+from pymongo import IndexModel, ASCENDING
+
+
+class AuditEvent(Document):
+    """狀態轉換紀錄 (只新增不修改)"""
+    entity: str                                  # "proposal" / "case"
+    entity_id: str
+    action: str                                  # create / submit / review / ...
+    actor_id: Optional[str] = None               # 執行者 ID
+    from_status: Optional[str] = None
+    to_status: Optional[str] = None
+    details: Dict[str, Any] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        collection = "audit_events"
+        indexes = [
+            IndexModel([("entity", ASCENDING), ("entity_id", ASCENDING), ("created_at", ASCENDING)], name="entity_timeline"),
+        ]
@@ -0,0 +1,112 @@
+# app/domains/audit/services.py - 稽核紀錄
+
+import asyncio
+import contextvars
+import logging
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from .models import AuditEvent
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _plain(status):
+    return status.value if isinstance(status, Enum) else status
+
+
+class AuditLog:
+    """行程內緩衝的稽核紀錄
+
+    record() 只把事件放進記憶體；背景 task 每 AUDIT_FLUSH_INTERVAL_MS 或累積
+    AUDIT_BATCH_SIZE 筆時以一次 insert_many 寫入，請求不需要等待稽核寫入。
+    worker 異常終止時會遺失尚未寫入的事件 (最多一個批次間隔)。
+    """
+
+    def __init__(self):
+        self._events: List[Dict[str, Any]] = []
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+
+    def record(
+        self,
+        entity: str,
+        entity_id: str,
+        action: str,
+        actor_id: Optional[str] = None,
+        from_status: Optional[str] = None,
+        to_status: Optional[str] = None,
+        **details
+    ):
+        self._events.append({
+            "entity": entity,
+            "entity_id": entity_id,
+            "action": action,
+            "actor_id": actor_id,
+            "from_status": _plain(from_status),
+            "to_status": _plain(to_status),
+            "details": details,
+            "created_at": datetime.utcnow()
+        })
+        self._pending.set()
+        if len(self._events) >= settings.AUDIT_BATCH_SIZE:
+            self._full.set()
+        if self._task is None:
+            # 背景 task 不沿用第一個記錄事件的請求的 context (request id、寫入 session)
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self):
+        interval = settings.AUDIT_FLUSH_INTERVAL_MS / 1000
+        while True:
+            await self._pending.wait()
+            if len(self._events) < settings.AUDIT_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def flush(self):
+        """立即寫入緩衝中的事件"""
+        events, self._events = self._events, []
+        self._pending.clear()
+        self._full.clear()
+        if not events:
+            return
+
+        try:
+            await AuditEvent.get_motor_collection().insert_many(events, ordered=False)
+            self.written += len(events)
+        except asyncio.CancelledError:
+            self._events[:0] = events
+            raise
+        except Exception as e:
+            logger.error("稽核紀錄寫入失敗: %s", e, extra={"events": len(events)})
+            # 放回緩衝等下次重試，超過上限的最舊事件丟棄
+            self._events[:0] = events
+            overflow = len(self._events) - settings.AUDIT_MAX_BUFFER
+            if overflow > 0:
+                del self._events[:overflow]
+                self.dropped += overflow
+            self._pending.set()
+            await asyncio.sleep(1)
+
+    async def stop(self):
+        """關閉時寫入剩餘事件"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await self.flush()
+
+
+audit_log = AuditLog()
+
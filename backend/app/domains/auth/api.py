@@ -5,6 +5,8 @@ from .deps import get_current_active_user
 from app.domains.user.schemas import UserCreate, UserResponse
 from app.domains.user.services import UserService
 from app.domains.user.models import User
+from app.core.admission import rate_limit, concurrency_limit, by_client_ip
+from app.core.config import settings
 
 
 router = APIRouter(prefix="/auth", tags=["認證"])
@@ -28,7 +30,14 @@ async def register(user_data: UserCreate):
         )
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[
+        Depends(rate_limit("login", settings.LOGIN_RATE_PER_MINUTE, settings.LOGIN_RATE_BURST, key_func=by_client_ip)),
+        Depends(concurrency_limit("login", settings.LOGIN_CONCURRENCY_LIMIT)),
+    ]
+)
 async def login(login_data: LoginRequest):
     """用戶登入"""
     token_response = await AuthService.login(login_data)
@@ -2,6 +2,7 @@ from beanie import Document
 from pydantic import Field
 from datetime import datetime
 from typing import Optional
+from pymongo import IndexModel, ASCENDING
 
 
 class RefreshToken(Document):
@@ -12,4 +13,7 @@ class RefreshToken(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
-        collection = "refresh_tokens"
\ No newline at end of file
+        collection = "refresh_tokens"
+        indexes = [
+            IndexModel([("expires_at", ASCENDING)], name="expires_at"),  # 過期清理
+        ]
\ No newline at end of file
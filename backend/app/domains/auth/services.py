@@ -119,4 +119,20 @@ class AuthService:
             await refresh_token.update({"$set": {"is_active": False}})
             return True
         
-        return False
\ No newline at end of file
+        return False
+    
+    @staticmethod
+    async def cleanup_refresh_tokens(batch_size: int = 1000) -> int:
+        """分批刪除已過期的 refresh token，回傳刪除筆數 (排程工作)"""
+        collection = RefreshToken.get_motor_collection()
+        deleted = 0
+        while True:
+            expired = await collection.find(
+                {"expires_at": {"$lt": datetime.utcnow()}},
+                projection={"_id": 1},
+                limit=batch_size
+            ).to_list(None)
+            if not expired:
+                return deleted
+            result = await collection.delete_many({"_id": {"$in": [doc["_id"] for doc in expired]}})
+            deleted += result.deleted_count
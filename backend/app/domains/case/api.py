@@ -1,14 +1,17 @@
 # app/domains/case/api.py
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+import asyncio
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from datetime import datetime
+from typing import List, Optional
 from .schemas import (
     CaseCreate, CaseResponse, CaseListResponse, ContactInfo,
-    CommentCreate, CommentResponse
+    CommentCreate, CommentResponse, UnreadCounts
 )
 from .services import CaseService, CommentService
 from app.domains.auth.deps import get_current_active_user
 from app.domains.user.models import User
 from app.shared.models.enums import CaseStatus, UserRole
+from app.core.admission import list_endpoint_limits
 
 router = APIRouter(prefix="/cases", tags=["Cases"])
 
@@ -43,8 +46,11 @@ async def create_case(
             detail=str(e)
         )
 
-@router.get("/my-sent", response_model=List[CaseListResponse])
-async def get_my_sent_cases(current_user: User = Depends(get_current_active_user)):
+@router.get("/my-sent", response_model=List[CaseListResponse], dependencies=list_endpoint_limits("cases.my_sent"))
+async def get_my_sent_cases(
+    include_archived: bool = Query(False, description="合併已移到歸檔區的舊 case"),
+    current_user: User = Depends(get_current_active_user)
+):
     """獲取我發送的 cases (賣方功能)"""
     if current_user.role != UserRole.SELLER:
         raise HTTPException(
@@ -52,18 +58,19 @@ async def get_my_sent_cases(current_user: User = Depends(get_current_active_user
             detail="只有賣方可以查看發送的 cases"
         )
     
-    cases = await CaseService.get_seller_cases(str(current_user.id))
+    cases = await CaseService.get_seller_cases(str(current_user.id), include_archived)
     
     # 轉換為列表回應格式，並添加買方資訊
+    # 獲取買方基本資訊 (並行讀取，合併成一次查詢)
+    from app.domains.user.services import UserService
+    buyers = await asyncio.gather(
+        *(UserService.get_user_by_id(case.buyer_id) for case in cases),
+        return_exceptions=True
+    )
+    
     response_cases = []
-    for case in cases:
-        # 獲取買方基本資訊
-        try:
-            from app.domains.user.services import UserService
-            buyer = await UserService.get_user_by_id(case.buyer_id)
-            counterpart_info = buyer.email.split('@')[0] + "..." if buyer else "未知買方"
-        except:
-            counterpart_info = "未知買方"
+    for case, buyer in zip(cases, buyers):
+        counterpart_info = buyer.email.split('@')[0] + "..." if isinstance(buyer, User) else "未知買方"
         
         response_cases.append(CaseListResponse(
             id=str(case.id),
@@ -77,8 +84,11 @@ async def get_my_sent_cases(current_user: User = Depends(get_current_active_user
     
     return response_cases
 
-@router.get("/my-received", response_model=List[CaseListResponse])
-async def get_my_received_cases(current_user: User = Depends(get_current_active_user)):
+@router.get("/my-received", response_model=List[CaseListResponse], dependencies=list_endpoint_limits("cases.my_received"))
+async def get_my_received_cases(
+    include_archived: bool = Query(False, description="合併已移到歸檔區的舊 case"),
+    current_user: User = Depends(get_current_active_user)
+):
     """獲取我收到的 cases (買方功能)"""
     if current_user.role != UserRole.BUYER:
         raise HTTPException(
@@ -86,18 +96,19 @@ async def get_my_received_cases(current_user: User = Depends(get_current_active_
             detail="只有買方可以查看收到的 cases"
         )
     
-    cases = await CaseService.get_buyer_cases(str(current_user.id))
+    cases = await CaseService.get_buyer_cases(str(current_user.id), include_archived)
     
     # 轉換為列表回應格式，並添加賣方資訊
+    # 獲取賣方基本資訊 (並行讀取，合併成一次查詢)
+    from app.domains.user.services import UserService
+    sellers = await asyncio.gather(
+        *(UserService.get_user_by_id(case.seller_id) for case in cases),
+        return_exceptions=True
+    )
+    
     response_cases = []
-    for case in cases:
-        # 獲取賣方基本資訊
-        try:
-            from app.domains.user.services import UserService
-            seller = await UserService.get_user_by_id(case.seller_id)
-            counterpart_info = seller.email.split('@')[0] + "..." if seller else "未知賣方"
-        except:
-            counterpart_info = "未知賣方"
+    for case, seller in zip(cases, sellers):
+        counterpart_info = seller.email.split('@')[0] + "..." if isinstance(seller, User) else "未知賣方"
         
         response_cases.append(CaseListResponse(
             id=str(case.id),
@@ -111,6 +122,11 @@ async def get_my_received_cases(current_user: User = Depends(get_current_active_
     
     return response_cases
 
+@router.get("/unread", response_model=UnreadCounts)
+async def get_unread_counts(current_user: User = Depends(get_current_active_user)):
+    """我所有 cases 的未讀留言數 (收件匣未讀標記)"""
+    return await CommentService.get_unread_counts(str(current_user.id))
+
 @router.get("/{case_id}", response_model=CaseResponse)
 async def get_case(
     case_id: str,
@@ -290,7 +306,7 @@ async def create_comment(
             detail=str(e)
         )
 
-@router.get("/{case_id}/comments", response_model=List[CommentResponse])
+@router.get("/{case_id}/comments", response_model=List[CommentResponse], dependencies=list_endpoint_limits("cases.comments"))
 async def get_case_comments(
     case_id: str,
     current_user: User = Depends(get_current_active_user)
@@ -307,16 +323,16 @@ async def get_case_comments(
                 detail="Case 不存在"
             )
         
-        # 為每個留言添加用戶資訊
+        # 為每個留言添加用戶資訊 (並行讀取，合併成一次查詢)
+        from app.domains.user.services import UserService
+        users = await asyncio.gather(
+            *(UserService.get_user_by_id(comment.user_id) for comment in comments),
+            return_exceptions=True
+        )
+        
         response_comments = []
-        for comment in comments:
-            # 獲取留言者資訊
-            try:
-                from app.domains.user.services import UserService
-                user = await UserService.get_user_by_id(comment.user_id)
-                user_email = user.email if user else "未知用戶"
-            except:
-                user_email = "未知用戶"
+        for comment, user in zip(comments, users):
+            user_email = user.email if isinstance(user, User) else "未知用戶"
             
             response_data = comment.dict()
             response_data["user_email"] = user_email
@@ -330,4 +346,27 @@ async def get_case_comments(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+@router.post("/{case_id}/read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_case_read(
+    case_id: str,
+    up_to: Optional[datetime] = Query(None, description="已讀到的最後一則留言時間 (預設為現在)"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """把 case 的留言標記為已讀 (讀取留言列表不會改變已讀狀態，前端顯示留言後呼叫)"""
+    case = await CaseService.get_case_by_id(case_id)
+    if not case:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Case 不存在"
+        )
+    
+    user_id = str(current_user.id)
+    if case.seller_id != user_id and case.buyer_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="只有買賣雙方可以標記此 case 的留言"
+        )
+    
+    await CommentService.mark_read(case_id, user_id, up_to)
@@ -0,0 +1,80 @@
+# app/domains/case/expiry.py - 逾期未回應的 case
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .models import Case
+from .services import _forget_case
+from app.core.config import settings
+from app.domains.audit.services import audit_log
+from app.domains.counters.services import StatusCounterService
+from app.shared.models.enums import CaseStatus
+
+
+class CaseExpiryService:
+    """把 created 狀態超過 CASE_EXPIRE_AFTER_DAYS 天的 case 標記為 expired
+
+    以 (status, created_at) 索引只讀取到期的 case，每批最多 batch_size 筆、以一次
+    update_many 更新，批次之間暫停，排程每幾分鐘執行一次即可持續清理而不造成尖峰。
+    """
+
+    @staticmethod
+    async def expire_batch(cutoff: datetime, batch_size: int) -> int:
+        """處理一批到期的 case，回傳實際標記為 expired 的筆數 (沒有到期的 case 時回傳 -1)"""
+        collection = Case.get_motor_collection()
+        due = await collection.find(
+            {"status": CaseStatus.CREATED.value, "created_at": {"$lt": cutoff}},
+            projection={"_id": 1},
+            sort=[("created_at", 1)],
+            limit=batch_size
+        ).to_list(None)
+        if not due:
+            return -1
+
+        # 本批共用同一個 expired_at，事後用它找出真的由本批轉換的 case
+        # (查詢與更新之間買方可能剛好表達興趣或拒絕)
+        now = datetime.utcnow().replace(microsecond=0)
+        ids = [doc["_id"] for doc in due]
+        await collection.update_many(
+            {"_id": {"$in": ids}, "status": CaseStatus.CREATED.value},
+            {"$set": {"status": CaseStatus.EXPIRED.value, "expired_at": now, "updated_at": now}}
+        )
+        expired = await collection.find(
+            {"_id": {"$in": ids}, "status": CaseStatus.EXPIRED.value, "expired_at": now},
+            projection={"seller_id": 1, "buyer_id": 1}
+        ).to_list(None)
+
+        for doc in expired:
+            case_id = str(doc["_id"])
+            _forget_case(case_id)
+            audit_log.record("case", case_id, "expire", None, CaseStatus.CREATED, CaseStatus.EXPIRED)
+        await StatusCounterService.cases_transitioned(
+            [(doc["seller_id"], doc["buyer_id"]) for doc in expired], CaseStatus.CREATED, CaseStatus.EXPIRED
+        )
+        return len(expired)
+
+    @staticmethod
+    async def expire_due(
+        batch_size: Optional[int] = None,
+        pause: Optional[float] = None,
+        max_batches: int = 0
+    ) -> int:
+        """處理所有到期的 case (排程工作)，回傳標記為 expired 的筆數"""
+        if settings.CASE_EXPIRE_AFTER_DAYS <= 0:
+            return 0
+        batch_size = batch_size or settings.CASE_EXPIRY_BATCH_SIZE
+        pause = settings.CASE_EXPIRY_BATCH_PAUSE_SECONDS if pause is None else pause
+
+        cutoff = datetime.utcnow() - timedelta(days=settings.CASE_EXPIRE_AFTER_DAYS)
+        total = 0
+        batches = 0
+        while True:
+            expired = await CaseExpiryService.expire_batch(cutoff, batch_size)
+            if expired < 0:
+                return total
+            total += expired
+            batches += 1
+            if max_batches and batches >= max_batches:
+                return total
+            await asyncio.sleep(pause)
@@ -3,6 +3,7 @@ from beanie import Document
 from pydantic import Field
 from datetime import datetime
 from typing import Optional
+from pymongo import IndexModel, ASCENDING
 from app.shared.models.enums import CaseStatus
 
 class Case(Document):
@@ -11,10 +12,11 @@ class Case(Document):
     seller_id: str = Field(..., index=True)    # 賣方 ID (提案方)
     buyer_id: str = Field(..., index=True)     # 買方 ID
     
-    # 提案內容 (從 proposal 複製)
-    title: str                                  # 提案標題
-    brief_content: str                          # 簡介內容 (買方可見)
-    detailed_content: str                       # 詳細內容 (簽 NDA 後可見)
+    # 提案內容 - 新 case 只存快照雜湊，內容由 ProposalSnapshot 共用
+    title: str                                  # 提案標題 (列表顯示用)
+    snapshot_hash: Optional[str] = None         # 發送當下的提案內容快照
+    brief_content: Optional[str] = None         # 簡介內容 (舊資料直接存放；讀取時由快照補上)
+    detailed_content: Optional[str] = None      # 詳細內容 (舊資料直接存放；讀取時由快照補上)
     
     # 狀態管理
     status: CaseStatus = Field(default=CaseStatus.CREATED)
@@ -25,12 +27,18 @@ class Case(Document):
     interested_at: Optional[datetime] = None    # 表達興趣時間
     rejected_at: Optional[datetime] = None      # 拒絕時間
     nda_signed_at: Optional[datetime] = None    # NDA 簽署時間
+    expired_at: Optional[datetime] = None       # 逾期時間
     
     # 可選的初始訊息
     initial_message: Optional[str] = None       # 賣方發送時的初始訊息
     
     class Settings:
         collection = "cases"
+        indexes = [
+            "updated_at",  # cache_bus 輪詢用
+            # 逾期清理：只掃描到期的 created case
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+        ]
 
 class Comment(Document):
     # 關聯資訊
@@ -44,4 +52,21 @@ class Comment(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
-        collection = "comments"
\ No newline at end of file
+        collection = "comments"
+        indexes = [
+            # 留言列表與未讀數 (某時間點之後的留言) 都走這個索引
+            IndexModel([("case_id", ASCENDING), ("created_at", ASCENDING)], name="case_timeline"),
+        ]
+
+class CaseReadCursor(Document):
+    """每位參與者在每個 case 的已讀位置與未讀留言數"""
+    case_id: str
+    user_id: str
+    last_read_at: Optional[datetime] = None     # 已讀到的最後一則留言時間
+    unread: int = 0                             # 之後對方的留言數 (新留言時 $inc)
+    
+    class Settings:
+        collection = "case_read_cursors"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("case_id", ASCENDING)], name="user_case", unique=True),
+        ]
\ No newline at end of file
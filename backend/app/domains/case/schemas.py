@@ -1,7 +1,7 @@
 # app/domains/case/schemas.py
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from app.shared.models.enums import CaseStatus
 
 # === Case Schemas ===
@@ -27,6 +27,7 @@ class CaseResponse(BaseModel):
     interested_at: Optional[datetime] = None
     rejected_at: Optional[datetime] = None
     nda_signed_at: Optional[datetime] = None
+    expired_at: Optional[datetime] = None
     initial_message: Optional[str] = None
 
 class CaseListResponse(BaseModel):
@@ -64,6 +65,11 @@ class CommentResponse(BaseModel):
     user_email: Optional[str] = None
     is_seller: bool = False  # 是否為賣方留言
 
+class UnreadCounts(BaseModel):
+    """未讀留言數"""
+    total: int = 0
+    cases: Dict[str, int] = Field(default_factory=dict)  # case_id → 未讀數 (只列出有未讀的)
+
 # === 狀態操作 Schemas ===
 
 class CaseStatusUpdate(BaseModel):
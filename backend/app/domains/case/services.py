@@ -1,21 +1,54 @@
 # app/domains/case/services.py
-from typing import Optional, List
+import asyncio
+from typing import Optional, List, Dict
 from datetime import datetime
 from beanie import PydanticObjectId
-from .models import Case, Comment
-from .schemas import CaseCreate, ContactInfo, CommentCreate
+from pymongo.errors import DuplicateKeyError
+from .models import Case, Comment, CaseReadCursor
+from .schemas import CaseCreate, ContactInfo, CommentCreate, UnreadCounts
+from app.core.cache_bus import cache_bus
+from app.core.identity_map import forget_document, load_document
+from app.core.read_routing import current_session, find_for_read, get_for_read, get_many_for_read, write_flow
+from app.domains.archive.services import ArchiveService, merge_newest_first
+from app.domains.audit.services import audit_log
+from app.domains.counters.services import StatusCounterService
 from app.domains.proposal.models import Proposal
+from app.domains.proposal.services import ProposalService
 from app.domains.user.models import User
+from app.domains.user.services import UserService
 from app.shared.models.enums import CaseStatus, ProposalStatus
+from app.shared.utils.cache import SingleFlight
+
+# 同一 case 的並行讀取共用一次查詢
+_case_flights = SingleFlight()
+
+# 標記已讀時游標被並行修改 (新留言 $inc) 的重試次數
+MARK_READ_ATTEMPTS = 3
+
+
+def _forget_case(case_id: str):
+    """case 已修改：不再共用進行中的查詢，也不再重用本請求已載入的文件"""
+    _case_flights.forget(case_id)
+    forget_document(Case, case_id)
+
+
+def _evict_case(case_id: Optional[str]):
+    """其他 worker 修改了 case (cache_bus 通知)：之後的讀取不再併入修改前開始的查詢"""
+    _case_flights.forget(case_id)
+
+
+cache_bus.subscribe(Case, _evict_case)
+
 
 class CaseService:
     
     @staticmethod
+    @write_flow
     async def create_case(data: CaseCreate, seller_id: str) -> Case:
         """從 approved proposal 創建 case 發送給買方"""
         # 1. 驗證 proposal 存在且已被核准
         try:
-            proposal = await Proposal.get(PydanticObjectId(data.proposal_id))
+            proposal = await Proposal.get(PydanticObjectId(data.proposal_id), session=current_session())
         except:
             raise ValueError("提案不存在")
         
@@ -30,7 +63,7 @@ class CaseService:
         
         # 2. 驗證買方存在
         try:
-            buyer = await User.get(PydanticObjectId(data.buyer_id))
+            buyer = await User.get(PydanticObjectId(data.buyer_id), session=current_session())
         except:
             raise ValueError("買方不存在")
         
@@ -41,44 +74,97 @@ class CaseService:
         existing_case = await Case.find_one({
             "proposal_id": data.proposal_id,
             "buyer_id": data.buyer_id
-        })
+        }, session=current_session())
         
         if existing_case:
             raise ValueError("已經向此買方發送過此提案")
         
-        # 4. 創建 case
+        # 4. 取得發送當下的內容快照 (同內容的 case 共用一份)
+        snapshot = await ProposalService.get_or_create_snapshot(
+            data.proposal_id,
+            proposal.title,
+            proposal.brief_content,
+            proposal.detailed_content
+        )
+        
+        # 5. 創建 case
         case = Case(
             proposal_id=data.proposal_id,
             seller_id=seller_id,
             buyer_id=data.buyer_id,
-            title=proposal.title,
-            brief_content=proposal.brief_content,
-            detailed_content=proposal.detailed_content,
+            title=snapshot.title,
+            snapshot_hash=snapshot.content_hash,
             initial_message=data.initial_message,
             status=CaseStatus.CREATED
         )
         
-        return await case.insert()
+        case = await case.insert(session=current_session())
+        audit_log.record(
+            "case", str(case.id), "create", seller_id, None, CaseStatus.CREATED,
+            proposal_id=data.proposal_id, buyer_id=data.buyer_id
+        )
+        await StatusCounterService.case_transition(seller_id, data.buyer_id, None, CaseStatus.CREATED)
+        case.brief_content = snapshot.brief_content
+        case.detailed_content = snapshot.detailed_content
+        return case
     
     @staticmethod
     async def get_case_by_id(case_id: str) -> Optional[Case]:
-        """通過 ID 獲取 case"""
-        try:
-            return await Case.get(PydanticObjectId(case_id))
-        except:
-            return None
+        """通過 ID 獲取 case (每個請求最多讀一次；寫入流程外可讀 secondary，並行的相同讀取共用一次查詢)"""
+        return await load_document(Case, case_id, CaseService._fetch_cases, CaseService._load_case)
+    
+    @staticmethod
+    async def _fetch_cases(case_ids: List[str]) -> Dict[str, Case]:
+        if len(case_ids) == 1:
+            case_id = case_ids[0]
+            return {case_id: await _case_flights.do(case_id, lambda: CaseService._load_case(case_id))}
+        
+        cases = await get_many_for_read(Case, case_ids)
+        missing = [case_id for case_id in case_ids if case_id not in cases]
+        if missing:
+            cases.update(await ArchiveService.get_many(Case, missing))
+        await asyncio.gather(*(CaseService.resolve_content(case) for case in cases.values()))
+        return cases
+    
+    @staticmethod
+    async def _load_case(case_id: str) -> Optional[Case]:
+        case = await get_for_read(Case, case_id)
+        if case is None:
+            case = await ArchiveService.get(Case, case_id)
+        if case:
+            await CaseService.resolve_content(case)
+        return case
     
     @staticmethod
-    async def get_seller_cases(seller_id: str) -> List[Case]:
-        """獲取賣方發送的所有 cases"""
-        return await Case.find({"seller_id": seller_id}).sort(-Case.created_at).to_list()
+    async def resolve_content(case: Case) -> Case:
+        """從快照補上 case 的提案內容 (只在記憶體中，不寫回資料庫)"""
+        if case.snapshot_hash and case.detailed_content is None:
+            snapshot = await ProposalService.get_snapshot(case.snapshot_hash)
+            if snapshot:
+                case.brief_content = snapshot.brief_content
+                case.detailed_content = snapshot.detailed_content
+        return case
     
     @staticmethod
-    async def get_buyer_cases(buyer_id: str) -> List[Case]:
-        """獲取買方收到的所有 cases"""
-        return await Case.find({"buyer_id": buyer_id}).sort(-Case.created_at).to_list()
+    async def get_seller_cases(seller_id: str, include_archived: bool = False) -> List[Case]:
+        """獲取賣方發送的 cases (include_archived 時合併最近的歸檔 case)"""
+        cases = await find_for_read(Case, {"seller_id": seller_id}, sort=[("created_at", -1)])
+        if include_archived:
+            cases = merge_newest_first(cases, await ArchiveService.find(Case, {"seller_id": seller_id}))
+        return cases
     
     @staticmethod
+    async def get_buyer_cases(buyer_id: str, include_archived: bool = False) -> List[Case]:
+        """獲取買方收到的 cases (不含已逾期；include_archived 時合併最近的歸檔 case)"""
+        cases = await find_for_read(
+            Case, {"buyer_id": buyer_id, "status": {"$ne": CaseStatus.EXPIRED}}, sort=[("created_at", -1)]
+        )
+        if include_archived:
+            cases = merge_newest_first(cases, await ArchiveService.find(Case, {"buyer_id": buyer_id}))
+        return cases
+    
+    @staticmethod
+    @write_flow
     async def express_interest(case_id: str, buyer_id: str) -> Optional[Case]:
         """買方表達興趣 (created → interested)"""
         case = await CaseService.get_case_by_id(case_id)
@@ -100,10 +186,21 @@ class CaseService:
             "updated_at": datetime.utcnow()
         }
         
-        await case.update({"$set": update_data})
+        # 條件式更新：與逾期排程或重複請求同時發生時只有一方成功
+        result = await Case.get_motor_collection().update_one(
+            {"_id": case.id, "status": CaseStatus.CREATED.value},
+            {"$set": update_data},
+            session=current_session()
+        )
+        _forget_case(case_id)
+        if result.matched_count == 0:
+            raise ValueError("只有 created 狀態的 case 可以表達興趣")
+        audit_log.record("case", case_id, "interest", buyer_id, CaseStatus.CREATED, CaseStatus.INTERESTED)
+        await StatusCounterService.case_transition(case.seller_id, buyer_id, CaseStatus.CREATED, CaseStatus.INTERESTED)
         return await CaseService.get_case_by_id(case_id)
     
     @staticmethod
+    @write_flow
     async def reject_case(case_id: str, buyer_id: str) -> Optional[Case]:
         """買方拒絕 case (created → rejected)"""
         case = await CaseService.get_case_by_id(case_id)
@@ -125,10 +222,21 @@ class CaseService:
             "updated_at": datetime.utcnow()
         }
         
-        await case.update({"$set": update_data})
+        # 條件式更新：與逾期排程或重複請求同時發生時只有一方成功
+        result = await Case.get_motor_collection().update_one(
+            {"_id": case.id, "status": CaseStatus.CREATED.value},
+            {"$set": update_data},
+            session=current_session()
+        )
+        _forget_case(case_id)
+        if result.matched_count == 0:
+            raise ValueError("只有 created 狀態的 case 可以拒絕")
+        audit_log.record("case", case_id, "reject", buyer_id, CaseStatus.CREATED, CaseStatus.REJECTED)
+        await StatusCounterService.case_transition(case.seller_id, buyer_id, CaseStatus.CREATED, CaseStatus.REJECTED)
         return await CaseService.get_case_by_id(case_id)
     
     @staticmethod
+    @write_flow
     async def sign_nda(case_id: str, buyer_id: str) -> Optional[Case]:
         """買方簽署 NDA (interested → nda_signed)"""
         case = await CaseService.get_case_by_id(case_id)
@@ -150,7 +258,17 @@ class CaseService:
             "updated_at": datetime.utcnow()
         }
         
-        await case.update({"$set": update_data})
+        # 條件式更新：重複或並行的簽署請求只有一個成功，稽核與計數只記一次
+        result = await Case.get_motor_collection().update_one(
+            {"_id": case.id, "status": CaseStatus.INTERESTED.value},
+            {"$set": update_data},
+            session=current_session()
+        )
+        _forget_case(case_id)
+        if result.matched_count == 0:
+            raise ValueError("只有 interested 狀態的 case 可以簽署 NDA")
+        audit_log.record("case", case_id, "sign_nda", buyer_id, CaseStatus.INTERESTED, CaseStatus.NDA_SIGNED)
+        await StatusCounterService.case_transition(case.seller_id, buyer_id, CaseStatus.INTERESTED, CaseStatus.NDA_SIGNED)
         return await CaseService.get_case_by_id(case_id)
     
     @staticmethod
@@ -168,12 +286,11 @@ class CaseService:
         if case.status != CaseStatus.NDA_SIGNED:
             raise ValueError("只有簽署 NDA 後才能查看聯絡資訊")
         
-        # 獲取雙方用戶資訊
-        try:
-            seller = await User.get(PydanticObjectId(case.seller_id))
-            buyer = await User.get(PydanticObjectId(case.buyer_id))
-        except:
-            raise ValueError("無法獲取用戶資訊")
+        # 獲取雙方用戶資訊 (同一 tick 的兩個讀取合併成一次查詢)
+        seller, buyer = await asyncio.gather(
+            UserService.get_user_by_id(case.seller_id),
+            UserService.get_user_by_id(case.buyer_id)
+        )
         
         if not seller or not buyer:
             raise ValueError("無法獲取用戶資訊")
@@ -188,6 +305,7 @@ class CaseService:
 class CommentService:
     
     @staticmethod
+    @write_flow
     async def create_comment(case_id: str, data: CommentCreate, user_id: str) -> Comment:
         """在指定 case 下創建留言"""
         # 1. 驗證 case 存在
@@ -206,7 +324,26 @@ class CommentService:
             content=data.content
         )
         
-        return await comment.insert()
+        comment = await comment.insert(session=current_session())
+        
+        # 4. 對方的未讀數 +1 (對方已讀位置在這則留言之後時不加；MongoDB 時間只到毫秒)
+        recipient_id = case.buyer_id if user_id == case.seller_id else case.seller_id
+        created_at = comment.created_at.replace(microsecond=comment.created_at.microsecond // 1000 * 1000)
+        try:
+            await CaseReadCursor.get_motor_collection().update_one(
+                {
+                    "user_id": recipient_id,
+                    "case_id": case_id,
+                    "$or": [{"last_read_at": None}, {"last_read_at": {"$lt": created_at}}]
+                },
+                {"$inc": {"unread": 1}, "$setOnInsert": {"last_read_at": None}},
+                upsert=True,
+                session=current_session()
+            )
+        except DuplicateKeyError:
+            # 游標已存在且已讀到這則留言之後 (標記已讀時已重新計算)
+            pass
+        return comment
     
     @staticmethod
     async def get_case_comments(case_id: str, user_id: str) -> List[Comment]:
@@ -220,4 +357,54 @@ class CommentService:
             raise ValueError("只有買賣雙方可以查看此 case 的留言")
         
         # 2. 獲取留言 (按時間排序，新的在前面)
-        return await Comment.find({"case_id": case_id}).sort(-Comment.created_at).to_list()
\ No newline at end of file
+        return await find_for_read(Comment, {"case_id": case_id}, sort=[("created_at", -1)])
+    
+    @staticmethod
+    @write_flow
+    async def mark_read(case_id: str, user_id: str, up_to: Optional[datetime] = None):
+        """標記已讀到 up_to (預設為現在)，並以 (case_id, created_at) 索引重新計算之後的未讀數
+
+        已讀位置只會往後移。寫回以讀到的 (last_read_at, unread) 為條件：重新計算期間有新留言 $inc 就重讀再算，
+        不會蓋掉那次 $inc；已讀位置之前的留言 $inc 不會生效 (見 create_comment)。
+        """
+        up_to = up_to or datetime.utcnow()
+        collection = CaseReadCursor.get_motor_collection()
+        for _ in range(MARK_READ_ATTEMPTS):
+            cursor = await collection.find_one({"user_id": user_id, "case_id": case_id}, session=current_session())
+            last_read_at = cursor.get("last_read_at") if cursor else None
+            previous_unread = cursor.get("unread", 0) if cursor else 0
+            if last_read_at and last_read_at >= up_to and previous_unread == 0:
+                return
+            read_to = max(up_to, last_read_at) if last_read_at else up_to
+            
+            unread = await Comment.find({
+                "case_id": case_id,
+                "created_at": {"$gt": read_to},
+                "user_id": {"$ne": user_id}
+            }, session=current_session()).count()
+            
+            if cursor is None:
+                try:
+                    await collection.insert_one(
+                        {"user_id": user_id, "case_id": case_id, "last_read_at": read_to, "unread": unread},
+                        session=current_session()
+                    )
+                    return
+                except DuplicateKeyError:
+                    # 同時有新留言或另一個標記已讀建立了游標，重讀再算
+                    continue
+            
+            result = await collection.update_one(
+                {"_id": cursor["_id"], "last_read_at": last_read_at, "unread": previous_unread},
+                {"$set": {"last_read_at": read_to, "unread": unread}},
+                session=current_session()
+            )
+            if result.matched_count:
+                return
+    
+    @staticmethod
+    async def get_unread_counts(user_id: str) -> UnreadCounts:
+        """用戶所有 case 的未讀留言數 (只讀游標，不需要下載留言)"""
+        cursors = await find_for_read(CaseReadCursor, {"user_id": user_id, "unread": {"$gt": 0}})
+        cases = {cursor.case_id: cursor.unread for cursor in cursors}
+        return UnreadCounts(total=sum(cases.values()), cases=cases)
@@ -0,0 +1,14 @@
+# app/domains/counters/api.py
+from fastapi import APIRouter, Depends
+from .schemas import StatusCountsResponse
+from .services import StatusCounterService
+from app.domains.auth.deps import get_current_active_user
+from app.domains.user.models import User
+
+router = APIRouter(prefix="/counters", tags=["Counters"])
+
+
+@router.get("/me", response_model=StatusCountsResponse)
+async def get_my_status_counts(current_user: User = Depends(get_current_active_user)):
+    """我的各狀態數量 (賣方：提案與發送的 cases；買方：收到的 cases)"""
+    return await StatusCounterService.get_counts(str(current_user.id), current_user.role)
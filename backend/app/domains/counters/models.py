@@ -0,0 +1,23 @@
+# app/domains/counters/models.py
+
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+from typing import Dict
+from pymongo import IndexModel, ASCENDING
+
+
+class StatusCounters(Document):
+    """每位用戶各狀態的提案/case 數量 (狀態轉換時以 $inc 維護)"""
+    user_id: str
+    proposals: Dict[str, int] = Field(default_factory=dict)       # 賣方的提案
+    cases_sent: Dict[str, int] = Field(default_factory=dict)      # 賣方發送的 case
+    cases_received: Dict[str, int] = Field(default_factory=dict)  # 買方收到的 case
+    revision: int = 0                                             # 每次修改 +1，修復時用來偵測並行修改
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        collection = "status_counters"
+        indexes = [
+            IndexModel([("user_id", ASCENDING)], name="user_id", unique=True),
+        ]
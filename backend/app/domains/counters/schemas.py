@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Dict
+
+
+class StatusCountsResponse(BaseModel):
+    """依狀態的數量 (與角色無關的分類為空)"""
+    proposals: Dict[str, int] = Field(default_factory=dict)
+    cases_sent: Dict[str, int] = Field(default_factory=dict)
+    cases_received: Dict[str, int] = Field(default_factory=dict)
+
+
+class CounterRepairReport(BaseModel):
+    checked: int = 0      # 檢查的用戶數
+    repaired: int = 0     # 數量有誤並已修正
+    skipped: int = 0      # 重新計算期間有新的狀態轉換，留待下次修復
@@ -0,0 +1,211 @@
+# app/domains/counters/services.py - 每位用戶依狀態的數量
+
+import asyncio
+import logging
+from datetime import datetime
+from enum import Enum
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from .models import StatusCounters
+from .schemas import CounterRepairReport, StatusCountsResponse
+from app.core.config import settings
+from app.core.read_routing import current_session, find_for_read
+from app.domains.archive.services import archive_collection
+from app.domains.case.models import Case
+from app.domains.proposal.models import Proposal
+from app.shared.models.enums import CaseStatus, ProposalStatus, UserRole
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("proposals", "cases_sent", "cases_received")
+
+# 各計數欄位的來源：(model, 用戶欄位, 計數欄位)；歸檔的文件仍然計入
+_SOURCES = (
+    (Proposal, "seller_id", "proposals"),
+    (Case, "seller_id", "cases_sent"),
+    (Case, "buyer_id", "cases_received"),
+)
+
+
+def _plain(status):
+    return status.value if isinstance(status, Enum) else status
+
+
+def _delta(stored: Dict[str, Any], actual: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    """把 stored 修正成 actual 所需的 $inc (只含不為 0 的差值)"""
+    inc: Dict[str, int] = {}
+    for name in COUNTER_FIELDS:
+        current = stored.get(name) or {}
+        for status in current.keys() | actual[name].keys():
+            diff = actual[name].get(status, 0) - current.get(status, 0)
+            if diff:
+                inc[f"{name}.{status}"] = diff
+    return inc
+
+
+def _fill(statuses: Type[Enum], counts: Dict[str, int]) -> Dict[str, int]:
+    return {status.value: counts.get(status.value, 0) for status in statuses}
+
+
+class StatusCounterService:
+    """列表頁的狀態徽章：一次讀取一份計數文件，不必下載整個列表來計算
+
+    計數在每次建立/狀態轉換時以 $inc 原子更新 (寫入流程內與狀態更新使用同一個 session)。
+    更新計數失敗不影響狀態轉換本身；漂移由 scripts/repair_status_counters.py 修正。
+    """
+
+    @staticmethod
+    async def _apply(user_id: str, field: str, from_status, to_status):
+        inc: Dict[str, int] = {"revision": 1}
+        if from_status is not None:
+            key = f"{field}.{_plain(from_status)}"
+            inc[key] = inc.get(key, 0) - 1
+        if to_status is not None:
+            key = f"{field}.{_plain(to_status)}"
+            inc[key] = inc.get(key, 0) + 1
+
+        try:
+            await StatusCounters.get_motor_collection().update_one(
+                {"user_id": user_id},
+                {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True,
+                session=current_session()
+            )
+        except PyMongoError as e:
+            logger.warning("狀態計數更新失敗: %s", e, extra={"user_id": user_id, "field": field})
+
+    @staticmethod
+    async def proposal_transition(seller_id: str, from_status: Optional[ProposalStatus], to_status: Optional[ProposalStatus]):
+        """提案建立 (from_status=None)、狀態轉換或刪除 (to_status=None)"""
+        await StatusCounterService._apply(seller_id, "proposals", from_status, to_status)
+
+    @staticmethod
+    async def case_transition(
+        seller_id: str, buyer_id: str, from_status: Optional[CaseStatus], to_status: Optional[CaseStatus]
+    ):
+        """case 建立 (from_status=None) 或狀態轉換，同時更新賣方與買方的計數"""
+        await StatusCounterService._apply(seller_id, "cases_sent", from_status, to_status)
+        await StatusCounterService._apply(buyer_id, "cases_received", from_status, to_status)
+
+    @staticmethod
+    async def cases_transitioned(
+        participants: List[Tuple[str, str]], from_status: CaseStatus, to_status: CaseStatus
+    ):
+        """批次狀態轉換：participants 為每個 case 的 (seller_id, buyer_id)，同一用戶的變動合併成一次 $inc"""
+        moved = Counter()
+        for seller_id, buyer_id in participants:
+            moved[(seller_id, "cases_sent")] += 1
+            moved[(buyer_id, "cases_received")] += 1
+        if not moved:
+            return
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"user_id": user_id},
+                {
+                    "$inc": {
+                        f"{field}.{_plain(from_status)}": -count,
+                        f"{field}.{_plain(to_status)}": count,
+                        "revision": 1
+                    },
+                    "$set": {"updated_at": now}
+                },
+                upsert=True
+            )
+            for (user_id, field), count in moved.items()
+        ]
+        try:
+            await StatusCounters.get_motor_collection().bulk_write(
+                operations, ordered=False, session=current_session()
+            )
+        except PyMongoError as e:
+            logger.warning("狀態計數批次更新失敗: %s", e)
+
+    @staticmethod
+    async def get_counts(user_id: str, role: UserRole) -> StatusCountsResponse:
+        """依角色回傳各狀態數量 (所有狀態都會列出，沒有的為 0)"""
+        found = await find_for_read(StatusCounters, {"user_id": user_id}, limit=1)
+        counters = found[0] if found else StatusCounters(user_id=user_id)
+
+        response = StatusCountsResponse()
+        if role == UserRole.SELLER:
+            response.proposals = _fill(ProposalStatus, counters.proposals)
+            response.cases_sent = _fill(CaseStatus, counters.cases_sent)
+        elif role == UserRole.BUYER:
+            response.cases_received = _fill(CaseStatus, counters.cases_received)
+        return response
+
+    @staticmethod
+    async def _count_actual(user_ids: Optional[List[str]]) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """從 proposals/cases (含 archive) 重新計算，回傳 {user_id: {計數欄位: {狀態: 數量}}}"""
+        actual: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for model, user_field, field in _SOURCES:
+            match = {user_field: {"$in": user_ids}} if user_ids else {}
+            pipeline = [
+                {"$match": match},
+                {"$group": {"_id": {"user": f"${user_field}", "status": "$status"}, "count": {"$sum": 1}}},
+            ]
+            for collection in (model.get_motor_collection(), archive_collection(model)):
+                async for row in collection.aggregate(pipeline):
+                    user_id, status = row["_id"].get("user"), row["_id"].get("status")
+                    if user_id is None or status is None:
+                        continue
+                    counts = actual.setdefault(user_id, {name: {} for name in COUNTER_FIELDS})[field]
+                    counts[status] = counts.get(status, 0) + row["count"]
+        return actual
+
+    @staticmethod
+    async def repair(user_ids: Optional[List[str]] = None, dry_run: bool = False) -> CounterRepairReport:
+        """重新計算並修正計數 (user_ids 未指定時檢查所有用戶)
+
+        狀態轉換是先寫入狀態、再 $inc 計數，兩者之間的轉換會同時被算進實際數量、又在稍後 $inc 一次。
+        所以先讀計數 (記下 revision) 再重新計算，等待 COUNTER_REPAIR_SETTLE_SECONDS 讓進行中的轉換寫完計數，
+        revision 有變的用戶略過 (下次執行再修)；修正以差值 $inc 寫回，與之後的轉換互不覆蓋。
+        """
+        collection = StatusCounters.get_motor_collection()
+        match = {"user_id": {"$in": user_ids}} if user_ids else {}
+        stored = {doc["user_id"]: doc async for doc in collection.find(match)}
+        actual = await StatusCounterService._count_actual(user_ids)
+
+        report = CounterRepairReport()
+        drifted: Dict[str, Dict[str, int]] = {}
+        for user_id in stored.keys() | actual.keys():
+            report.checked += 1
+            counts = actual.get(user_id) or {name: {} for name in COUNTER_FIELDS}
+            inc = _delta(stored.get(user_id, {}), counts)
+            if inc:
+                drifted[user_id] = inc
+        if not drifted:
+            return report
+
+        await asyncio.sleep(settings.COUNTER_REPAIR_SETTLE_SECONDS)
+        settled = {
+            doc["user_id"]: doc.get("revision", 0)
+            async for doc in collection.find({"user_id": {"$in": list(drifted)}}, {"user_id": 1, "revision": 1})
+        }
+
+        for user_id, inc in drifted.items():
+            current = stored.get(user_id)
+            revision = current.get("revision", 0) if current is not None else None
+            if settled.get(user_id) != revision:
+                report.skipped += 1
+                continue
+            if dry_run:
+                report.repaired += 1
+                continue
+            try:
+                await collection.update_one(
+                    {"user_id": user_id},
+                    {"$inc": {**inc, "revision": 1}, "$set": {"updated_at": datetime.utcnow()}},
+                    upsert=True
+                )
+            except DuplicateKeyError:
+                report.skipped += 1
+                continue
+            report.repaired += 1
+        return report
@@ -0,0 +1,163 @@
+# app/domains/document/api.py
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List
+from urllib.parse import quote
+from .schemas import DocumentResponse
+from .services import DocumentService, UploadTooLarge, parse_range, OWNER_PROPOSAL, OWNER_CASE
+from app.domains.auth.deps import get_current_active_user
+from app.domains.user.models import User
+
+router = APIRouter(prefix="/documents", tags=["Documents"])
+
+
+async def _check_access(owner_type: str, owner_id: str, current_user: User, upload: bool = False):
+    """檢查上傳或讀取權限"""
+    if upload:
+        allowed = await DocumentService.can_upload(owner_type, owner_id, current_user)
+    else:
+        allowed = await DocumentService.can_read(owner_type, owner_id, current_user)
+
+    if allowed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="提案不存在" if owner_type == OWNER_PROPOSAL else "Case 不存在"
+        )
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="只有賣方可以上傳文件" if upload else "簽署 NDA 後才能查看文件"
+        )
+
+
+async def _upload(owner_type: str, owner_id: str, filename: str, request: Request, current_user: User):
+    await _check_access(owner_type, owner_id, current_user, upload=True)
+
+    try:
+        return await DocumentService.upload(
+            owner_type,
+            owner_id,
+            filename,
+            request.headers.get("content-type"),
+            request.stream(),
+            str(current_user.id)
+        )
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="檔案超過大小上限"
+        )
+
+# === 上傳 (請求內容直接是檔案本身，逐塊寫入 GridFS) ===
+
+@router.post("/proposals/{proposal_id}", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
+async def upload_proposal_document(
+    proposal_id: str,
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255, description="檔名"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """上傳提案資料室文件 (提案方)"""
+    return await _upload(OWNER_PROPOSAL, proposal_id, filename, request, current_user)
+
+@router.post("/cases/{case_id}", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
+async def upload_case_document(
+    case_id: str,
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255, description="檔名"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """上傳 case 文件 (賣方)"""
+    return await _upload(OWNER_CASE, case_id, filename, request, current_user)
+
+# === 列表 ===
+
+@router.get("/proposals/{proposal_id}", response_model=List[DocumentResponse])
+async def get_proposal_documents(
+    proposal_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """獲取提案文件列表 (提案方、管理員、已簽 NDA 的買方)"""
+    await _check_access(OWNER_PROPOSAL, proposal_id, current_user)
+    return await DocumentService.list_documents(OWNER_PROPOSAL, proposal_id)
+
+@router.get("/cases/{case_id}", response_model=List[DocumentResponse])
+async def get_case_documents(
+    case_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """獲取 case 文件列表 (賣方、已簽 NDA 的買方)"""
+    await _check_access(OWNER_CASE, case_id, current_user)
+    return await DocumentService.list_documents(OWNER_CASE, case_id)
+
+# === 下載 (支援 Range) ===
+
+@router.get("/{document_id}")
+async def download_document(
+    document_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+):
+    """下載文件，支援單一 bytes Range (斷點續傳)"""
+    grid_out = await DocumentService.open_document(document_id)
+    if not grid_out:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文件不存在"
+        )
+
+    document = DocumentService.describe(grid_out)
+    await _check_access(document.owner_type, document.owner_id, current_user)
+
+    length = document.length
+    try:
+        byte_range = parse_range(request.headers.get("range"), length)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="無法滿足的 Range",
+            headers={"Content-Range": f"bytes */{length}"}
+        )
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(document.filename)}"
+    }
+    if byte_range:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    else:
+        start, end = 0, length - 1
+        status_code = status.HTTP_200_OK
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        DocumentService.stream(grid_out, start, end),
+        status_code=status_code,
+        media_type=document.content_type or "application/octet-stream",
+        headers=headers
+    )
+
+@router.delete("/{document_id}")
+async def delete_document(
+    document_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """刪除文件 (上傳者)"""
+    grid_out = await DocumentService.open_document(document_id)
+    if not grid_out:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文件不存在"
+        )
+
+    document = DocumentService.describe(grid_out)
+    if document.uploaded_by != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="只能刪除自己上傳的文件"
+        )
+
+    await DocumentService.delete(document_id)
+    return {"message": "文件已刪除", "document_id": document_id}
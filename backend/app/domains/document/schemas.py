@@ -0,0 +1,15 @@
+# app/domains/document/schemas.py
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class DocumentResponse(BaseModel):
+    """資料室文件回應 Schema (不含檔案內容)"""
+    id: str
+    filename: str
+    content_type: Optional[str] = None
+    length: int
+    owner_type: str                 # proposal 或 case
+    owner_id: str
+    uploaded_by: str
+    uploaded_at: datetime
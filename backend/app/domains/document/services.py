@@ -0,0 +1,209 @@
+# app/domains/document/services.py
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket, AsyncIOMotorGridOut
+from .schemas import DocumentResponse
+from app.core.config import settings
+from app.core.database import db
+from app.domains.case.models import Case
+from app.domains.case.services import CaseService
+from app.domains.proposal.services import ProposalService
+from app.domains.user.models import User
+from app.shared.models.enums import CaseStatus, UserRole
+
+OWNER_PROPOSAL = "proposal"
+OWNER_CASE = "case"
+
+BUCKET_NAME = "documents"
+CHUNK_SIZE = 255 * 1024  # GridFS 預設 chunk 大小，下載時也以此大小串流
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class UploadTooLarge(Exception):
+    """上傳檔案超過大小上限"""
+
+
+def _bucket() -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db.database, bucket_name=BUCKET_NAME, chunk_size_bytes=CHUNK_SIZE)
+
+
+def _to_response(grid_file) -> DocumentResponse:
+    """grid_file 可以是 GridOut 或 files collection 的文件"""
+    if isinstance(grid_file, dict):
+        file_id, filename, length, upload_date, metadata = (
+            grid_file["_id"], grid_file["filename"], grid_file["length"],
+            grid_file["uploadDate"], grid_file.get("metadata") or {}
+        )
+    else:
+        file_id, filename, length, upload_date, metadata = (
+            grid_file._id, grid_file.filename, grid_file.length,
+            grid_file.upload_date, grid_file.metadata or {}
+        )
+    return DocumentResponse(
+        id=str(file_id),
+        filename=filename,
+        content_type=metadata.get("content_type"),
+        length=length,
+        owner_type=metadata.get("owner_type"),
+        owner_id=metadata.get("owner_id"),
+        uploaded_by=metadata.get("uploaded_by"),
+        uploaded_at=upload_date
+    )
+
+
+def parse_range(range_header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """解析單一 bytes range，回傳 (start, end) (包含 end)
+
+    沒有 Range header 回傳 None；無法滿足的範圍拋出 ValueError。
+    """
+    if not range_header:
+        return None
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        raise ValueError("不支援的 Range")
+
+    start_str, end_str = match.groups()
+    if start_str == "":
+        # bytes=-N : 最後 N bytes
+        suffix = int(end_str)
+        if suffix == 0:
+            raise ValueError("無法滿足的 Range")
+        start, end = max(length - suffix, 0), length - 1
+    else:
+        start = int(start_str)
+        end = min(int(end_str), length - 1) if end_str else length - 1
+
+    if start >= length or start > end:
+        raise ValueError("無法滿足的 Range")
+    return start, end
+
+
+class DocumentService:
+
+    # === 權限 ===
+
+    @staticmethod
+    async def can_upload(owner_type: str, owner_id: str, user: User) -> Optional[bool]:
+        """只有提案方 (賣方) 可以上傳；資源不存在時回傳 None"""
+        if owner_type == OWNER_PROPOSAL:
+            proposal = await ProposalService.get_proposal_by_id(owner_id)
+            if not proposal:
+                return None
+            return proposal.seller_id == str(user.id)
+
+        case = await CaseService.get_case_by_id(owner_id)
+        if not case:
+            return None
+        return case.seller_id == str(user.id)
+
+    @staticmethod
+    async def can_read(owner_type: str, owner_id: str, user: User) -> Optional[bool]:
+        """和 detailed_content 相同的規則：賣方與管理員可看提案文件，買方需簽署 NDA"""
+        user_id = str(user.id)
+        if owner_type == OWNER_PROPOSAL:
+            proposal = await ProposalService.get_proposal_by_id(owner_id)
+            if not proposal:
+                return None
+            if proposal.seller_id == user_id or user.role == UserRole.ADMIN:
+                return True
+            # 買方必須有此提案且已簽 NDA 的 case
+            nda_case = await Case.find_one({
+                "proposal_id": owner_id,
+                "buyer_id": user_id,
+                "status": CaseStatus.NDA_SIGNED
+            })
+            return nda_case is not None
+
+        case = await CaseService.get_case_by_id(owner_id)
+        if not case:
+            return None
+        if case.seller_id == user_id:
+            return True
+        return case.buyer_id == user_id and case.status == CaseStatus.NDA_SIGNED
+
+    # === 上傳 / 查詢 / 下載 ===
+
+    @staticmethod
+    async def upload(
+        owner_type: str,
+        owner_id: str,
+        filename: str,
+        content_type: Optional[str],
+        chunks: AsyncIterator[bytes],
+        uploaded_by: str
+    ) -> DocumentResponse:
+        """把請求內容逐塊寫入 GridFS (不在記憶體中保留整個檔案)"""
+        grid_in = _bucket().open_upload_stream(
+            filename,
+            metadata={
+                "owner_type": owner_type,
+                "owner_id": owner_id,
+                "uploaded_by": uploaded_by,
+                "content_type": content_type
+            }
+        )
+        received = 0
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                received += len(chunk)
+                if received > settings.DOCUMENT_MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge()
+                await grid_in.write(chunk)
+        except BaseException:
+            await grid_in.abort()
+            raise
+
+        await grid_in.close()
+        return DocumentResponse(
+            id=str(grid_in._id),
+            filename=filename,
+            content_type=content_type,
+            length=received,
+            owner_type=owner_type,
+            owner_id=owner_id,
+            uploaded_by=uploaded_by,
+            uploaded_at=grid_in.upload_date
+        )
+
+    @staticmethod
+    async def list_documents(owner_type: str, owner_id: str) -> List[DocumentResponse]:
+        """列出某個提案或 case 的文件"""
+        cursor = _bucket().find(
+            {"metadata.owner_type": owner_type, "metadata.owner_id": owner_id},
+            sort=[("uploadDate", -1)]
+        )
+        return [_to_response(grid_out) async for grid_out in cursor]
+
+    @staticmethod
+    async def open_document(document_id: str) -> Optional[AsyncIOMotorGridOut]:
+        """開啟文件 (只讀取 metadata，內容在串流時才讀)"""
+        try:
+            return await _bucket().open_download_stream(ObjectId(document_id))
+        except (InvalidId, NoFile):
+            return None
+
+    @staticmethod
+    async def stream(grid_out: AsyncIOMotorGridOut, start: int, end: int) -> AsyncIterator[bytes]:
+        """逐塊讀取 [start, end] 範圍的內容"""
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    @staticmethod
+    async def delete(document_id: str):
+        await _bucket().delete(ObjectId(document_id))
+
+    @staticmethod
+    def describe(grid_out: AsyncIOMotorGridOut) -> DocumentResponse:
+        return _to_response(grid_out)
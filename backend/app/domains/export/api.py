@@ -0,0 +1,50 @@
+# app/domains/export/api.py
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Literal, Optional
+from .services import ExportService
+from app.core.admission import concurrency_limit
+from app.core.config import settings
+from app.domains.auth.deps import require_admin
+from app.domains.user.models import User
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+
+@router.get(
+    "/{entity}",
+    dependencies=[Depends(concurrency_limit("exports", settings.EXPORT_CONCURRENCY_LIMIT))]
+)
+async def export_entity(
+    entity: Literal["proposals", "cases", "users"],
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    fields: Optional[str] = Query(None, description="逗號分隔的欄位，預設全部"),
+    created_from: Optional[datetime] = Query(None, description="created_at >= (UTC)"),
+    created_to: Optional[datetime] = Query(None, description="created_at < (UTC)"),
+    admin_user: User = Depends(require_admin)
+):
+    """串流匯出 proposals / cases / users (管理員專用)，資料直接從 cursor 逐批送出"""
+    try:
+        selected = ExportService.resolve_fields(entity, fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    batches = ExportService.iter_rows(entity, selected, created_from, created_to)
+    filename = f"{entity}-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if export_format == "csv":
+        return StreamingResponse(
+            ExportService.csv(selected, batches),
+            media_type="text/csv",
+            headers=headers
+        )
+    return StreamingResponse(
+        ExportService.ndjson(batches),
+        media_type="application/x-ndjson",
+        headers=headers
+    )
@@ -0,0 +1,128 @@
+# app/domains/export/services.py - 管理員資料匯出
+
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.core.read_routing import read_collection
+from app.domains.archive.services import POLICIES, archive_collection
+from app.domains.case.models import Case
+from app.domains.proposal.models import Proposal
+from app.domains.user.models import User
+
+# 可匯出的資料與欄位 (不含密碼等敏感欄位)；第一個欄位 id 對應 _id
+EXPORTS = {
+    "proposals": (Proposal, [
+        "id", "title", "brief_content", "status", "seller_id", "version",
+        "created_at", "updated_at", "submitted_at", "reviewed_at", "reviewed_by", "reject_reason",
+    ]),
+    "cases": (Case, [
+        "id", "proposal_id", "seller_id", "buyer_id", "title", "status", "snapshot_hash",
+        "created_at", "updated_at", "interested_at", "rejected_at", "nda_signed_at",
+    ]),
+    "users": (User, [
+        "id", "email", "username", "role", "company_name", "contact_person", "phone",
+        "description", "is_active", "created_at", "updated_at",
+    ]),
+}
+
+# 每批從 MongoDB 取回的筆數，也是每次送出的列數
+BATCH_SIZE = 1000
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _csv_cell(value: Any) -> Any:
+    """避免試算表把內容當成公式執行"""
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return "" if value is None else value
+
+
+class ExportService:
+
+    @staticmethod
+    def resolve_fields(entity: str, fields: Optional[str]) -> List[str]:
+        """解析 fields 參數 (逗號分隔)，未指定時匯出全部欄位"""
+        allowed = EXPORTS[entity][1]
+        if not fields:
+            return list(allowed)
+
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in allowed]
+        if unknown:
+            raise ValueError(f"不支援的欄位: {', '.join(unknown)}")
+        return selected
+
+    @staticmethod
+    async def iter_rows(
+        entity: str,
+        fields: List[str],
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """依 _id 順序逐批讀取 (含已歸檔資料)，每次產出一批列 (記憶體用量固定為一批)"""
+        model = EXPORTS[entity][0]
+        query: Dict[str, Any] = {}
+        if created_from or created_to:
+            query["created_at"] = {}
+            if created_from:
+                query["created_at"]["$gte"] = created_from
+            if created_to:
+                query["created_at"]["$lt"] = created_to
+
+        projection = {("_id" if field == "id" else field): 1 for field in fields}
+        # 已歸檔的資料接在常用 collection 之後匯出 (兩邊各自依 _id 排序)
+        collections = [read_collection(model)]
+        if model in POLICIES:
+            collections.append(archive_collection(model))
+
+        batch = []
+        for collection in collections:
+            cursor = collection.find(query, projection, sort=[("_id", 1)], batch_size=BATCH_SIZE)
+            try:
+                async for doc in cursor:
+                    doc["id"] = doc.pop("_id")
+                    batch.append({field: _plain(doc.get(field)) for field in fields})
+                    if len(batch) >= BATCH_SIZE:
+                        yield batch
+                        batch = []
+            finally:
+                # 客戶端中途斷線時釋放伺服器端 cursor
+                await cursor.close()
+        if batch:
+            yield batch
+
+    @staticmethod
+    async def ndjson(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+        async for batch in batches:
+            yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch)
+
+    @staticmethod
+    async def csv(fields: List[str], batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # UTF-8 BOM 讓 Excel 正確辨識中文
+        yield "\ufeff"
+        writer.writerow(fields)
+        async for batch in batches:
+            for row in batch:
+                writer.writerow([_csv_cell(row[field]) for field in fields])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
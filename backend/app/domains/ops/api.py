@@ -0,0 +1,31 @@
+# app/domains/ops/api.py - 維運資訊 (管理員專用)
+from fastapi import APIRouter, Depends, Query
+from typing import Any, Dict
+from app.core.database import db
+from app.domains.auth.deps import require_admin
+from app.domains.user.models import User
+
+router = APIRouter(prefix="/ops", tags=["Ops"])
+
+
+@router.get("/jobs")
+async def get_job_metrics(admin_user: User = Depends(require_admin)) -> Dict[str, Any]:
+    """本 worker 的排程工作統計 (執行次數、耗時、失敗與逾時)"""
+    from app.core.scheduler import scheduler
+    return {
+        "worker_id": scheduler.worker_id,
+        "jobs": scheduler.metrics()
+    }
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=100),
+    admin_user: User = Depends(require_admin)
+) -> Dict[str, Any]:
+    """慢查詢排行 (所有 worker，依查詢類型彙總)，附 explain 的全表掃描 / 記憶體排序判斷"""
+    from app.core.slow_queries import slow_query_monitor, top_slow_queries
+    return {
+        "monitor": slow_query_monitor.metrics(),
+        "queries": await top_slow_queries(db.database, limit)
+    }
@@ -7,12 +7,20 @@ from .schemas import (
     ProposalUpdate, 
     ProposalResponse, 
     ProposalListResponse,
-    ProposalReview
+    ProposalReview,
+    ProposalVersionResponse,
+    ProposalVersionContent,
+    ProposalDiffResponse,
+    BuyerRecommendation
 )
-from .services import ProposalService
+from .services import ProposalService, ProposalVersionService, ReviewQueueService
+from .recommendation import BuyerRecommendationService
 from app.domains.auth.deps import get_current_active_user, require_admin
 from app.domains.user.models import User
 from app.shared.models.enums import UserRole, ProposalStatus
+from app.core.admission import list_endpoint_limits
+from app.core.config import settings
+from app.domains.user.schemas import UserResponse
 
 router = APIRouter(prefix="/proposals", tags=["Proposals"])
 
@@ -40,9 +48,10 @@ async def create_proposal(
             detail=str(e)
         )
 
-@router.get("/my", response_model=List[ProposalListResponse])
+@router.get("/my", response_model=List[ProposalListResponse], dependencies=list_endpoint_limits("proposals.my"))
 async def get_my_proposals(
     status_filter: Optional[ProposalStatus] = Query(None, alias="status"),
+    include_archived: bool = Query(False, description="合併已移到歸檔區的舊提案"),
     current_user: User = Depends(get_current_active_user)
 ):
     """獲取我的提案列表 (提案方專用)"""
@@ -52,7 +61,7 @@ async def get_my_proposals(
             detail="只有賣方可以查看提案"
         )
     
-    proposals = await ProposalService.get_seller_proposals(str(current_user.id), status_filter)
+    proposals = await ProposalService.get_seller_proposals(str(current_user.id), status_filter, include_archived)
     return [ProposalListResponse(**proposal.dict()) for proposal in proposals]
 
 @router.get("/{proposal_id}", response_model=ProposalResponse)
@@ -77,6 +86,135 @@ async def get_proposal(
     
     return ProposalResponse(**proposal.dict())
 
+# ========== 版本歷史 ==========
+
+@router.get("/{proposal_id}/versions", response_model=List[ProposalVersionResponse])
+async def get_proposal_versions(
+    proposal_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """獲取提案的版本列表 (提案方或管理員)"""
+    proposal = await ProposalService.get_proposal_by_id(proposal_id)
+    if not proposal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="提案不存在"
+        )
+    
+    if proposal.seller_id != str(current_user.id) and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="權限不足"
+        )
+    
+    return await ProposalVersionService.get_versions(proposal_id)
+
+@router.get("/{proposal_id}/versions/{version}", response_model=ProposalVersionContent)
+async def get_proposal_version(
+    proposal_id: str,
+    version: int,
+    current_user: User = Depends(get_current_active_user)
+):
+    """獲取提案指定版本的內容 (提案方或管理員)"""
+    proposal = await ProposalService.get_proposal_by_id(proposal_id)
+    if not proposal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="提案不存在"
+        )
+    
+    if proposal.seller_id != str(current_user.id) and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="權限不足"
+        )
+    
+    content = await ProposalVersionService.get_version_content(proposal, version)
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="版本不存在"
+        )
+    
+    return ProposalVersionContent(proposal_id=proposal_id, version=version, **content)
+
+@router.get("/{proposal_id}/diff", response_model=ProposalDiffResponse)
+async def diff_proposal_versions(
+    proposal_id: str,
+    from_version: Optional[int] = Query(None, description="預設為上一次被審核的版本"),
+    to_version: Optional[int] = Query(None, description="預設為目前版本"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """比較提案兩個版本的差異 (審核者查看退回後的修改)"""
+    proposal = await ProposalService.get_proposal_by_id(proposal_id)
+    if not proposal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="提案不存在"
+        )
+    
+    if proposal.seller_id != str(current_user.id) and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="權限不足"
+        )
+    
+    to_version = to_version or max(proposal.version, 1)
+    if from_version is None:
+        from_version = await ProposalVersionService.get_last_reviewed_version(proposal_id, to_version)
+        if from_version is None:
+            from_version = max(to_version - 1, 1)
+    
+    changes = await ProposalVersionService.diff_versions(proposal, from_version, to_version)
+    if changes is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="版本不存在"
+        )
+    
+    return ProposalDiffResponse(
+        proposal_id=proposal_id,
+        from_version=from_version,
+        to_version=to_version,
+        changes=changes
+    )
+
+@router.get(
+    "/{proposal_id}/recommended-buyers",
+    response_model=List[BuyerRecommendation],
+    dependencies=list_endpoint_limits("proposals.recommended_buyers")
+)
+async def get_recommended_buyers(
+    proposal_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user)
+):
+    """依提案內容推薦最相關的買方 (已核准的提案)"""
+    proposal = await ProposalService.get_proposal_by_id(proposal_id)
+    if not proposal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="提案不存在"
+        )
+    
+    if proposal.seller_id != str(current_user.id) and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="權限不足"
+        )
+    
+    if proposal.status != ProposalStatus.APPROVED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="只有已核准的提案可以推薦買方"
+        )
+    
+    recommendations = await BuyerRecommendationService.recommend_buyers(proposal, limit)
+    return [
+        BuyerRecommendation(buyer=UserResponse(**buyer.dict_public()), score=round(score, 4))
+        for buyer, score in recommendations
+    ]
+
 @router.put("/{proposal_id}", response_model=ProposalResponse)
 async def update_proposal(
     proposal_id: str,
@@ -99,7 +237,7 @@ async def update_proposal(
         )
     
     try:
-        updated_proposal = await ProposalService.update_proposal(proposal_id, data)
+        updated_proposal = await ProposalService.update_proposal(proposal_id, data, str(current_user.id))
         return ProposalResponse(**updated_proposal.dict())
     except ValueError as e:
         raise HTTPException(
@@ -128,7 +266,7 @@ async def submit_proposal(
         )
     
     try:
-        submitted_proposal = await ProposalService.submit_for_review(proposal_id)
+        submitted_proposal = await ProposalService.submit_for_review(proposal_id, str(current_user.id))
         return ProposalResponse(**submitted_proposal.dict())
     except ValueError as e:
         raise HTTPException(
@@ -157,7 +295,7 @@ async def resubmit_proposal(
         )
     
     try:
-        resubmitted_proposal = await ProposalService.resubmit_proposal(proposal_id)
+        resubmitted_proposal = await ProposalService.resubmit_proposal(proposal_id, str(current_user.id))
         return ProposalResponse(**resubmitted_proposal.dict())
     except ValueError as e:
         raise HTTPException(
@@ -192,7 +330,7 @@ async def delete_proposal(
             detail="只能刪除草稿或被拒絕的提案"
         )
     
-    success = await ProposalService.delete_proposal(proposal_id)
+    success = await ProposalService.delete_proposal(proposal_id, str(current_user.id))
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -203,19 +341,44 @@ async def delete_proposal(
 
 # ========== 管理員功能 ==========
 
-@router.get("/", response_model=List[ProposalListResponse])
+@router.get("/", response_model=List[ProposalListResponse], dependencies=list_endpoint_limits("proposals.all"))
 async def get_all_proposals(
     status_filter: Optional[ProposalStatus] = Query(None, alias="status"),
+    include_archived: bool = Query(False, description="合併已移到歸檔區的舊提案"),
     current_user: User = Depends(require_admin)
 ):
     """獲取所有提案列表 (管理員專用)"""
     if status_filter:
-        proposals = await ProposalService.get_proposals_by_status(status_filter)
+        proposals = await ProposalService.get_proposals_by_status(status_filter, include_archived)
     else:
-        proposals = await ProposalService.get_all_proposals()
+        proposals = await ProposalService.get_all_proposals(include_archived)
     
     return [ProposalListResponse(**proposal.dict()) for proposal in proposals]
 
+@router.post("/review-queue/claim", response_model=List[ProposalResponse])
+async def claim_review_queue(
+    count: int = Query(5, ge=1, le=settings.REVIEW_CLAIM_MAX),
+    current_user: User = Depends(require_admin)
+):
+    """從審核佇列領取待審提案 (管理員專用)，租約到期前其他管理員不會領到或審核同一提案"""
+    proposals = await ReviewQueueService.claim(str(current_user.id), count)
+    return [ProposalResponse(**proposal.dict()) for proposal in proposals]
+
+@router.post("/{proposal_id}/release", response_model=dict)
+async def release_review_claim(
+    proposal_id: str,
+    current_user: User = Depends(require_admin)
+):
+    """把領取的提案放回審核佇列 (管理員專用)"""
+    released = await ReviewQueueService.release(proposal_id, str(current_user.id))
+    if not released:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="沒有領取此提案"
+        )
+    
+    return {"message": "已放回審核佇列", "proposal_id": proposal_id}
+
 @router.post("/{proposal_id}/review", response_model=ProposalResponse)
 async def review_proposal(
     proposal_id: str,
@@ -269,5 +432,5 @@ async def archive_proposal(
             detail="只有已核准的提案可以歸檔"
         )
     
-    archived_proposal = await ProposalService.archive_proposal(proposal_id)
+    archived_proposal = await ProposalService.archive_proposal(proposal_id, str(current_user.id))
     return ProposalResponse(**archived_proposal.dict())
\ No newline at end of file
@@ -1,10 +1,11 @@
 # app/domains/proposal/models.py
 
-from beanie import Document
+from beanie import Document, Indexed
 from pydantic import Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, List, Any
 from beanie import PydanticObjectId
+from pymongo import IndexModel, ASCENDING
 from app.shared.models.enums import ProposalStatus
 
 class Proposal(Document):
@@ -29,5 +30,57 @@ class Proposal(Document):
     reviewed_by: Optional[str] = None            # 審核者 ID
     reject_reason: Optional[str] = None          # 拒絕原因
     
+    # 版本 (0 表示尚未建立版本歷史的舊資料)
+    version: int = 0
+    
+    # 審核佇列租約 (領取的管理員與租約到期時間，過期後其他管理員可再領取)
+    claimed_by: Optional[str] = None
+    lease_expires: Optional[datetime] = None
+    
+    class Settings:
+        collection = "proposals"
+        indexes = [
+            "updated_at",  # cache_bus 輪詢用
+            # 審核佇列依提交時間領取
+            IndexModel([("status", ASCENDING), ("submitted_at", ASCENDING)], name="status_submitted_at"),
+        ]
+
+class ProposalSnapshot(Document):
+    """提案內容快照 (不可變，以內容雜湊為鍵，多個 case 共用同一份)"""
+    content_hash: Indexed(str, unique=True)      # sha256(title, brief_content, detailed_content)
+    proposal_id: str                             # 來源提案 ID
+    
+    # 發送當下的提案內容
+    title: str
+    brief_content: str
+    detailed_content: str
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        collection = "proposal_snapshots"
+
+class ProposalVersion(Document):
+    """提案版本 (每 K 版存完整內容，其餘只存與前一版的差異)"""
+    proposal_id: str
+    version: int
+    
+    # 完整內容 (is_snapshot=True) 或各欄位的編輯列表 [start, end, text]
+    is_snapshot: bool = False
+    content: Optional[Dict[str, str]] = None
+    delta: Optional[Dict[str, List[List[Any]]]] = None
+    
+    created_by: Optional[str] = None             # 編輯者 ID
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # 此版本的審核結果 (退回草稿後仍保留)
+    reviewed_by: Optional[str] = None
+    reviewed_at: Optional[datetime] = None
+    approved: Optional[bool] = None
+    reject_reason: Optional[str] = None
+    
     class Settings:
-        collection = "proposals"
\ No newline at end of file
+        collection = "proposal_versions"
+        indexes = [
+            IndexModel([("proposal_id", ASCENDING), ("version", ASCENDING)], unique=True)
+        ]
@@ -0,0 +1,109 @@
+# app/domains/proposal/recommendation.py - 依提案內容推薦買方
+
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel, Field
+
+from .models import Proposal
+from app.core.cache_bus import cache_bus
+from app.domains.user.models import User
+from app.shared.models.enums import UserRole
+from app.shared.utils.tfidf import TfidfIndex
+
+
+class _BuyerText(BaseModel):
+    """建立索引只需要的欄位"""
+    id: PydanticObjectId = Field(alias="_id")
+    company_name: Optional[str] = None
+    description: Optional[str] = None
+
+
+def _buyer_text(buyer) -> str:
+    return " ".join(filter(None, [buyer.company_name, buyer.description]))
+
+
+def _is_buyer(user: Optional[User]) -> bool:
+    return user is not None and user.is_active and user.role == UserRole.BUYER
+
+
+class BuyerIndex:
+    """買方 company_name/description 的 TF-IDF 索引
+
+    每個 worker 一份，第一次查詢時建立；之後任何 worker 修改 users 都會經由 cache_bus
+    標記該用戶，下次查詢前只重新索引被標記的買方。
+    """
+
+    def __init__(self):
+        self.index = TfidfIndex()
+        self._generation = 0
+        self._built_generation = -1
+        self._dirty: Set[str] = set()
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, user_id: Optional[str]):
+        if user_id is None:
+            self._generation += 1
+        else:
+            self._dirty.add(user_id)
+
+    async def ensure_fresh(self):
+        if self._built_generation == self._generation and not self._dirty:
+            return
+
+        async with self._lock:
+            if self._built_generation != self._generation:
+                await self._rebuild()
+            if self._dirty:
+                await self._refresh_dirty()
+
+    async def _rebuild(self):
+        generation = self._generation
+        # 建立期間發生的修改會留在 _dirty，建立完再補上
+        self._dirty.clear()
+        index = TfidfIndex()
+        async for buyer in User.find(
+            {"role": UserRole.BUYER, "is_active": True}
+        ).project(_BuyerText):
+            index.add(str(buyer.id), _buyer_text(buyer))
+        self.index = index
+        self._built_generation = generation
+
+    async def _refresh_dirty(self):
+        user_ids = list(self._dirty)
+        self._dirty.clear()
+        object_ids = [PydanticObjectId(user_id) for user_id in user_ids if PydanticObjectId.is_valid(user_id)]
+        users = await User.find({"_id": {"$in": object_ids}}).to_list()
+        found = {str(user.id): user for user in users}
+        for user_id in user_ids:
+            user = found.get(user_id)
+            if _is_buyer(user):
+                self.index.add(user_id, _buyer_text(user))
+            else:
+                self.index.remove(user_id)
+
+
+buyer_index = BuyerIndex()
+cache_bus.subscribe(User, buyer_index.invalidate)
+
+
+class BuyerRecommendationService:
+
+    @staticmethod
+    async def recommend_buyers(proposal: Proposal, limit: int = 10) -> List[Tuple[User, float]]:
+        """依提案標題與簡介 (買方簽 NDA 前可見的內容) 排序買方，回傳 (買方, 分數)"""
+        await buyer_index.ensure_fresh()
+        ranked = buyer_index.index.search(f"{proposal.title} {proposal.brief_content}", limit)
+        if not ranked:
+            return []
+
+        users = await User.find(
+            {"_id": {"$in": [PydanticObjectId(user_id) for user_id, _ in ranked]}}
+        ).to_list()
+        found = {str(user.id): user for user in users}
+        return [
+            (found[user_id], score)
+            for user_id, score in ranked
+            if _is_buyer(found.get(user_id))
+        ]
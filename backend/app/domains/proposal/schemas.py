@@ -1,9 +1,10 @@
 # app/domains/proposal/schemas.py
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict, List
 from datetime import datetime
 from app.shared.models.enums import ProposalStatus
+from app.domains.user.schemas import UserResponse
 
 # 建立提案用的 Schema
 class ProposalCreate(BaseModel):
@@ -36,6 +37,9 @@ class ProposalResponse(BaseModel):
     reviewed_at: Optional[datetime]
     reviewed_by: Optional[str]
     reject_reason: Optional[str]
+    version: int = 0
+    claimed_by: Optional[str] = None
+    lease_expires: Optional[datetime] = None
 
 # 提案列表用的 Schema (不包含詳細內容)
 class ProposalListResponse(BaseModel):
@@ -46,4 +50,35 @@ class ProposalListResponse(BaseModel):
     seller_id: str
     created_at: datetime
     updated_at: datetime
-    submitted_at: Optional[datetime]
\ No newline at end of file
+    submitted_at: Optional[datetime]
+
+# 版本歷史用的 Schema (不包含內容)
+class ProposalVersionResponse(BaseModel):
+    version: int
+    is_snapshot: bool
+    created_by: Optional[str] = None
+    created_at: datetime
+    reviewed_by: Optional[str] = None
+    reviewed_at: Optional[datetime] = None
+    approved: Optional[bool] = None
+    reject_reason: Optional[str] = None
+
+# 指定版本的內容
+class ProposalVersionContent(BaseModel):
+    proposal_id: str
+    version: int
+    title: str
+    brief_content: str
+    detailed_content: str
+
+# 版本比較結果 (欄位 → unified diff 行)
+class ProposalDiffResponse(BaseModel):
+    proposal_id: str
+    from_version: int
+    to_version: int
+    changes: Dict[str, List[str]]
+
+# 推薦買方 (分數越高越相關)
+class BuyerRecommendation(BaseModel):
+    buyer: UserResponse
+    score: float
@@ -1,35 +1,114 @@
 # app/domains/proposal/services.py
 
-from typing import Optional, List
-from datetime import datetime
+import hashlib
+import json
+from typing import Optional, List, Dict
+from datetime import datetime, timedelta
 from beanie import PydanticObjectId
-from .models import Proposal
-from .schemas import ProposalCreate, ProposalUpdate, ProposalReview
+from beanie.odm.utils.parsing import parse_obj
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from .models import Proposal, ProposalSnapshot, ProposalVersion
+from .schemas import ProposalCreate, ProposalUpdate, ProposalReview, ProposalVersionResponse
+from app.core.config import settings
+from app.core.cache_bus import cache_bus
+from app.core.identity_map import forget_document, load_document
+from app.core.read_routing import current_session, find_for_read, get_for_read, get_many_for_read, write_flow
+from app.domains.archive.services import ArchiveService, merge_newest_first
+from app.domains.audit.services import audit_log
+from app.domains.counters.services import StatusCounterService
 from app.shared.models.enums import ProposalStatus
+from app.shared.utils.cache import LRUCache, SingleFlight
+from app.shared.utils.textdiff import make_delta, apply_delta, text_diff, run_diff
+
+# 快照以內容雜湊為鍵且不可變，快取永遠不會過期
+_snapshot_cache = LRUCache(maxsize=settings.PROPOSAL_SNAPSHOT_CACHE_SIZE)
+
+# 同一提案的並行讀取 (例如多位管理員同時開啟審核頁) 共用一次查詢
+_proposal_flights = SingleFlight()
+
+
+def _forget_proposal(proposal_id: str):
+    """提案已修改：不再共用進行中的查詢，也不再重用本請求已載入的文件"""
+    _proposal_flights.forget(proposal_id)
+    forget_document(Proposal, proposal_id)
+
+
+def _evict_proposal(proposal_id: Optional[str]):
+    """其他 worker 修改了提案 (cache_bus 通知)：之後的讀取不再併入修改前開始的查詢"""
+    _proposal_flights.forget(proposal_id)
+
+
+cache_bus.subscribe(Proposal, _evict_proposal)
+
+
+def compute_content_hash(title: str, brief_content: str, detailed_content: str) -> str:
+    """計算提案內容的 sha256 雜湊"""
+    payload = json.dumps([title, brief_content, detailed_content], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# 納入版本歷史的欄位
+VERSIONED_FIELDS = ("title", "brief_content", "detailed_content")
+
+
+def _content_of(proposal: Proposal) -> Dict[str, str]:
+    return {field: getattr(proposal, field) for field in VERSIONED_FIELDS}
+
 
 class ProposalService:
     
     @staticmethod
+    @write_flow
     async def create_proposal(data: ProposalCreate, seller_id: str) -> Proposal:
         """建立新提案 (草稿狀態)"""
         proposal = Proposal(
             **data.dict(),
             seller_id=seller_id,
-            status=ProposalStatus.DRAFT
+            status=ProposalStatus.DRAFT,
+            version=1
+        )
+        await proposal.insert(session=current_session())
+        await ProposalVersionService.record_version(
+            str(proposal.id), 1, None, _content_of(proposal), seller_id
         )
-        return await proposal.insert()
+        audit_log.record("proposal", str(proposal.id), "create", seller_id, None, ProposalStatus.DRAFT)
+        await StatusCounterService.proposal_transition(seller_id, None, ProposalStatus.DRAFT)
+        return proposal
     
     @staticmethod
     async def get_proposal_by_id(proposal_id: str) -> Optional[Proposal]:
-        """通過 ID 獲取提案"""
-        try:
-            return await Proposal.get(PydanticObjectId(proposal_id))
-        except:
-            return None
+        """通過 ID 獲取提案 (每個請求最多讀一次；寫入流程外可讀 secondary，並行的相同讀取共用一次查詢；已歸檔的從 archive 讀取)"""
+        return await load_document(
+            Proposal, proposal_id, ProposalService._fetch_proposals, ProposalService._load_proposal
+        )
     
     @staticmethod
-    async def update_proposal(proposal_id: str, data: ProposalUpdate) -> Optional[Proposal]:
-        """更新提案 (只有 draft 狀態可以更新)"""
+    async def _fetch_proposals(proposal_ids: List[str]) -> Dict[str, Proposal]:
+        if len(proposal_ids) == 1:
+            proposal_id = proposal_ids[0]
+            proposal = await _proposal_flights.do(proposal_id, lambda: ProposalService._load_proposal(proposal_id))
+            return {proposal_id: proposal}
+        
+        proposals = await get_many_for_read(Proposal, proposal_ids)
+        missing = [proposal_id for proposal_id in proposal_ids if proposal_id not in proposals]
+        if missing:
+            proposals.update(await ArchiveService.get_many(Proposal, missing))
+        return proposals
+    
+    @staticmethod
+    async def _load_proposal(proposal_id: str) -> Optional[Proposal]:
+        proposal = await get_for_read(Proposal, proposal_id)
+        if proposal is None:
+            proposal = await ArchiveService.get(Proposal, proposal_id)
+        return proposal
+    
+    @staticmethod
+    @write_flow
+    async def update_proposal(
+        proposal_id: str, data: ProposalUpdate, editor_id: Optional[str] = None
+    ) -> Optional[Proposal]:
+        """更新提案 (只有 draft 狀態可以更新，內容有變動時建立新版本)"""
         proposal = await ProposalService.get_proposal_by_id(proposal_id)
         if not proposal:
             return None
@@ -38,14 +117,26 @@ class ProposalService:
         if proposal.status != ProposalStatus.DRAFT:
             raise ValueError("只有草稿狀態的提案可以編輯")
         
-        update_data = data.dict(exclude_unset=True)
+        update_data = {k: v for k, v in data.dict(exclude_unset=True).items() if v is not None}
+        
+        previous = _content_of(proposal)
+        content = {**previous, **update_data}
+        if content != previous:
+            base_version = await ProposalVersionService.ensure_history(proposal)
+            await ProposalVersionService.record_version(
+                proposal_id, base_version + 1, previous, content, editor_id
+            )
+            update_data["version"] = base_version + 1
+        
         update_data["updated_at"] = datetime.utcnow()
         
-        await proposal.update({"$set": update_data})
+        await proposal.update({"$set": update_data}, session=current_session())
+        _forget_proposal(proposal_id)
         return await ProposalService.get_proposal_by_id(proposal_id)
     
     @staticmethod
-    async def submit_for_review(proposal_id: str) -> Optional[Proposal]:
+    @write_flow
+    async def submit_for_review(proposal_id: str, actor_id: Optional[str] = None) -> Optional[Proposal]:
         """提交審核 (draft → under_review)"""
         proposal = await ProposalService.get_proposal_by_id(proposal_id)
         if not proposal:
@@ -57,13 +148,19 @@ class ProposalService:
         update_data = {
             "status": ProposalStatus.UNDER_REVIEW,
             "submitted_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "updated_at": datetime.utcnow(),
+            "claimed_by": None,
+            "lease_expires": None
         }
         
-        await proposal.update({"$set": update_data})
+        await proposal.update({"$set": update_data}, session=current_session())
+        audit_log.record("proposal", proposal_id, "submit", actor_id, ProposalStatus.DRAFT, ProposalStatus.UNDER_REVIEW)
+        await StatusCounterService.proposal_transition(proposal.seller_id, ProposalStatus.DRAFT, ProposalStatus.UNDER_REVIEW)
+        _forget_proposal(proposal_id)
         return await ProposalService.get_proposal_by_id(proposal_id)
     
     @staticmethod
+    @write_flow
     async def review_proposal(proposal_id: str, review_data: ProposalReview, reviewer_id: str) -> Optional[Proposal]:
         """審核提案 (admin 專用)"""
         proposal = await ProposalService.get_proposal_by_id(proposal_id)
@@ -73,23 +170,48 @@ class ProposalService:
         if proposal.status != ProposalStatus.UNDER_REVIEW:
             raise ValueError("只有審核中的提案可以進行審核")
         
+        now = datetime.utcnow()
+        if proposal.claimed_by not in (None, reviewer_id) and proposal.lease_expires and proposal.lease_expires > now:
+            raise ValueError("此提案正由其他管理員審核中")
+        
         new_status = ProposalStatus.APPROVED if review_data.approved else ProposalStatus.REJECTED
         
         update_data = {
             "status": new_status,
-            "reviewed_at": datetime.utcnow(),
+            "reviewed_at": now,
             "reviewed_by": reviewer_id,
-            "updated_at": datetime.utcnow()
+            "updated_at": now,
+            "claimed_by": None,
+            "lease_expires": None
         }
         
         if not review_data.approved and review_data.reject_reason:
             update_data["reject_reason"] = review_data.reject_reason
         
-        await proposal.update({"$set": update_data})
+        version = await ProposalVersionService.ensure_history(proposal)
+        
+        # 條件式更新：與其他管理員同時審核時只有一方成功
+        result = await Proposal.get_motor_collection().update_one(
+            {"_id": proposal.id, **ReviewQueueService.reviewable_by(reviewer_id, now)},
+            {"$set": update_data},
+            session=current_session()
+        )
+        _forget_proposal(proposal_id)
+        if result.matched_count == 0:
+            raise ValueError("此提案正由其他管理員審核中")
+        
+        # 審核結果記錄在被審核的版本上，退回草稿後仍可查閱
+        await ProposalVersionService.record_review(proposal_id, version, review_data, reviewer_id)
+        audit_log.record(
+            "proposal", proposal_id, "review", reviewer_id, ProposalStatus.UNDER_REVIEW, new_status,
+            version=version, reject_reason=update_data.get("reject_reason")
+        )
+        await StatusCounterService.proposal_transition(proposal.seller_id, ProposalStatus.UNDER_REVIEW, new_status)
         return await ProposalService.get_proposal_by_id(proposal_id)
     
     @staticmethod
-    async def resubmit_proposal(proposal_id: str) -> Optional[Proposal]:
+    @write_flow
+    async def resubmit_proposal(proposal_id: str, actor_id: Optional[str] = None) -> Optional[Proposal]:
         """重新提交提案 (rejected → draft)"""
         proposal = await ProposalService.get_proposal_by_id(proposal_id)
         if not proposal:
@@ -104,39 +226,307 @@ class ProposalService:
             "updated_at": datetime.utcnow()
         }
         
-        await proposal.update({"$set": update_data})
+        await proposal.update({"$set": update_data}, session=current_session())
+        audit_log.record("proposal", proposal_id, "resubmit", actor_id, ProposalStatus.REJECTED, ProposalStatus.DRAFT)
+        await StatusCounterService.proposal_transition(proposal.seller_id, ProposalStatus.REJECTED, ProposalStatus.DRAFT)
+        _forget_proposal(proposal_id)
         return await ProposalService.get_proposal_by_id(proposal_id)
     
     @staticmethod
-    async def archive_proposal(proposal_id: str) -> Optional[Proposal]:
+    @write_flow
+    async def archive_proposal(proposal_id: str, actor_id: Optional[str] = None) -> Optional[Proposal]:
         """歸檔提案"""
         proposal = await ProposalService.get_proposal_by_id(proposal_id)
         if not proposal:
             return None
         
+        previous_status = proposal.status
         update_data = {
             "status": ProposalStatus.ARCHIVED,
             "updated_at": datetime.utcnow()
         }
         
-        await proposal.update({"$set": update_data})
+        await proposal.update({"$set": update_data}, session=current_session())
+        audit_log.record("proposal", proposal_id, "archive", actor_id, previous_status, ProposalStatus.ARCHIVED)
+        await StatusCounterService.proposal_transition(proposal.seller_id, previous_status, ProposalStatus.ARCHIVED)
+        _forget_proposal(proposal_id)
         return await ProposalService.get_proposal_by_id(proposal_id)
     
     @staticmethod
-    async def get_seller_proposals(seller_id: str, status: Optional[ProposalStatus] = None) -> List[Proposal]:
-        """獲取提案方的提案列表"""
+    @write_flow
+    async def delete_proposal(proposal_id: str, actor_id: Optional[str] = None) -> bool:
+        """刪除提案與其版本歷史"""
+        proposal = await ProposalService.get_proposal_by_id(proposal_id)
+        if not proposal:
+            return False
+        
+        await ProposalVersion.find({"proposal_id": proposal_id}, session=current_session()).delete()
+        await proposal.delete(session=current_session())
+        audit_log.record("proposal", proposal_id, "delete", actor_id, proposal.status, None)
+        await StatusCounterService.proposal_transition(proposal.seller_id, proposal.status, None)
+        _forget_proposal(proposal_id)
+        return True
+    
+    @staticmethod
+    async def get_seller_proposals(
+        seller_id: str,
+        status: Optional[ProposalStatus] = None,
+        include_archived: bool = False
+    ) -> List[Proposal]:
+        """獲取提案方的提案列表 (include_archived 時合併最近的歸檔提案)"""
         query = {"seller_id": seller_id}
         if status:
             query["status"] = status
         
-        return await Proposal.find(query).sort(-Proposal.created_at).to_list()
+        proposals = await find_for_read(Proposal, query, sort=[("created_at", -1)])
+        if include_archived and status in (None, ProposalStatus.ARCHIVED):
+            archived = await ArchiveService.find(Proposal, {"seller_id": seller_id})
+            proposals = merge_newest_first(proposals, archived)
+        return proposals
     
     @staticmethod
-    async def get_proposals_by_status(status: ProposalStatus) -> List[Proposal]:
+    async def get_proposals_by_status(status: ProposalStatus, include_archived: bool = False) -> List[Proposal]:
         """按狀態獲取提案列表 (admin 用)"""
-        return await Proposal.find({"status": status}).sort(-Proposal.created_at).to_list()
+        proposals = await find_for_read(Proposal, {"status": status}, sort=[("created_at", -1)])
+        if include_archived and status == ProposalStatus.ARCHIVED:
+            proposals = merge_newest_first(proposals, await ArchiveService.find(Proposal, {}))
+        return proposals
     
     @staticmethod
-    async def get_all_proposals() -> List[Proposal]:
+    async def get_all_proposals(include_archived: bool = False) -> List[Proposal]:
         """獲取所有提案 (admin 用)"""
-        return await Proposal.find().sort(-Proposal.created_at).to_list()
\ No newline at end of file
+        proposals = await find_for_read(Proposal, {}, sort=[("created_at", -1)])
+        if include_archived:
+            proposals = merge_newest_first(proposals, await ArchiveService.find(Proposal, {}))
+        return proposals
+    
+    # ========== 內容快照 ==========
+    
+    @staticmethod
+    async def get_snapshot(content_hash: str) -> Optional[ProposalSnapshot]:
+        """通過內容雜湊獲取快照 (先查快取)"""
+        snapshot = _snapshot_cache.get(content_hash)
+        if snapshot is None:
+            snapshot = await ProposalSnapshot.find_one({"content_hash": content_hash})
+            if snapshot:
+                _snapshot_cache.set(content_hash, snapshot)
+        return snapshot
+    
+    @staticmethod
+    async def get_or_create_snapshot(
+        proposal_id: str, title: str, brief_content: str, detailed_content: str
+    ) -> ProposalSnapshot:
+        """取得或建立內容快照 (相同內容只存一份)"""
+        content_hash = compute_content_hash(title, brief_content, detailed_content)
+        snapshot = await ProposalService.get_snapshot(content_hash)
+        if snapshot:
+            return snapshot
+        
+        snapshot = ProposalSnapshot(
+            content_hash=content_hash,
+            proposal_id=proposal_id,
+            title=title,
+            brief_content=brief_content,
+            detailed_content=detailed_content
+        )
+        try:
+            await snapshot.insert(session=current_session())
+        except DuplicateKeyError:
+            # 其他請求同時建立了相同內容的快照
+            snapshot = await ProposalSnapshot.find_one({"content_hash": content_hash})
+        
+        _snapshot_cache.set(content_hash, snapshot)
+        return snapshot
+
+
+class ProposalVersionService:
+    
+    @staticmethod
+    def is_snapshot_version(version: int) -> bool:
+        """第 1、K+1、2K+1... 版存完整內容"""
+        return (version - 1) % settings.PROPOSAL_VERSION_SNAPSHOT_INTERVAL == 0
+    
+    @staticmethod
+    async def record_version(
+        proposal_id: str,
+        version: int,
+        previous: Optional[Dict[str, str]],
+        content: Dict[str, str],
+        user_id: Optional[str]
+    ) -> ProposalVersion:
+        """寫入新版本 (完整內容或與前一版的差異)"""
+        entry = ProposalVersion(proposal_id=proposal_id, version=version, created_by=user_id)
+        if previous is None or ProposalVersionService.is_snapshot_version(version):
+            entry.is_snapshot = True
+            entry.content = content
+        else:
+            entry.delta = {
+                field: [list(edit) for edit in await run_diff(make_delta, previous[field], content[field])]
+                for field in VERSIONED_FIELDS
+                if previous[field] != content[field]
+            }
+        
+        try:
+            return await entry.insert(session=current_session())
+        except DuplicateKeyError:
+            raise ValueError("提案已被同時修改，請重新載入後再編輯")
+    
+    @staticmethod
+    async def ensure_history(proposal: Proposal) -> int:
+        """舊資料沒有版本歷史時，以目前內容建立第 1 版，回傳目前版本號"""
+        if proposal.version:
+            return proposal.version
+        
+        try:
+            await ProposalVersionService.record_version(
+                str(proposal.id), 1, None, _content_of(proposal), proposal.seller_id
+            )
+        except ValueError:
+            pass  # 其他請求已建立
+        await proposal.update({"$set": {"version": 1}}, session=current_session())
+        return 1
+    
+    @staticmethod
+    async def record_review(proposal_id: str, version: int, review_data: ProposalReview, reviewer_id: str):
+        """把審核結果寫到版本上"""
+        await ProposalVersion.find_one(
+            {"proposal_id": proposal_id, "version": version}, session=current_session()
+        ).update({
+            "$set": {
+                "reviewed_by": reviewer_id,
+                "reviewed_at": datetime.utcnow(),
+                "approved": review_data.approved,
+                "reject_reason": None if review_data.approved else review_data.reject_reason
+            }
+        })
+    
+    @staticmethod
+    async def get_versions(proposal_id: str) -> List[ProposalVersionResponse]:
+        """獲取版本列表 (不含內容)"""
+        return await ProposalVersion.find(
+            {"proposal_id": proposal_id}
+        ).sort(+ProposalVersion.version).project(ProposalVersionResponse).to_list()
+    
+    @staticmethod
+    async def get_version_content(proposal: Proposal, version: int) -> Optional[Dict[str, str]]:
+        """重建指定版本的內容：最近的完整版本 + 之後的差異"""
+        if version < 1 or version > max(proposal.version, 1):
+            return None
+        
+        # 最新版本就是提案本身
+        if version >= proposal.version:
+            return _content_of(proposal)
+        
+        proposal_id = str(proposal.id)
+        base = await ProposalVersion.find(
+            {"proposal_id": proposal_id, "version": {"$lte": version}, "is_snapshot": True}
+        ).sort(-ProposalVersion.version).first_or_none()
+        if not base:
+            return None
+        
+        content = dict(base.content)
+        if base.version < version:
+            entries = await ProposalVersion.find(
+                {"proposal_id": proposal_id, "version": {"$gt": base.version, "$lte": version}}
+            ).sort(+ProposalVersion.version).to_list()
+            for entry in entries:
+                if entry.is_snapshot:
+                    content = dict(entry.content)
+                    continue
+                for field, delta in (entry.delta or {}).items():
+                    content[field] = apply_delta(content[field], delta)
+        
+        return content
+    
+    @staticmethod
+    async def get_last_reviewed_version(proposal_id: str, before_version: int) -> Optional[int]:
+        """獲取 before_version 之前最後一個被審核過的版本號"""
+        entry = await ProposalVersion.find(
+            {"proposal_id": proposal_id, "version": {"$lt": before_version}, "reviewed_at": {"$ne": None}}
+        ).sort(-ProposalVersion.version).first_or_none()
+        return entry.version if entry else None
+    
+    @staticmethod
+    async def diff_versions(proposal: Proposal, from_version: int, to_version: int) -> Optional[Dict[str, List[str]]]:
+        """比較兩個版本，回傳有變動欄位的 unified diff"""
+        old = await ProposalVersionService.get_version_content(proposal, from_version)
+        new = await ProposalVersionService.get_version_content(proposal, to_version)
+        if old is None or new is None:
+            return None
+        
+        return {
+            field: await run_diff(text_diff, old[field], new[field], f"v{from_version}", f"v{to_version}")
+            for field in VERSIONED_FIELDS
+            if old[field] != new[field]
+        }
+
+
+class ReviewQueueService:
+    """審核佇列：管理員以租約領取待審提案，多位審核者可並行處理而不會重複審核"""
+    
+    @staticmethod
+    def reviewable_by(reviewer_id: str, now: datetime) -> Dict:
+        """審核中且未被其他管理員持有有效租約的條件"""
+        return {
+            "status": ProposalStatus.UNDER_REVIEW,
+            "$or": [
+                {"claimed_by": None},
+                {"claimed_by": reviewer_id},
+                {"lease_expires": {"$lte": now}}
+            ]
+        }
+    
+    @staticmethod
+    @write_flow
+    async def claim(reviewer_id: str, count: int) -> List[Proposal]:
+        """領取待審提案，讓手上持有的租約達到 count 筆 (已持有的會一併續約)，依提交時間排序"""
+        now = datetime.utcnow()
+        lease_expires = now + timedelta(seconds=settings.REVIEW_LEASE_SECONDS)
+        collection = Proposal.get_motor_collection()
+        held_query = {
+            "status": ProposalStatus.UNDER_REVIEW,
+            "claimed_by": reviewer_id,
+            "lease_expires": {"$gt": now}
+        }
+        
+        await collection.update_many(
+            held_query, {"$set": {"lease_expires": lease_expires}}, session=current_session()
+        )
+        claimed = await Proposal.find(held_query, session=current_session()).sort(+Proposal.submitted_at).to_list()
+        
+        # 每次原子地領取一筆：最早提交、且沒有有效租約的提案
+        available = {
+            "status": ProposalStatus.UNDER_REVIEW,
+            "$or": [{"lease_expires": None}, {"lease_expires": {"$lte": now}}]
+        }
+        while len(claimed) < count:
+            doc = await collection.find_one_and_update(
+                available,
+                {"$set": {"claimed_by": reviewer_id, "lease_expires": lease_expires}},
+                sort=[("submitted_at", 1)],
+                return_document=ReturnDocument.AFTER,
+                session=current_session()
+            )
+            if doc is None:
+                break
+            claimed.append(parse_obj(Proposal, doc))
+        
+        for proposal in claimed:
+            _forget_proposal(str(proposal.id))
+        return claimed
+    
+    @staticmethod
+    async def release(proposal_id: str, reviewer_id: str) -> bool:
+        """放回佇列 (只能放回自己領取的提案)"""
+        try:
+            object_id = PydanticObjectId(proposal_id)
+        except Exception:
+            return False
+        
+        result = await Proposal.get_motor_collection().update_one(
+            {"_id": object_id, "claimed_by": reviewer_id},
+            {"$set": {"claimed_by": None, "lease_expires": None}},
+            session=current_session()
+        )
+        _forget_proposal(proposal_id)
+        return result.matched_count > 0
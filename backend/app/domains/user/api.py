@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from .schemas import UserResponse, UserUpdate, UserProfile
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from typing import List, Literal
+from .schemas import UserResponse, UserUpdate, UserProfile, UserImportReport
+from .importer import UserImportService, parse_import
 from .services import UserService
 from .models import User
 from app.domains.auth.deps import get_current_active_user, require_admin
 from app.shared.models.enums import UserRole
+from app.core.admission import list_endpoint_limits
+from app.core.config import settings
 
 
 router = APIRouter(prefix="/users", tags=["用戶管理"])
@@ -37,7 +40,7 @@ async def update_my_profile(
         )
 
 
-@router.get("/buyers", response_model=List[UserResponse])
+@router.get("/buyers", response_model=List[UserResponse], dependencies=list_endpoint_limits("users.buyers"))
 async def get_buyers(current_user: User = Depends(get_current_active_user)):
     """獲取買方用戶列表（用於發送 case）"""
     # 只有 seller 和 admin 可以查看買方列表
@@ -76,13 +79,46 @@ async def get_user_profile(
 
 
 # 管理員專用 API
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=List[UserResponse], dependencies=list_endpoint_limits("users.all"))
 async def get_all_users(admin_user: User = Depends(require_admin)):
     """獲取所有用戶列表（管理員專用）"""
     users = await User.find(User.is_active == True).to_list()
     return [UserResponse(**user.dict_public()) for user in users]
 
 
+@router.post("/import", response_model=UserImportReport)
+async def import_users(
+    request: Request,
+    import_format: Literal["csv", "jsonl"] = Query("csv", alias="format"),
+    admin_user: User = Depends(require_admin)
+):
+    """批次匯入用戶（管理員專用）- 請求主體為 CSV (含標題列) 或 JSONL，回傳每列結果"""
+    content = bytearray()
+    async for chunk in request.stream():
+        content.extend(chunk)
+        if len(content) > settings.USER_IMPORT_MAX_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="檔案過大，請使用 scripts/import_users.py 匯入"
+            )
+    
+    try:
+        rows = parse_import(bytes(content), import_format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"單次最多匯入 {settings.USER_IMPORT_MAX_ROWS} 筆，請使用 scripts/import_users.py 匯入"
+        )
+    
+    return await UserImportService.import_users(rows)
+
+
 @router.delete("/{user_id}")
 async def deactivate_user(
     user_id: str,
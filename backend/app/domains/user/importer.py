@@ -0,0 +1,153 @@
+# app/domains/user/importer.py - 批次匯入用戶
+
+import csv
+import io
+import json
+from typing import Any, Dict, List, Tuple
+
+from beanie.odm.utils.dump import get_dict
+from pydantic import ValidationError
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from .models import User
+from .schemas import UserCreate, UserImportReport, UserImportRowResult
+from app.core.cache_bus import cache_bus
+from app.core.security import hash_passwords
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# MongoDB duplicate key
+_DUPLICATE_KEY = 11000
+
+
+def parse_import(content: bytes, import_format: str) -> List[Tuple[int, Any]]:
+    """解析 CSV (第一列為欄位名稱) 或 JSONL，回傳 (列號, 資料)
+
+    無法解析的單列資料為 ValueError；整個檔案無法解析時拋出 ValueError。
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("檔案必須是 UTF-8 編碼")
+
+    if import_format == "csv":
+        try:
+            reader = csv.DictReader(io.StringIO(text))
+            return [
+                (line, {key: value for key, value in row.items() if key and value not in (None, "")})
+                for line, row in enumerate(reader, start=2)
+            ]
+        except csv.Error as e:
+            raise ValueError(f"CSV 格式錯誤: {e}")
+
+    rows = []
+    for line, raw in enumerate(text.splitlines(), start=1):
+        if not raw.strip():
+            continue
+        try:
+            rows.append((line, json.loads(raw)))
+        except json.JSONDecodeError as e:
+            rows.append((line, ValueError(f"JSON 格式錯誤: {e.msg}")))
+    return rows
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+class UserImportService:
+
+    @staticmethod
+    async def import_users(rows: List[Tuple[int, Any]]) -> UserImportReport:
+        """匯入用戶：一次查詢檢查既有帳號、process pool 雜湊密碼、unordered bulk_write 寫入"""
+        results: Dict[int, UserImportRowResult] = {}
+        candidates: List[Tuple[int, UserCreate]] = []
+        seen_emails, seen_usernames = set(), set()
+
+        # 1. 驗證並排除檔案內重複的列
+        for line, data in rows:
+            email = data.get("email") if isinstance(data, dict) else None
+            if isinstance(data, Exception) or not isinstance(data, dict):
+                detail = str(data) if isinstance(data, Exception) else "每列必須是物件"
+                results[line] = UserImportRowResult(row=line, status="invalid", detail=detail)
+                continue
+            try:
+                user_data = UserCreate(**data)
+            except ValidationError as e:
+                results[line] = UserImportRowResult(
+                    row=line, status="invalid", email=email, detail=_validation_message(e)
+                )
+                continue
+
+            if user_data.email in seen_emails or user_data.username in seen_usernames:
+                results[line] = UserImportRowResult(
+                    row=line, status="duplicate", email=user_data.email, detail="檔案內重複的 Email 或用戶名"
+                )
+                continue
+            seen_emails.add(user_data.email)
+            seen_usernames.add(user_data.username)
+            candidates.append((line, user_data))
+
+        # 2. 一次查詢找出已存在的 email / username
+        taken_emails, taken_usernames = set(), set()
+        if candidates:
+            existing = User.get_motor_collection().find(
+                {"$or": [
+                    {"email": {"$in": list(seen_emails)}},
+                    {"username": {"$in": list(seen_usernames)}}
+                ]},
+                {"email": 1, "username": 1}
+            )
+            async for doc in existing:
+                taken_emails.add(doc.get("email"))
+                taken_usernames.add(doc.get("username"))
+
+        to_create: List[Tuple[int, UserCreate]] = []
+        for line, user_data in candidates:
+            if user_data.email in taken_emails:
+                results[line] = UserImportRowResult(row=line, status="exists", email=user_data.email, detail="Email 已存在")
+            elif user_data.username in taken_usernames:
+                results[line] = UserImportRowResult(row=line, status="exists", email=user_data.email, detail="用戶名已存在")
+            else:
+                to_create.append((line, user_data))
+
+        # 3. 並行雜湊密碼後以 unordered bulk_write 寫入 (單列失敗不影響其他列)
+        hashed = await hash_passwords([user_data.password for _, user_data in to_create])
+        documents = [
+            get_dict(User(**user_data.dict(exclude={"password"}), hashed_password=hashed_password), to_db=True)
+            for (_, user_data), hashed_password in zip(to_create, hashed)
+        ]
+
+        write_errors: Dict[int, Dict[str, Any]] = {}
+        if documents:
+            try:
+                await User.get_motor_collection().bulk_write(
+                    [InsertOne(document) for document in documents], ordered=False
+                )
+            except BulkWriteError as e:
+                write_errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+
+        for index, ((line, user_data), document) in enumerate(zip(to_create, documents)):
+            error = write_errors.get(index)
+            if error is None:
+                user_id = str(document["_id"])
+                results[line] = UserImportRowResult(row=line, status="created", email=user_data.email, user_id=user_id)
+                cache_bus.invalidate(User, user_id)
+            elif error.get("code") == _DUPLICATE_KEY:
+                results[line] = UserImportRowResult(row=line, status="exists", email=user_data.email, detail="Email 或用戶名已存在")
+            else:
+                results[line] = UserImportRowResult(row=line, status="error", email=user_data.email, detail=error.get("errmsg"))
+
+        ordered = [results[line] for line in sorted(results)]
+        created = sum(1 for result in ordered if result.status == "created")
+        skipped = sum(1 for result in ordered if result.status in ("exists", "duplicate"))
+        return UserImportReport(
+            total=len(ordered),
+            created=created,
+            skipped=skipped,
+            failed=len(ordered) - created - skipped,
+            results=ordered
+        )
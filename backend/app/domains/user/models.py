@@ -2,6 +2,7 @@ from beanie import Document
 from pydantic import EmailStr, Field
 from typing import Optional
 from datetime import datetime
+from pymongo import IndexModel, ASCENDING
 from app.shared.models.enums import UserRole
 
 
@@ -25,6 +26,12 @@ class User(Document):
     
     class Settings:
         collection = "users"
+        indexes = [
+            "updated_at",  # cache_bus 輪詢用
+            # 並行註冊/批次匯入時由資料庫保證不重複
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+            IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        ]
         
     def dict_public(self):
         """返回公開資訊（不包含密碼）"""
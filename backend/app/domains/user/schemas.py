@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from app.shared.models.enums import UserRole
 
@@ -45,4 +45,20 @@ class UserProfile(BaseModel):
     company_name: Optional[str] = None
     contact_person: Optional[str] = None
     phone: Optional[str] = None
-    description: Optional[str] = None
\ No newline at end of file
+    description: Optional[str] = None
+
+class UserImportRowResult(BaseModel):
+    """批次匯入單列結果 (status: created / exists / duplicate / invalid / error)"""
+    row: int
+    status: str
+    email: Optional[str] = None
+    user_id: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class UserImportReport(BaseModel):
+    total: int
+    created: int
+    skipped: int
+    failed: int
+    results: List[UserImportRowResult]
@@ -1,12 +1,40 @@
 # app/domains/user/services.py - 修正版
 
-from typing import Optional, List
+import logging
+from typing import Optional, List, Dict
 from datetime import datetime
 from beanie import PydanticObjectId
 from .models import User
 from .schemas import UserCreate, UserUpdate
+from app.core.cache_bus import cache_bus
+from app.core.identity_map import forget_document, load_document
+from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from app.shared.models.enums import UserRole
+from app.shared.utils.cache import LRUCache, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 用戶快取 (USER_CACHE_ENABLED 時使用)，任何 worker 修改 users 都會經由 cache_bus 失效
+_user_cache = LRUCache(maxsize=settings.USER_CACHE_SIZE)
+_role_cache = LRUCache(maxsize=len(UserRole))
+
+# 尖峰時許多賣方同時開啟建立 case 頁面查詢買方列表，並行的相同查詢共用一次
+_role_flights = SingleFlight()
+
+
+def _evict_user(user_id: Optional[str]):
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(user_id)
+        forget_document(User, user_id)
+    _role_cache.clear()
+    _role_flights.forget()
+
+
+cache_bus.subscribe(User, _evict_user)
+
 
 class UserService:
     
@@ -32,7 +60,9 @@ class UserService:
         del user_dict["password"]
         
         user = User(**user_dict)
-        return await user.insert()
+        await user.insert()
+        cache_bus.invalidate(User, str(user.id))
+        return user
     
     @staticmethod
     async def get_user_by_email(email: str) -> Optional[User]:
@@ -40,7 +70,7 @@ class UserService:
         try:
             return await User.find_one({"email": email})
         except Exception as e:
-            print(f"❌ 查詢用戶失敗: {e}")
+            logger.warning("查詢用戶失敗，重新初始化資料庫: %s", e)
             # 如果 Beanie 沒有初始化，嘗試重新初始化
             from app.core.database import init_db
             await init_db()
@@ -53,11 +83,46 @@ class UserService:
     
     @staticmethod
     async def get_user_by_id(user_id: str) -> Optional[User]:
-        """通過 ID 獲取用戶"""
+        """通過 ID 獲取用戶 (每個請求最多讀一次，同一 tick 的讀取合併查詢)"""
+        return await load_document(User, user_id, UserService._fetch_users, UserService._load_user)
+    
+    @staticmethod
+    async def _load_user(user_id: str) -> Optional[User]:
+        if settings.USER_CACHE_ENABLED:
+            user = _user_cache.get(user_id)
+            if user is not None:
+                return user
+        
+        generation = _user_cache.generation
         try:
-            return await User.get(PydanticObjectId(user_id))
+            user = await User.get(PydanticObjectId(user_id))
         except:
             return None
+        
+        if user and settings.USER_CACHE_ENABLED:
+            _user_cache.set(user_id, user, generation=generation)
+        return user
+    
+    @staticmethod
+    async def _fetch_users(user_ids: List[str]) -> Dict[str, User]:
+        if len(user_ids) == 1:
+            return {user_ids[0]: await UserService._load_user(user_ids[0])}
+        
+        users: Dict[str, User] = {}
+        if settings.USER_CACHE_ENABLED:
+            for user_id in user_ids:
+                user = _user_cache.get(user_id)
+                if user is not None:
+                    users[user_id] = user
+        
+        missing = [PydanticObjectId(user_id) for user_id in user_ids if user_id not in users and PydanticObjectId.is_valid(user_id)]
+        if missing:
+            generation = _user_cache.generation
+            for user in await User.find({"_id": {"$in": missing}}).to_list():
+                users[str(user.id)] = user
+                if settings.USER_CACHE_ENABLED:
+                    _user_cache.set(str(user.id), user, generation=generation)
+        return users
     
     @staticmethod
     async def update_user(user_id: str, user_data: UserUpdate) -> Optional[User]:
@@ -70,6 +135,7 @@ class UserService:
         update_data["updated_at"] = datetime.utcnow()
         
         await user.update({"$set": update_data})
+        cache_bus.invalidate(User, user_id)
         return await UserService.get_user_by_id(user_id)
     
     @staticmethod
@@ -80,12 +146,26 @@ class UserService:
             return None
         
         await user.update({"$set": {"is_active": False, "updated_at": datetime.utcnow()}})
+        cache_bus.invalidate(User, user_id)
         return await UserService.get_user_by_id(user_id)
     
     @staticmethod
     async def get_users_by_role(role: UserRole) -> List[User]:
-        """根據角色獲取用戶列表"""
-        return await User.find({"role": role, "is_active": True}).to_list()
+        """根據角色獲取用戶列表 (並行的相同查詢共用一次)"""
+        if settings.USER_CACHE_ENABLED:
+            users = _role_cache.get(role)
+            if users is not None:
+                return users
+        
+        return await _role_flights.do(role, lambda: UserService._load_users_by_role(role))
+    
+    @staticmethod
+    async def _load_users_by_role(role: UserRole) -> List[User]:
+        generation = _role_cache.generation
+        users = await User.find({"role": role, "is_active": True}).to_list()
+        if settings.USER_CACHE_ENABLED:
+            _role_cache.set(role, users, generation=generation)
+        return users
     
     @staticmethod
     async def get_all_users() -> List[User]:
@@ -1,31 +1,79 @@
 # app/main.py - 確保正確設置
 
-from fastapi import FastAPI
+import logging
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from pymongo.errors import WaitQueueTimeoutError
 
-from app.core.database import connect_to_mongo, close_mongo_connection, init_db
+from app.core.database import connect_to_mongo, close_mongo_connection, init_db, db
+from app.core.cache_bus import cache_bus
 from app.core.config import settings
 from app.api.v1.router import api_router
-from fastapi.middleware.cors import CORSMiddleware  # 添加這行
+from app.core.startup import StartupTimer
+from app.core.security import shutdown_hash_pool
+from app.core.admission import AdmissionControlMiddleware, overloaded_response
+from app.core.identity_map import IdentityMapMiddleware
+from app.core.etag import ETagMiddleware
+from app.core.logs import RequestLoggingMiddleware, setup_logging, shutdown_logging
+from app.core.health import health
+
+_import_seconds = time.perf_counter() - _import_started
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 啟動時
-    print("🚀 啟動應用程式...")
+    setup_logging()
+    logger.info("啟動應用程式")
+    health.loop_monitor.start()
+    health.install_drain_handler()
+    timer = StartupTimer()
+    timer.record("import", _import_seconds)
     try:
-        await connect_to_mongo()
-        await init_db()
-        print("✅ 應用程式啟動完成")
+        with timer.phase("connect_mongo"):
+            await connect_to_mongo()
+        with timer.phase("init_beanie"):
+            await init_db()
+        # 非必要的子系統在使用的階段才導入，import 階段的耗時只反映處理請求所需的模組
+        with timer.phase("slow_queries"):
+            from app.core.slow_queries import slow_query_monitor
+            await slow_query_monitor.start(db.client, db.database)
+        with timer.phase("cache_bus"):
+            await cache_bus.start()
+        with timer.phase("scheduler"):
+            from app.core.scheduler import scheduler, register_default_jobs
+            register_default_jobs()
+            await scheduler.start()
+        health.mark_ready()
+        logger.info("應用程式啟動完成")
     except Exception as e:
-        print(f"❌ 應用程式啟動失敗: {e}")
+        logger.exception("應用程式啟動失敗")
         raise e
+    finally:
+        logger.info("啟動階段耗時", extra={"phases_ms": timer.as_dict()})
     
     yield
     
     # 關閉時
-    print("🔌 關閉應用程式...")
+    logger.info("關閉應用程式")
+    health.mark_draining()
+    from app.core.scheduler import scheduler
+    from app.core.slow_queries import slow_query_monitor
+    from app.domains.audit.services import audit_log
+    await scheduler.stop()
+    await cache_bus.stop()
+    await audit_log.stop()
+    await slow_query_monitor.stop()
+    shutdown_hash_pool()
     await close_mongo_connection()
+    await health.loop_monitor.stop()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -34,6 +82,20 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# middleware 越晚加入越外層：CORS → 請求日誌 → 准入控制 → ETag → identity map → 路由
+
+# 每個請求一個 identity map (在准入控制之內，被拒絕的請求不用建立)
+app.add_middleware(IdentityMapMiddleware)
+
+# API GET JSON 回應的 ETag，前端快取層以 If-None-Match 重新驗證
+app.add_middleware(ETagMiddleware, path_prefix="/api/v1/")
+
+# 准入控制 (在 CORS 之內，503 回應也帶 CORS 標頭)
+app.add_middleware(AdmissionControlMiddleware)
+
+# request id 與存取日誌 (在准入控制之外，被拒絕的請求也有紀錄)
+app.add_middleware(RequestLoggingMiddleware)
+
 # CORS 設置
 app.add_middleware(
     CORSMiddleware,
@@ -43,8 +105,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Request-ID"],  # 前端快取層需要讀取 ETag
 )
 
+# 連線池等待逾時：快速回 503 而不是讓請求一直排隊
+@app.exception_handler(WaitQueueTimeoutError)
+async def wait_queue_timeout_handler(request: Request, exc: WaitQueueTimeoutError):
+    return overloaded_response()
+
 # 註冊 API 路由 - 這是關鍵！
 app.include_router(api_router, prefix="/api/v1")
 
@@ -53,7 +121,15 @@ app.include_router(api_router, prefix="/api/v1")
 async def root():
     return {"message": "M&A Platform API", "status": "running"}
 
-# 健康檢查
+# 存活檢查：行程與事件迴圈還在運作即可 (不檢查相依服務，避免資料庫故障時所有 worker 被重啟)
+@app.get("/health/live")
+async def liveness_check():
+    return {"status": "alive"}
+
+# 就緒檢查：啟動完成、MongoDB 可用、連線池與事件迴圈沒有塞車才接流量
+@app.get("/health/ready")
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+async def readiness_check():
+    result = await health.readiness()
+    code = status.HTTP_200_OK if result["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=code, content=result)
\ No newline at end of file
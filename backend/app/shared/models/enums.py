@@ -35,4 +35,5 @@ class CaseStatus(str, Enum):
     CREATED = "created"        # 已建立發送給買方
     INTERESTED = "interested"  # 買方表達興趣
     REJECTED = "rejected"      # 買方拒絕
-    NDA_SIGNED = "nda_signed"  # 買方已簽 NDA
\ No newline at end of file
+    NDA_SIGNED = "nda_signed"  # 買方已簽 NDA
+    EXPIRED = "expired"        # 買方逾期未回應
\ No newline at end of file
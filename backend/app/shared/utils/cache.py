@@ -0,0 +1,90 @@
+# app/shared/utils/cache.py - 行程內快取
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """簡單的 LRU 快取 (單一 event loop 內使用，不需要鎖)"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # 每次移除項目時遞增，讓「讀取前拿到的 generation」判斷期間是否發生失效
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """取得快取值，不存在時回傳 None"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """寫入快取，超過容量時淘汰最久未使用的項目
+
+        指定 generation 時，若讀取期間快取已被失效則不寫入 (避免寫回過期資料)。
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """移除快取項目"""
+        self.generation += 1
+        self._data.pop(key, None)
+
+    def clear(self):
+        self.generation += 1
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """合併並行的相同讀取：同一 key 同時只有一個查詢在執行，其他呼叫共用它的結果
+
+    共用的結果是同一個物件，呼叫端只能讀取不能修改 (寫入流程請直接查詢)。
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future"] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.shared += 1
+        # shield：某個呼叫端被取消 (例如客戶端斷線) 不會連帶取消其他人等待的查詢
+        return await asyncio.shield(call)
+
+    def _finish(self, key: Hashable, call: "asyncio.Future"):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            call.exception()  # 所有呼叫端都已取消時避免 "exception was never retrieved"
+
+    def forget(self, key: Optional[Hashable] = None):
+        """資料已變更：之後的呼叫不再加入進行中的查詢 (key 為 None 時全部)"""
+        if key is None:
+            self._calls.clear()
+        else:
+            self._calls.pop(key, None)
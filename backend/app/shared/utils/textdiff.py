@@ -0,0 +1,64 @@
+# app/shared/utils/textdiff.py - 文字差異 (版本歷史用)
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher, unified_diff
+from functools import partial
+from itertools import accumulate
+from typing import Any, Callable, List, Tuple
+
+# 單一編輯: [起始位置, 結束位置, 替換文字]，位置以舊文字為準
+Edit = Tuple[int, int, str]
+
+# 超過此長度 (新舊合計字元數) 的比對移到背景執行緒，不佔用事件迴圈
+INLINE_DIFF_MAX_CHARS = 20000
+
+# 獨立的執行緒池，不和 Motor 使用的預設 executor 搶執行緒
+_diff_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="textdiff")
+
+
+def make_delta(old: str, new: str) -> List[Edit]:
+    """計算把 old 轉成 new 的編輯列表
+
+    以行為單位比對 (逐字比對在長內容上是平方時間，會卡住事件迴圈)；
+    位置仍以字元計算，與 apply_delta 及已存的版本相容。
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    offsets = list(accumulate((len(line) for line in old_lines), initial=0))
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        (offsets[i1], offsets[i2], "".join(new_lines[j1:j2]))
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(old: str, delta: List[Edit]) -> str:
+    """把編輯列表套用到 old 上"""
+    parts = []
+    position = 0
+    for start, end, text in delta:
+        parts.append(old[position:start])
+        parts.append(text)
+        position = end
+    parts.append(old[position:])
+    return "".join(parts)
+
+
+def text_diff(old: str, new: str, from_label: str, to_label: str) -> List[str]:
+    """產生逐行的 unified diff (給審核者閱讀)"""
+    return list(unified_diff(
+        old.splitlines(),
+        new.splitlines(),
+        fromfile=from_label,
+        tofile=to_label,
+        lineterm=""
+    ))
+
+
+async def run_diff(func: Callable[..., Any], old: str, new: str, *args) -> Any:
+    """執行 make_delta / text_diff：短內容直接計算，長內容在背景執行緒計算"""
+    if len(old) + len(new) <= INLINE_DIFF_MAX_CHARS:
+        return func(old, new, *args)
+    return await asyncio.get_running_loop().run_in_executor(_diff_executor, partial(func, old, new, *args))
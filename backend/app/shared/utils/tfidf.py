@@ -0,0 +1,102 @@
+# app/shared/utils/tfidf.py - 可增量更新的 TF-IDF 倒排索引
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# 英數字取整個單字，中日韓文字取二字詞 (不需要斷詞詞典)
+_WORD = re.compile(r"[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+_CJK = re.compile(r"[^a-z0-9]")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if not _CJK.match(word):
+            tokens.append(word)
+        elif len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _tf_weights(text: str) -> Dict[str, float]:
+    """次線性 tf (1 + log count)，再做 L2 正規化消除文件長度的影響"""
+    counts = Counter(tokenize(text))
+    weights = {term: 1 + math.log(count) for term, count in counts.items()}
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    return {term: w / norm for term, w in weights.items()} if norm else {}
+
+
+class TfidfIndex:
+    """文件 → 正規化 tf 的倒排索引
+
+    idf 在查詢時才套用，新增/移除單一文件不需要重算其他文件的向量。
+    查詢只走過查詢字詞的 posting list，成本與命中的文件數成正比，而不是總文件數。
+    """
+
+    # 出現在超過此比例文件中的字詞幾乎沒有鑑別力，查詢時略過
+    max_df_ratio = 0.5
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._docs: Dict[str, Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._docs
+
+    def add(self, doc_id: str, text: str):
+        """新增或取代文件"""
+        self.remove(doc_id)
+        weights = _tf_weights(text)
+        if not weights:
+            return
+        self._docs[doc_id] = weights
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[doc_id] = weight
+
+    def remove(self, doc_id: str):
+        weights = self._docs.pop(doc_id, None)
+        if not weights:
+            return
+        for term in weights:
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+
+    def clear(self):
+        self._postings.clear()
+        self._docs.clear()
+
+    def idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log((1 + len(self._docs)) / (1 + df)) + 1
+
+    def search(self, text: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """回傳與 text 最相關的 (doc_id, score)，依分數由高到低"""
+        total = len(self._docs)
+        query = {}
+        for term, weight in _tf_weights(text).items():
+            posting = self._postings.get(term)
+            if posting and (total < 10 or len(posting) <= total * self.max_df_ratio):
+                query[term] = weight * self.idf(term)
+
+        norm = math.sqrt(sum(w * w for w in query.values()))
+        if not norm:
+            return []
+
+        scores: Dict[str, float] = {}
+        for term, weight in query.items():
+            # 文件端也乘上 idf：分數 = Σ (q_tf·idf)(d_tf·idf) / |q|
+            factor = weight * self.idf(term) / norm
+            for doc_id, doc_weight in self._postings[term].items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + factor * doc_weight
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
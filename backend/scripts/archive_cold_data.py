@@ -0,0 +1,51 @@
+# scripts/archive_cold_data.py
+"""
+把冷資料移到 archive collection (archived 提案、rejected case)
+
+分批搬移並在每批之間暫停，可在上線時段執行：
+    python scripts/archive_cold_data.py --dry-run
+    python scripts/archive_cold_data.py --batch-size 500 --pause 0.5
+
+搬移後常用 collection 的磁碟空間需要 compact 才會釋放，但索引與 working set 立即變小。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加 backend 目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import connect_to_mongo, close_mongo_connection, init_db
+from app.domains.archive.services import ArchiveService, POLICIES
+
+
+async def archive_cold_data(batch_size: int, pause: float, dry_run: bool):
+    await connect_to_mongo()
+    await init_db()
+    try:
+        await ArchiveService.ensure_indexes()
+        for model, policy in POLICIES.items():
+            started = time.perf_counter()
+            moved = await ArchiveService.archive_cold(model, batch_size, pause, dry_run=dry_run)
+            action = "可搬移 (第一批)" if dry_run else "已搬移"
+            print(f"📦 {model.__name__} ({policy.status}, {policy.after_days} 天前): {action} {moved} 筆"
+                  f" ({time.perf_counter() - started:.1f}s)")
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="歸檔冷資料")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.ARCHIVE_BATCH_PAUSE_SECONDS, help="每批之間暫停秒數")
+    parser.add_argument("--dry-run", action="store_true", help="只計算第一批的筆數，不搬移")
+    args = parser.parse_args()
+    asyncio.run(archive_cold_data(args.batch_size, args.pause, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+# scripts/benchmark_services.py
+"""
+Service 層效能基準測試
+
+對 UserService / AuthService / ProposalService / CaseService / CommentService
+的每個方法計時，列表類方法會在不同資料量 (預設 1k / 10k / 100k) 下各測一次，
+結果寫入 JSON，方便跨 commit 比較。
+
+使用方式 (需要本地 MongoDB，預設使用獨立的 *_bench 資料庫，結束後會刪除):
+    python scripts/benchmark_services.py
+    python scripts/benchmark_services.py --sizes 1000,10000 --repeat 3
+    python scripts/benchmark_services.py --compare bench_results/services-abc1234.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+# 添加 backend 目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import db, connect_to_mongo, close_mongo_connection, init_db
+from app.core.security import get_password_hash, create_refresh_token
+from app.domains.user.models import User
+from app.domains.user.schemas import UserCreate, UserUpdate
+from app.domains.user.services import UserService
+from app.domains.auth.models import RefreshToken
+from app.domains.auth.schemas import LoginRequest
+from app.domains.auth.services import AuthService
+from app.domains.audit.services import audit_log
+from app.domains.proposal.models import Proposal
+from app.domains.proposal.schemas import ProposalCreate, ProposalUpdate, ProposalReview
+from app.domains.proposal.services import ProposalService
+from app.domains.case.models import Case, Comment
+from app.domains.case.schemas import CaseCreate, CommentCreate
+from app.domains.case.services import CaseService, CommentService
+from app.shared.models.enums import UserRole, ProposalStatus, CaseStatus
+
+BENCH_PASSWORD = "password123"
+SEED_BATCH_SIZE = 5000
+
+# 模擬真實資料大小的內容
+BRIEF_CONTENT = "一家創新科技公司尋求戰略投資者，主營 AI 與企業軟體。" * 4
+DETAILED_CONTENT = "詳細資訊：年營收、客戶結構、財務預測與技術專利說明。" * 60
+
+
+class BenchmarkRunner:
+    """執行計時並收集結果"""
+
+    def __init__(self, repeat: int, warmup: int):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.results = []
+
+    async def run(self, name: str, size: int, func, setup=None):
+        """執行 warmup + repeat 次，只記錄 repeat 次的耗時 (setup 不計時)"""
+        timings = []
+        for i in range(self.warmup + self.repeat):
+            args = await setup() if setup else ()
+            start = time.perf_counter()
+            await func(*args)
+            elapsed = time.perf_counter() - start
+            if i >= self.warmup:
+                timings.append(elapsed)
+
+        result = summarize(name, size, timings)
+        self.results.append(result)
+        print(
+            f"  {name:<45} n={size:<7} "
+            f"median={result['median_ms']:>9.2f}ms  p95={result['p95_ms']:>9.2f}ms"
+        )
+
+
+def summarize(name: str, size: int, timings: list) -> dict:
+    """整理單一基準的統計數據 (毫秒)"""
+    ordered = sorted(t * 1000 for t in timings)
+    p95_index = max(0, int(round(len(ordered) * 0.95)) - 1)
+    return {
+        "name": name,
+        "size": size,
+        "runs": len(ordered),
+        "min_ms": ordered[0],
+        "median_ms": statistics.median(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p95_ms": ordered[p95_index],
+        "max_ms": ordered[-1],
+    }
+
+
+class Seeder:
+    """建立基準測試所需的資料，依資料量逐步補齊"""
+
+    def __init__(self):
+        self.hashed_password = get_password_hash(BENCH_PASSWORD)
+        self.counter = 0
+        self.buyer_count = 0
+        self.proposal_count = 0
+        self.case_count = 0
+        self.comment_count = 0
+
+    def next_id(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    def user_doc(self, role: UserRole) -> dict:
+        n = self.next_id()
+        now = datetime.utcnow()
+        return {
+            "email": f"bench-{role.value}-{n}@bench.example.com",
+            "username": f"bench_{role.value}_{n}",
+            "hashed_password": self.hashed_password,
+            "role": role.value,
+            "company_name": f"Bench Company {n}",
+            "contact_person": f"Contact {n}",
+            "phone": "0900-000-000",
+            "description": "專注於科技與製造業併購的投資機構",
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    async def create_user(self, role: UserRole) -> User:
+        user = User(**self.user_doc(role))
+        return await user.insert()
+
+    async def setup_fixed(self):
+        """建立固定的熱點資料：一個賣方、一個買方、一個 case"""
+        self.admin = await self.create_user(UserRole.ADMIN)
+        self.seller = await self.create_user(UserRole.SELLER)
+        self.buyer = await self.create_user(UserRole.BUYER)
+        # 寫入類基準使用獨立帳號，避免影響列表資料量
+        self.writer_seller = await self.create_user(UserRole.SELLER)
+        self.writer_buyer = await self.create_user(UserRole.BUYER)
+        self.buyer_count = 2
+
+        self.proposal = await self.insert_proposal(str(self.seller.id), ProposalStatus.APPROVED)
+        self.snapshot = await self.snapshot_of(self.proposal)
+        self.case = await Case(
+            proposal_id=str(self.proposal.id),
+            seller_id=str(self.seller.id),
+            buyer_id=str(self.buyer.id),
+            title=self.proposal.title,
+            snapshot_hash=self.snapshot.content_hash,
+            status=CaseStatus.NDA_SIGNED,
+            nda_signed_at=datetime.utcnow(),
+        ).insert()
+        self.proposal_count = 1
+        self.case_count = 1
+
+    async def insert_proposal(self, seller_id: str, status: ProposalStatus) -> Proposal:
+        n = self.next_id()
+        proposal = Proposal(
+            title=f"Bench Proposal {n}",
+            brief_content=BRIEF_CONTENT,
+            detailed_content=DETAILED_CONTENT,
+            seller_id=seller_id,
+            status=status,
+        )
+        return await proposal.insert()
+
+    async def snapshot_of(self, proposal: Proposal):
+        return await ProposalService.get_or_create_snapshot(
+            str(proposal.id), proposal.title, proposal.brief_content, proposal.detailed_content
+        )
+
+    async def insert_case(self, buyer_id: str, status: CaseStatus = CaseStatus.CREATED) -> Case:
+        proposal = await self.insert_proposal(str(self.writer_seller.id), ProposalStatus.APPROVED)
+        snapshot = await self.snapshot_of(proposal)
+        case = Case(
+            proposal_id=str(proposal.id),
+            seller_id=str(self.writer_seller.id),
+            buyer_id=buyer_id,
+            title=proposal.title,
+            snapshot_hash=snapshot.content_hash,
+            status=status,
+        )
+        return await case.insert()
+
+    async def insert_many(self, model, docs_factory, count: int):
+        """分批 insert_many，避免一次建立過大的請求"""
+        collection = model.get_motor_collection()
+        remaining = count
+        while remaining > 0:
+            batch = min(remaining, SEED_BATCH_SIZE)
+            await collection.insert_many([docs_factory() for _ in range(batch)], ordered=False)
+            remaining -= batch
+
+    async def grow_to(self, size: int):
+        """把買方數、熱點賣方提案數、熱點買方 case 數、熱點 case 留言數補到 size"""
+        statuses = list(ProposalStatus)
+        seller_id = str(self.seller.id)
+        buyer_id = str(self.buyer.id)
+        base_time = datetime.utcnow()
+
+        def proposal_doc():
+            n = self.next_id()
+            return {
+                "title": f"Bench Proposal {n}",
+                "brief_content": BRIEF_CONTENT,
+                "detailed_content": DETAILED_CONTENT,
+                "status": statuses[n % len(statuses)].value,
+                "seller_id": seller_id,
+                "created_at": base_time - timedelta(seconds=n),
+                "updated_at": base_time - timedelta(seconds=n),
+            }
+
+        def case_doc():
+            n = self.next_id()
+            return {
+                "proposal_id": str(self.proposal.id),
+                "seller_id": seller_id,
+                "buyer_id": buyer_id,
+                "title": f"Bench Case {n}",
+                "snapshot_hash": self.snapshot.content_hash,
+                "status": CaseStatus.CREATED.value,
+                "created_at": base_time - timedelta(seconds=n),
+                "updated_at": base_time - timedelta(seconds=n),
+            }
+
+        def comment_doc():
+            n = self.next_id()
+            return {
+                "case_id": str(self.case.id),
+                "user_id": buyer_id if n % 2 else seller_id,
+                "content": f"留言內容 {n}：請問財務報表何時可以提供？",
+                "created_at": base_time - timedelta(seconds=n),
+            }
+
+        print(f"🌱 補齊資料到 {size} 筆...")
+        await self.insert_many(User, lambda: self.user_doc(UserRole.BUYER), size - self.buyer_count)
+        await self.insert_many(Proposal, proposal_doc, size - self.proposal_count)
+        await self.insert_many(Case, case_doc, size - self.case_count)
+        await self.insert_many(Comment, comment_doc, size - self.comment_count)
+        self.buyer_count = self.proposal_count = self.case_count = self.comment_count = size
+
+
+async def bench_user_service(runner: BenchmarkRunner, seeder: Seeder, size: int):
+    seller = seeder.seller
+
+    async def new_user_data():
+        n = seeder.next_id()
+        return (UserCreate(
+            email=f"bench-new-{n}@bench.example.com",
+            username=f"bench_new_{n}",
+            password=BENCH_PASSWORD,
+            role=UserRole.BUYER,
+        ),)
+
+    async def new_user_id():
+        user = await seeder.create_user(UserRole.SELLER)
+        return (str(user.id),)
+
+    await runner.run("UserService.create_user", size, UserService.create_user, new_user_data)
+    await runner.run("UserService.get_user_by_email", size,
+                     lambda: UserService.get_user_by_email(seller.email))
+    await runner.run("UserService.get_user_by_username", size,
+                     lambda: UserService.get_user_by_username(seller.username))
+    await runner.run("UserService.get_user_by_id", size,
+                     lambda: UserService.get_user_by_id(str(seller.id)))
+    await runner.run("UserService.update_user", size,
+                     lambda user_id: UserService.update_user(user_id, UserUpdate(company_name="Updated")),
+                     new_user_id)
+    await runner.run("UserService.deactivate_user", size, UserService.deactivate_user, new_user_id)
+    await runner.run("UserService.get_users_by_role", size,
+                     lambda: UserService.get_users_by_role(UserRole.BUYER))
+    await runner.run("UserService.get_all_users", size, UserService.get_all_users)
+    await runner.run("UserService.verify_user_password", size,
+                     lambda: UserService.verify_user_password(seller, BENCH_PASSWORD))
+
+
+async def bench_auth_service(runner: BenchmarkRunner, seeder: Seeder, size: int):
+    seller = seeder.seller
+    login_data = LoginRequest(email=seller.email, password=BENCH_PASSWORD)
+
+    async def new_refresh_token():
+        token_str = create_refresh_token(data={"sub": str(seller.id), "n": seeder.next_id()})
+        await RefreshToken(
+            token=token_str,
+            user_id=str(seller.id),
+            expires_at=datetime.utcnow() + timedelta(days=7),
+        ).insert()
+        return (token_str,)
+
+    access_token = (await AuthService.login(login_data)).access_token
+
+    await runner.run("AuthService.authenticate_user", size,
+                     lambda: AuthService.authenticate_user(login_data))
+    await runner.run("AuthService.login", size, lambda: AuthService.login(login_data))
+    await runner.run("AuthService.refresh_token", size, AuthService.refresh_token, new_refresh_token)
+    await runner.run("AuthService.get_current_user", size,
+                     lambda: AuthService.get_current_user(access_token))
+    await runner.run("AuthService.logout", size, AuthService.logout, new_refresh_token)
+
+
+async def bench_proposal_service(runner: BenchmarkRunner, seeder: Seeder, size: int):
+    seller_id = str(seeder.seller.id)
+    writer_id = str(seeder.writer_seller.id)
+    admin_id = str(seeder.admin.id)
+
+    def proposal_in(status: ProposalStatus):
+        async def setup():
+            proposal = await seeder.insert_proposal(writer_id, status)
+            return (str(proposal.id),)
+        return setup
+
+    create_data = ProposalCreate(
+        title="Bench Proposal",
+        brief_content=BRIEF_CONTENT,
+        detailed_content=DETAILED_CONTENT,
+    )
+
+    await runner.run("ProposalService.create_proposal", size,
+                     lambda: ProposalService.create_proposal(create_data, writer_id))
+    await runner.run("ProposalService.get_proposal_by_id", size,
+                     lambda: ProposalService.get_proposal_by_id(str(seeder.proposal.id)))
+    await runner.run("ProposalService.update_proposal", size,
+                     lambda proposal_id: ProposalService.update_proposal(
+                         proposal_id, ProposalUpdate(title="Updated title")),
+                     proposal_in(ProposalStatus.DRAFT))
+    await runner.run("ProposalService.submit_for_review", size,
+                     ProposalService.submit_for_review, proposal_in(ProposalStatus.DRAFT))
+    await runner.run("ProposalService.review_proposal", size,
+                     lambda proposal_id: ProposalService.review_proposal(
+                         proposal_id, ProposalReview(approved=True), admin_id),
+                     proposal_in(ProposalStatus.UNDER_REVIEW))
+    await runner.run("ProposalService.resubmit_proposal", size,
+                     ProposalService.resubmit_proposal, proposal_in(ProposalStatus.REJECTED))
+    await runner.run("ProposalService.archive_proposal", size,
+                     ProposalService.archive_proposal, proposal_in(ProposalStatus.APPROVED))
+    await runner.run("ProposalService.get_seller_proposals", size,
+                     lambda: ProposalService.get_seller_proposals(seller_id))
+    await runner.run("ProposalService.get_proposals_by_status", size,
+                     lambda: ProposalService.get_proposals_by_status(ProposalStatus.UNDER_REVIEW))
+    await runner.run("ProposalService.get_all_proposals", size, ProposalService.get_all_proposals)
+
+
+async def bench_case_service(runner: BenchmarkRunner, seeder: Seeder, size: int):
+    seller_id = str(seeder.seller.id)
+    buyer_id = str(seeder.buyer.id)
+    writer_seller_id = str(seeder.writer_seller.id)
+    writer_buyer_id = str(seeder.writer_buyer.id)
+    case_id = str(seeder.case.id)
+
+    async def new_case_data():
+        proposal = await seeder.insert_proposal(writer_seller_id, ProposalStatus.APPROVED)
+        return (CaseCreate(proposal_id=str(proposal.id), buyer_id=writer_buyer_id),)
+
+    def case_in(status: CaseStatus):
+        async def setup():
+            case = await seeder.insert_case(writer_buyer_id, status)
+            return (str(case.id),)
+        return setup
+
+    await runner.run("CaseService.create_case", size,
+                     lambda data: CaseService.create_case(data, writer_seller_id), new_case_data)
+    await runner.run("CaseService.get_case_by_id", size,
+                     lambda: CaseService.get_case_by_id(case_id))
+    await runner.run("CaseService.get_seller_cases", size,
+                     lambda: CaseService.get_seller_cases(seller_id))
+    await runner.run("CaseService.get_buyer_cases", size,
+                     lambda: CaseService.get_buyer_cases(buyer_id))
+    await runner.run("CaseService.express_interest", size,
+                     lambda cid: CaseService.express_interest(cid, writer_buyer_id),
+                     case_in(CaseStatus.CREATED))
+    await runner.run("CaseService.reject_case", size,
+                     lambda cid: CaseService.reject_case(cid, writer_buyer_id),
+                     case_in(CaseStatus.CREATED))
+    await runner.run("CaseService.sign_nda", size,
+                     lambda cid: CaseService.sign_nda(cid, writer_buyer_id),
+                     case_in(CaseStatus.INTERESTED))
+    await runner.run("CaseService.get_contact_info", size,
+                     lambda: CaseService.get_contact_info(case_id, buyer_id))
+
+
+async def bench_comment_service(runner: BenchmarkRunner, seeder: Seeder, size: int):
+    buyer_id = str(seeder.buyer.id)
+    writer_buyer_id = str(seeder.writer_buyer.id)
+    case_id = str(seeder.case.id)
+    comment_data = CommentCreate(content="請問可以安排管理層會議嗎？")
+
+    async def writer_case():
+        case = await seeder.insert_case(writer_buyer_id)
+        return (str(case.id),)
+
+    await runner.run("CommentService.create_comment", size,
+                     lambda cid: CommentService.create_comment(cid, comment_data, writer_buyer_id),
+                     writer_case)
+    await runner.run("CommentService.get_case_comments", size,
+                     lambda: CommentService.get_case_comments(case_id, buyer_id))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare_results(current: dict, previous_path: str):
+    """和之前的結果檔比較 median 變化"""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+
+    baseline = {(r["name"], r["size"]): r for r in previous["results"]}
+    print(f"\n📊 與 {previous['meta']['commit']} 比較 (median):")
+    for result in current["results"]:
+        old = baseline.get((result["name"], result["size"]))
+        if not old:
+            continue
+        change = (result["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0.0
+        marker = "🔺" if change > 10 else ("🔻" if change < -10 else "  ")
+        print(
+            f"  {marker} {result['name']:<45} n={result['size']:<7} "
+            f"{old['median_ms']:>9.2f}ms → {result['median_ms']:>9.2f}ms ({change:+.1f}%)"
+        )
+
+
+async def main(args):
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+
+    # 使用獨立的資料庫，避免污染開發資料
+    settings.DATABASE_NAME = args.database
+    if args.mongodb_url:
+        settings.MONGODB_URL = args.mongodb_url
+
+    await connect_to_mongo()
+    await db.client.drop_database(args.database)
+    await init_db(sync_indexes=True)
+
+    server_info = await db.client.server_info()
+    runner = BenchmarkRunner(repeat=args.repeat, warmup=args.warmup)
+    seeder = Seeder()
+    await seeder.setup_fixed()
+
+    try:
+        for size in sizes:
+            await seeder.grow_to(size)
+            print(f"\n⏱️ 資料量 {size}")
+            await bench_user_service(runner, seeder, size)
+            await bench_auth_service(runner, seeder, size)
+            await bench_proposal_service(runner, seeder, size)
+            await bench_case_service(runner, seeder, size)
+            await bench_comment_service(runner, seeder, size)
+    finally:
+        await audit_log.stop()
+        if not args.keep:
+            await db.client.drop_database(args.database)
+        await close_mongo_connection()
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "mongodb": server_info.get("version"),
+            "sizes": sizes,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+        },
+        "results": runner.results,
+    }
+
+    output = args.output or os.path.join("bench_results", f"services-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 結果已寫入 {output}")
+
+    if args.compare:
+        compare_results(report, args.compare)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Service 層效能基準測試")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="列表資料量，以逗號分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="每個方法計時次數")
+    parser.add_argument("--warmup", type=int, default=1, help="每個方法暖身次數 (不計時)")
+    parser.add_argument("--database", default=f"{settings.DATABASE_NAME}_bench", help="基準測試用資料庫")
+    parser.add_argument("--mongodb-url", default=None, help="覆寫 MONGODB_URL (例如 mongodb://localhost:27017)")
+    parser.add_argument("--output", default=None, help="結果 JSON 路徑 (預設 bench_results/services-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="要比較的舊結果 JSON")
+    parser.add_argument("--keep", action="store_true", help="結束後保留基準測試資料庫")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
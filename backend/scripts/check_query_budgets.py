@@ -0,0 +1,114 @@
+# scripts/check_query_budgets.py
+"""
+每個 API 請求的 MongoDB 指令數預算檢查 (抓 N+1 查詢)
+
+CI 中由 tests/test_query_budgets.py 檢查 (預算與種子資料定義在該檔)；此腳本列出各資料量下的指令數，方便調整預算。
+以 ASGI 直接呼叫 API，在不同資料量 (預設 3 / 30 筆) 下量測每個端點執行的指令數：
+- 超過 BUDGETS 中的預算，或指令數隨資料量增加，都視為失敗 (結束碼 1，可放進 CI)
+- 失敗時列出實際執行的指令，方便找出多出來的查詢
+
+使用方式 (需要 MongoDB，未設定 MONGODB_URL 時使用 localhost；預設使用獨立的 *_query_budget 資料庫，結束後會刪除):
+    python scripts/check_query_budgets.py
+    python scripts/check_query_budgets.py --sizes 5,50 --verbose
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+import httpx
+
+# 添加 backend 目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.query_budget import install_query_counter, use_local_defaults
+
+# 沒有 .env 時使用本機 MongoDB (必須在導入 app.core.config 之前)
+use_local_defaults()
+
+from app.core.config import settings
+
+# 必須在建立 Motor client 之前註冊
+counter = install_query_counter()
+
+from app.core.database import db, connect_to_mongo, close_mongo_connection, init_db
+from app.domains.audit.services import audit_log
+from app.main import app
+from tests.test_query_budgets import BUDGETS, seed
+
+
+async def measure(client: httpx.AsyncClient, fixture: dict, verbose: bool) -> dict:
+    """回傳 {名稱: QueryCount}"""
+    results = {}
+    for name, role, path, budget in BUDGETS:
+        url = path.format(proposal_id=fixture["proposal_id"], case_id=fixture["case_id"])
+        with counter.measure() as count:
+            response = await client.get(url, headers=fixture["headers"][role])
+        if response.status_code != 200:
+            raise RuntimeError(f"{name} 回應 {response.status_code}: {response.text}")
+        results[name] = count
+        if verbose:
+            print(f"    {name:<28} {count.total:>3}  {count.summary()}")
+    return results
+
+
+async def main(args) -> int:
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+
+    # 使用獨立的資料庫，避免污染開發資料；不啟動排程與快取失效輪詢，量測期間只有測試請求
+    settings.DATABASE_NAME = args.database
+    if args.mongodb_url:
+        settings.MONGODB_URL = args.mongodb_url
+    settings.LOG_REQUESTS = False
+
+    await connect_to_mongo()
+    await db.client.drop_database(args.database)
+    await init_db(sync_indexes=True)
+
+    measured = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://budget/api/v1") as client:
+            for size in sizes:
+                print(f"🌱 資料量 {size}")
+                fixture = await seed(client, size)
+                measured[size] = await measure(client, fixture, args.verbose)
+    finally:
+        await audit_log.stop()
+        if not args.keep:
+            await db.client.drop_database(args.database)
+        await close_mongo_connection()
+
+    failures = []
+    print(f"\n{'端點':<28} {'預算':>4}  " + "  ".join(f"n={size:<5}" for size in sizes))
+    for name, _, _, budget in BUDGETS:
+        counts = [measured[size][name] for size in sizes]
+        print(f"{name:<28} {budget:>4}  " + "  ".join(f"{count.total:<7}" for count in counts))
+        largest = counts[-1]
+        if largest.total > budget:
+            failures.append(f"{name}: {largest.total} 個指令超過預算 {budget} ({largest.summary()})")
+        elif counts[-1].total > counts[0].total:
+            failures.append(f"{name}: 指令數隨資料量增加 {counts[0].total} → {counts[-1].total} ({largest.summary()})")
+
+    if failures:
+        print("\n❌ 查詢預算檢查失敗:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\n✅ 所有端點都在查詢預算內")
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="API 請求的 MongoDB 指令數預算檢查")
+    parser.add_argument("--sizes", default="3,30", help="資料量，以逗號分隔 (至少兩個才能檢查是否隨資料量增加)")
+    parser.add_argument("--database", default=f"{settings.DATABASE_NAME}_query_budget", help="檢查用資料庫")
+    parser.add_argument("--mongodb-url", default=None, help="覆寫 MONGODB_URL (例如 mongodb://localhost:27017)")
+    parser.add_argument("--keep", action="store_true", help="結束後保留檢查用資料庫")
+    parser.add_argument("--verbose", action="store_true", help="列出每個端點執行的指令")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,73 @@
+# scripts/import_users.py
+"""
+批次匯入用戶 (CSV 含標題列，或 JSONL)
+
+欄位同註冊 API：email, username, password, role, company_name, contact_person, phone, description
+    python scripts/import_users.py buyers.csv
+    python scripts/import_users.py buyers.jsonl --report import-report.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# 添加 backend 目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import connect_to_mongo, close_mongo_connection, init_db
+from app.core.security import shutdown_hash_pool
+from app.domains.user.importer import IMPORT_FORMATS, UserImportService, parse_import
+
+# 每批處理的列數 (限制記憶體，並讓進度可見)
+CHUNK_ROWS = 5000
+
+
+async def import_users(path: str, import_format: str, report_path: str):
+    with open(path, "rb") as f:
+        rows = parse_import(f.read(), import_format)
+    print(f"📄 {path}: {len(rows)} 列")
+
+    await connect_to_mongo()
+    await init_db()
+
+    totals = {"created": 0, "skipped": 0, "failed": 0}
+    started = time.perf_counter()
+    report = open(report_path, "w", encoding="utf-8") if report_path else None
+    try:
+        for start in range(0, len(rows), CHUNK_ROWS):
+            result = await UserImportService.import_users(rows[start:start + CHUNK_ROWS])
+            totals["created"] += result.created
+            totals["skipped"] += result.skipped
+            totals["failed"] += result.failed
+            for row in result.results:
+                if report:
+                    report.write(json.dumps(row.dict(), ensure_ascii=False) + "\n")
+                elif row.status != "created":
+                    print(f"  第 {row.row} 列 [{row.status}] {row.email or ''} {row.detail or ''}")
+            done = min(start + CHUNK_ROWS, len(rows))
+            print(f"⏳ {done}/{len(rows)} ({time.perf_counter() - started:.1f}s)")
+    finally:
+        if report:
+            report.close()
+        shutdown_hash_pool()
+        await close_mongo_connection()
+
+    print(f"✅ 新增 {totals['created']}，略過 {totals['skipped']}，失敗 {totals['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批次匯入用戶")
+    parser.add_argument("path", help="CSV 或 JSONL 檔案")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="預設依副檔名判斷")
+    parser.add_argument("--report", help="把每列結果寫入 JSONL 檔 (預設只印出未新增的列)")
+    args = parser.parse_args()
+
+    import_format = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+    asyncio.run(import_users(args.path, import_format, args.report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# scripts/migrate_case_snapshots.py
+"""
+把舊 case 內直接存放的提案內容搬到共用的 ProposalSnapshot
+
+每個 case 依自己存放的內容 (也就是當時發送給買方的內容) 建立或共用快照，
+寫入 snapshot_hash 後移除 case 內的 brief_content / detailed_content。
+可重複執行，已遷移的 case 會被略過。
+    python scripts/migrate_case_snapshots.py
+    python scripts/migrate_case_snapshots.py --batch-size 200 --dry-run
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# 添加 backend 目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+from app.core.database import connect_to_mongo, close_mongo_connection, init_db
+from app.domains.case.models import Case
+from app.domains.proposal.services import ProposalService
+
+
+async def migrate(batch_size: int, dry_run: bool):
+    """分批遷移尚未使用快照的 case"""
+    await connect_to_mongo()
+    await init_db()
+
+    collection = Case.get_motor_collection()
+    query = {"snapshot_hash": None, "detailed_content": {"$ne": None}}
+    total = await collection.count_documents(query)
+    print(f"📦 需要遷移的 case: {total}")
+    if dry_run or total == 0:
+        await close_mongo_connection()
+        return
+
+    migrated = 0
+    snapshot_hashes = set()
+    try:
+        while True:
+            docs = await collection.find(
+                query,
+                projection=["proposal_id", "title", "brief_content", "detailed_content"]
+            ).limit(batch_size).to_list(length=batch_size)
+            if not docs:
+                break
+
+            operations = []
+            for doc in docs:
+                snapshot = await ProposalService.get_or_create_snapshot(
+                    doc["proposal_id"], doc["title"], doc["brief_content"], doc["detailed_content"]
+                )
+                snapshot_hashes.add(snapshot.content_hash)
+                operations.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {
+                        "$set": {"snapshot_hash": snapshot.content_hash},
+                        "$unset": {"brief_content": "", "detailed_content": ""}
+                    }
+                ))
+
+            await collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+            print(f"  ✅ 已遷移 {migrated}/{total}")
+    finally:
+        await close_mongo_connection()
+
+    print(f"🎉 遷移完成：{migrated} 個 case 共用 {len(snapshot_hashes)} 份快照")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="遷移 case 內容到共用快照")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批處理的 case 數")
+    parser.add_argument("--dry-run", action="store_true", help="只統計需要遷移的數量")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size, args.dry_run))
@@ -0,0 +1,48 @@
+# scripts/repair_status_counters.py
+"""
+重新計算每位用戶依狀態的提案/case 數量，修正計數漂移
+
+計數平時由狀態轉換以 $inc 維護；更新失敗或手動修改資料後可能不準，定期執行本腳本即可：
+    python scripts/repair_status_counters.py --dry-run
+    python scripts/repair_status_counters.py
+    python scripts/repair_status_counters.py --user-id <id> --user-id <id>
+
+重新計算期間有新狀態轉換的用戶會略過，不會蓋掉並行的更新。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加 backend 目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import connect_to_mongo, close_mongo_connection, init_db
+from app.domains.counters.services import StatusCounterService
+
+
+async def repair_status_counters(user_ids, dry_run: bool):
+    await connect_to_mongo()
+    await init_db()
+    try:
+        started = time.perf_counter()
+        report = await StatusCounterService.repair(user_ids or None, dry_run=dry_run)
+        action = "需修正" if dry_run else "已修正"
+        print(f"🔢 檢查 {report.checked} 位用戶，{action} {report.repaired} 位，略過 {report.skipped} 位"
+              f" ({time.perf_counter() - started:.1f}s)")
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="修正狀態計數")
+    parser.add_argument("--user-id", action="append", default=[], help="只檢查指定用戶 (可重複)")
+    parser.add_argument("--dry-run", action="store_true", help="只計算需要修正的用戶數，不寫入")
+    args = parser.parse_args()
+    asyncio.run(repair_status_counters(args.user_id, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
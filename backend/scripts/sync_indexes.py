@@ -0,0 +1,37 @@
+# scripts/sync_indexes.py
+"""
+同步所有模型的 MongoDB 索引
+
+應用程式啟動時預設會同步索引；設定 SYNC_INDEXES_ON_STARTUP=False 加快 worker 啟動時，
+部署新版本或模型索引有變動時執行一次 (缺少唯一索引時應用程式會拒絕啟動)：
+    python scripts/sync_indexes.py
+"""
+
+import asyncio
+import sys
+import os
+
+# 添加 backend 目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import connect_to_mongo, close_mongo_connection, init_db
+from app.core.startup import StartupTimer
+
+
+async def sync_indexes():
+    """建立所有模型定義的索引"""
+    timer = StartupTimer()
+    with timer.phase("connect_mongo"):
+        await connect_to_mongo()
+
+    try:
+        with timer.phase("sync_indexes"):
+            await init_db(sync_indexes=True)
+        print("✅ 索引同步完成")
+    finally:
+        await close_mongo_connection()
+        print(f"⏱️ 耗時:\n{timer.report()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(sync_indexes())
@@ -0,0 +1,80 @@
+# tests/conftest.py - 共用 fixture
+"""
+需要可連線的 MongoDB：未設定 MONGODB_URL (環境變數或 .env) 時使用 localhost:27017，
+連不上時跳過需要資料庫的測試。資料寫在獨立的 *_test 資料庫，結束後刪除。
+
+    cd backend && python -m pytest -q
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.query_budget import install_query_counter, use_local_defaults
+
+# 必須在導入 app.core.config 之前補上必填設定
+use_local_defaults()
+
+from app.core.config import settings
+
+# 必須在建立 Motor client 之前註冊
+query_counter = install_query_counter()
+
+import httpx
+import pytest_asyncio
+
+from app.core.database import db, connect_to_mongo, close_mongo_connection, init_db
+from app.domains.audit.services import audit_log
+from app.main import app
+
+
+class CountingClient:
+    """API 測試用 client：每個請求量測執行的 MongoDB 指令數 (response.query_count)"""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self._client = client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        with query_counter.measure() as count:
+            response = await self._client.request(method, url, **kwargs)
+        response.query_count = count
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    # 整個測試共用同一個事件迴圈 (Motor client 綁定建立時的迴圈)
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def database():
+    """連線並初始化獨立的測試資料庫；不啟動排程與快取失效輪詢，量測期間只有測試請求"""
+    settings.DATABASE_NAME = f"{settings.DATABASE_NAME}_test"
+    settings.LOG_REQUESTS = False
+    try:
+        await connect_to_mongo()
+    except Exception as e:
+        pytest.skip(f"無法連線 MongoDB: {type(e).__name__}")
+    await db.client.drop_database(settings.DATABASE_NAME)
+    await init_db(sync_indexes=True)
+    yield db.database
+    await audit_log.stop()
+    await db.client.drop_database(settings.DATABASE_NAME)
+    await close_mongo_connection()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def api(database):
+    """以 ASGI 直接呼叫 API 的 client (base_url 為 /api/v1)"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+        yield CountingClient(client)
@@ -0,0 +1,101 @@
+# tests/test_query_budgets.py - 每個 API 請求的 MongoDB 指令數預算 (抓 N+1 查詢)
+
+import pytest
+import pytest_asyncio
+
+from app.domains.audit.services import audit_log
+
+PASSWORD = "password123"
+
+# 量測的資料量：超過預算或指令數隨資料量增加都算失敗
+SMALL, LARGE = 3, 30
+
+# (名稱, 角色, 路徑, 指令數預算)；路徑中的 {proposal_id} / {case_id} 由種子資料帶入
+# 預算等於目前的指令數：身分驗證讀取用戶 1 個；列表另外讀對方用戶批次 1 個 (預設不讀歸檔 collection)
+BUDGETS = [
+    ("GET /auth/me", "seller", "/auth/me", 1),
+    ("GET /users/me", "seller", "/users/me", 1),
+    ("GET /users/buyers", "seller", "/users/buyers", 2),
+    ("GET /counters/me", "seller", "/counters/me", 2),
+    ("GET /proposals/my", "seller", "/proposals/my", 2),
+    ("GET /proposals/", "admin", "/proposals/", 2),
+    ("GET /proposals/{id}", "seller", "/proposals/{proposal_id}", 2),
+    ("GET /cases/my-sent", "seller", "/cases/my-sent", 3),
+    ("GET /cases/my-received", "buyer", "/cases/my-received", 3),
+    ("GET /cases/unread", "seller", "/cases/unread", 2),
+    ("GET /cases/{id}", "buyer", "/cases/{case_id}", 3),          # 提案快照未快取時多讀 1 個
+    ("GET /cases/{id}/comments", "seller", "/cases/{case_id}/comments", 4),  # 留言與 case 之外另批次讀取留言者
+]
+
+
+async def seed(client, size: int) -> dict:
+    """建立一組新的賣方/買方/管理員：賣方 size 個已核准提案、對買方送出 size 個 case、第一個 case 有 size 則留言"""
+    headers = {}
+    for role in ("seller", "buyer", "admin"):
+        email = f"budget-{role}-{size}@budget.example.com"
+        await client.post("/auth/register", json={
+            "email": email, "username": f"budget_{role}_{size}", "password": PASSWORD, "role": role
+        })
+        response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        response.raise_for_status()
+        headers[role] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.get("/auth/me", headers=headers["buyer"])
+    buyer_id = response.json()["id"]
+
+    case_ids = []
+    for n in range(size):
+        response = await client.post("/proposals/", headers=headers["seller"], json={
+            "title": f"Budget Proposal {size}-{n}",
+            "brief_content": "預算檢查用提案",
+            "detailed_content": "預算檢查用提案詳細內容",
+        })
+        response.raise_for_status()
+        proposal_id = response.json()["id"]
+        await client.post(f"/proposals/{proposal_id}/submit", headers=headers["seller"])
+        await client.post(f"/proposals/{proposal_id}/review", headers=headers["admin"], json={"approved": True})
+        response = await client.post("/cases/", headers=headers["seller"], json={
+            "proposal_id": proposal_id, "buyer_id": buyer_id
+        })
+        response.raise_for_status()
+        case_ids.append(response.json()["id"])
+
+    for n in range(size):
+        await client.post(f"/cases/{case_ids[0]}/comments", headers=headers["buyer"], json={
+            "content": f"留言 {n}"
+        })
+
+    await audit_log.flush()
+    return {"headers": headers, "proposal_id": proposal_id, "case_id": case_ids[0]}
+
+
+async def measure(client, fixture: dict, role: str, path: str):
+    url = path.format(proposal_id=fixture["proposal_id"], case_id=fixture["case_id"])
+    response = await client.get(url, headers=fixture["headers"][role])
+    assert response.status_code == 200, response.text
+    return response.query_count
+
+
+@pytest_asyncio.fixture(scope="module")
+async def small(api):
+    return await seed(api, SMALL)
+
+
+@pytest_asyncio.fixture(scope="module")
+async def large(api):
+    return await seed(api, LARGE)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name, role, path, budget", BUDGETS, ids=[budget[0] for budget in BUDGETS])
+async def test_within_budget(api, small, large, name, role, path, budget):
+    count = await measure(api, large, role, path)
+    count.assert_at_most(budget, name)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name, role, path, budget", BUDGETS, ids=[budget[0] for budget in BUDGETS])
+async def test_does_not_grow_with_data(api, small, large, name, role, path, budget):
+    few = await measure(api, small, role, path)
+    many = await measure(api, large, role, path)
+    assert many.total <= few.total, f"{name}: 指令數隨資料量增加 {few.total} → {many.total} ({many.summary()})"
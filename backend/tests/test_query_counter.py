@@ -0,0 +1,59 @@
+# tests/test_query_counter.py - QueryCounter 的計數規則 (不需要 MongoDB)
+
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from beanie import init_beanie
+
+from app.core.query_budget import QueryBudgetExceeded, QueryCounter, ignored_collections
+from app.domains.audit.models import AuditEvent
+from app.domains.case.models import Case
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def started(command_name: str, collection=None):
+    return SimpleNamespace(command_name=command_name, command={command_name: collection or 1})
+
+
+@pytest_asyncio.fixture
+async def models():
+    # 只初始化 Beanie 以取得實際的 collection 名稱
+    await init_beanie(database=mongomock_motor.AsyncMongoMockClient()["query_counter"], document_models=[AuditEvent, Case])
+
+
+@pytest.mark.asyncio
+async def test_ignores_background_collections_by_real_name(models):
+    # Beanie 不理會 Settings.collection，稽核紀錄實際寫在類別名稱的 collection
+    assert AuditEvent.get_motor_collection().name in ignored_collections()
+
+    counter = QueryCounter()
+    with counter.measure() as count:
+        counter.started(started("insert", AuditEvent.get_motor_collection().name))
+        counter.started(started("insert", "slow_queries"))
+        counter.started(started("find", Case.get_motor_collection().name))
+    assert count.commands == [("find", Case.get_motor_collection().name)]
+
+
+@pytest.mark.asyncio
+async def test_ignores_handshake_and_commands_outside_measure(models):
+    counter = QueryCounter()
+    counter.started(started("find", "Case"))
+    with counter.measure() as count:
+        counter.started(started("ping"))
+        counter.started(started("endSessions"))
+        counter.started(started("aggregate", "Case"))
+    counter.started(started("find", "Case"))
+    assert count.commands == [("aggregate", "Case")]
+
+
+@pytest.mark.asyncio
+async def test_assert_at_most(models):
+    counter = QueryCounter()
+    with counter.measure() as count:
+        counter.started(started("find", "Case"))
+        counter.started(started("find", "User"))
+    count.assert_at_most(2)
+    with pytest.raises(QueryBudgetExceeded, match="find Case, find User"):
+        count.assert_at_most(1, "GET /cases/my-sent")
@@ -0,0 +1,56 @@
+# tests/test_scheduler.py - 排程租約 (不需要 MongoDB)
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import db
+from app.core.scheduler import LEASE_COLLECTION, JobScheduler
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def leases(monkeypatch):
+    database = mongomock_motor.AsyncMongoMockClient()["scheduler"]
+    monkeypatch.setattr(db, "database", database)
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", True)
+    monkeypatch.setattr(settings, "SCHEDULER_JITTER_RATIO", 0)
+    return database[LEASE_COLLECTION]
+
+
+def scheduler_with_job(runs: list) -> JobScheduler:
+    async def job():
+        runs.append(1)
+
+    scheduler = JobScheduler()
+    scheduler.register("job", job, interval=3600, timeout=60)
+    return scheduler
+
+
+async def run_briefly(scheduler: JobScheduler):
+    await scheduler.start()
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_restart_does_not_rerun_job_early(leases):
+    runs = []
+    first = scheduler_with_job(runs)
+    await run_briefly(first)
+    assert runs == [1]
+
+    # 關閉時交出租約，但保留上次執行時間
+    lease = await leases.find_one({"_id": "job"})
+    assert "owner" not in lease
+    assert lease["last_run_at"] is not None
+
+    # 租約時間只到毫秒，接手的 worker 至少晚一毫秒才看得到租約已過期
+    await asyncio.sleep(0.01)
+    second = scheduler_with_job(runs)
+    await run_briefly(second)
+    assert runs == [1]
+    assert second.jobs["job"].not_due == 1
+    assert second.jobs["job"].skipped == 0
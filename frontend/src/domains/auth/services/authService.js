@@ -1,6 +1,7 @@
 // src/domains/auth/services/authService.js
 
 import { tokenManager } from '../utils/tokenManager.js';
+import { apiCache } from '../../../shared/api/apiCache.js';
 
 // 配置你的後端 API 基礎 URL
 const API_BASE_URL = 'http://localhost:8000/api/v1';
@@ -46,8 +47,9 @@ export const authService = {
         throw new Error(data.detail || '登入失敗');
       }
 
-      // 儲存 tokens
+      // 儲存 tokens，並清掉前一個身分的快取
       tokenManager.setTokens(data.access_token, data.refresh_token);
+      apiCache.clear();
 
       // 獲取用戶資訊
       const userResult = await this.getCurrentUser();
@@ -149,13 +151,15 @@ export const authService = {
         // 不管後端回應如何，都清除本地資料
       }
 
-      // 清除本地認證資料
+      // 清除本地認證資料與 API 快取
       tokenManager.clear();
+      apiCache.clear();
       
       return { success: true };
     } catch (error) {
       // 即使出錯也要清除本地資料
       tokenManager.clear();
+      apiCache.clear();
       return { success: false, error: error.message };
     }
   },
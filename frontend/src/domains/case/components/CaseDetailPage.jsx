@@ -59,6 +59,10 @@ function CaseDetailPage() {
       
       if (result.success) {
         setComments(result.data);
+        // 留言已顯示，標記已讀到最新一則 (留言依時間由新到舊)
+        if (result.data.length > 0) {
+          caseService.markCommentsRead(caseId, result.data[0].created_at);
+        }
       }
     } catch (error) {
       console.error('❌ 載入留言錯誤:', error);
@@ -210,6 +214,7 @@ function CaseDetailPage() {
       created: '案例已創建，等待買方回應',
       interested: '買方已表達興趣，可以簽署 NDA 查看詳細內容',
       nda_signed: 'NDA 已簽署，雙方可以查看詳細內容並進行洽談',
+      expired: '買方逾期未回應，案例已失效',
       in_negotiation: '雙方正在洽談中',
       completed: '案例已成功完成',
       cancelled: '案例已取消'
@@ -12,6 +12,7 @@ const STATUS_FILTERS = {
   created: '已創建',
   interested: '已表達興趣', 
   nda_signed: '已簽署NDA',
+  expired: '已逾期',
   in_negotiation: '洽談中',
   completed: '已完成',
   cancelled: '已取消'
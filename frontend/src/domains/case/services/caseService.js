@@ -1,5 +1,6 @@
 // src/domains/case/services/caseService.js
 import { tokenManager } from '../../auth/utils/tokenManager';
+import { apiCache } from '../../../shared/api/apiCache';
 
 const API_BASE_URL = 'http://localhost:8000/api/v1';
 
@@ -43,6 +44,7 @@ export const caseService = {
       }
 
       console.log('✅ 建立 Case 成功');
+      apiCache.invalidate('/cases', '/counters');
       return { success: true, data: result };
     } catch (error) {
       console.error('❌ 建立 Case 錯誤:', error);
@@ -57,11 +59,8 @@ export const caseService = {
     try {
       console.log('🔄 獲取我發送的 Cases...');
       
-      const response = await fetch(`${API_BASE_URL}/cases/my-sent`, {
-        method: 'GET',
-        headers: {
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/cases/my-sent`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       console.log('📥 獲取發送 Cases 回應狀態:', response.status);
@@ -91,11 +90,8 @@ export const caseService = {
     try {
       console.log('🔄 獲取我收到的 Cases...');
       
-      const response = await fetch(`${API_BASE_URL}/cases/my-received`, {
-        method: 'GET',
-        headers: {
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/cases/my-received`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       console.log('📥 獲取收到 Cases 回應狀態:', response.status);
@@ -125,11 +121,8 @@ export const caseService = {
     try {
       console.log('🔄 獲取 Case 詳情:', caseId);
       
-      const response = await fetch(`${API_BASE_URL}/cases/${caseId}`, {
-        method: 'GET',
-        headers: {
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/cases/${caseId}`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       console.log('📥 獲取 Case 詳情回應狀態:', response.status);
@@ -184,6 +177,7 @@ export const caseService = {
 
       const result = await response.json();
       console.log('✅ 表達興趣成功');
+      apiCache.invalidate('/cases', '/counters');
       return { success: true, data: result };
     } catch (error) {
       console.error('❌ 表達興趣錯誤:', error);
@@ -216,6 +210,7 @@ export const caseService = {
 
       const result = await response.json();
       console.log('✅ 拒絕 Case 成功');
+      apiCache.invalidate('/cases', '/counters');
       return { success: true, data: result };
     } catch (error) {
       console.error('❌ 拒絕 Case 錯誤:', error);
@@ -248,6 +243,7 @@ export const caseService = {
 
       const result = await response.json();
       console.log('✅ 簽署 NDA 成功');
+      apiCache.invalidate('/cases', '/counters');
       return { success: true, data: result };
     } catch (error) {
       console.error('❌ 簽署 NDA 錯誤:', error);
@@ -263,11 +259,8 @@ export const caseService = {
     try {
       console.log('🔄 獲取聯絡資訊:', caseId);
       
-      const response = await fetch(`${API_BASE_URL}/cases/${caseId}/contact-info`, {
-        method: 'GET',
-        headers: {
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/cases/${caseId}/contact-info`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       console.log('📥 獲取聯絡資訊回應狀態:', response.status);
@@ -319,6 +312,7 @@ export const caseService = {
 
       const result = await response.json();
       console.log('✅ 建立留言成功');
+      apiCache.invalidate(`/cases/${caseId}/comments`, '/cases/unread');
       return { success: true, data: result };
     } catch (error) {
       console.error('❌ 建立留言錯誤:', error);
@@ -334,11 +328,11 @@ export const caseService = {
     try {
       console.log('🔄 獲取 Case 留言:', caseId);
       
-      const response = await fetch(`${API_BASE_URL}/cases/${caseId}/comments`, {
-        method: 'GET',
-        headers: {
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/cases/${caseId}/comments`, {
+        headers: tokenManager.getAuthHeader(),
+        // 留言要即時：每次都以 ETag 重新驗證 (沒有新留言時只回 304)
+        freshMs: 0,
+        maxStaleMs: 0,
       });
 
       console.log('📥 獲取留言回應狀態:', response.status);
@@ -355,5 +349,31 @@ export const caseService = {
       console.error('❌ 獲取留言錯誤:', error);
       return { success: false, error: error.message };
     }
+  },
+
+  /**
+   * 標記 Case 留言已讀 (讀取留言不會改變已讀狀態)
+   * @param {string} caseId 
+   * @param {string} upTo - 已顯示的最新一則留言時間
+   */
+  async markCommentsRead(caseId, upTo) {
+    try {
+      const query = upTo ? `?up_to=${encodeURIComponent(upTo)}` : '';
+      const response = await fetch(`${API_BASE_URL}/cases/${caseId}/read${query}`, {
+        method: 'POST',
+        headers: tokenManager.getAuthHeader(),
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.detail || '標記已讀失敗');
+      }
+
+      apiCache.invalidate('/cases/unread');
+      return { success: true };
+    } catch (error) {
+      console.error('❌ 標記已讀錯誤:', error);
+      return { success: false, error: error.message };
+    }
   }
 };
\ No newline at end of file
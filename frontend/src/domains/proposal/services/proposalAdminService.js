@@ -1,6 +1,7 @@
 // src/domains/proposal/services/proposalAdminService.js
 
 import { tokenManager } from '../../auth/utils/tokenManager.js';
+import { apiCache } from '../../../shared/api/apiCache.js';
 
 // 配置後端 API 基礎 URL
 const API_BASE_URL = 'http://localhost:8000/api/v1';
@@ -12,14 +13,14 @@ export const proposalAdminService = {
       let url = `${API_BASE_URL}/proposals/`;
       if (status) {
         url += `?status=${status}`;
+        // 已封存的舊提案可能已移到歸檔區，需明確要求才會一併查詢
+        if (status === 'archived') {
+          url += '&include_archived=true';
+        }
       }
 
-      const response = await fetch(url, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(url, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       const data = await response.json();
@@ -127,6 +128,7 @@ export const proposalAdminService = {
         throw new Error(data.detail || '審核提案失敗');
       }
 
+      apiCache.invalidate('/proposals');
       return { success: true, proposal: data };
     } catch (error) {
       console.error('❌ 審核通過錯誤:', error);
@@ -196,6 +198,7 @@ export const proposalAdminService = {
         throw new Error(data.detail || '拒絕提案失敗');
       }
 
+      apiCache.invalidate('/proposals');
       return { success: true, proposal: data };
     } catch (error) {
       console.error('❌ 審核拒絕錯誤:', error);
@@ -232,6 +235,7 @@ export const proposalAdminService = {
         throw new Error(data.detail || '歸檔提案失敗');
       }
 
+      apiCache.invalidate('/proposals');
       return { success: true, proposal: data };
     } catch (error) {
       return { success: false, error: error.message };
@@ -241,12 +245,8 @@ export const proposalAdminService = {
   // 根據ID獲取提案詳情（管理員視角）
   async getProposalById(proposalId) {
     try {
-      const response = await fetch(`${API_BASE_URL}/proposals/${proposalId}`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/proposals/${proposalId}`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       const data = await response.json();
@@ -1,6 +1,7 @@
 // src/domains/proposal/services/proposalService.js
 
 import { tokenManager } from '../../auth/utils/tokenManager.js';
+import { apiCache } from '../../../shared/api/apiCache.js';
 
 // 配置後端 API 基礎 URL
 const API_BASE_URL = 'http://localhost:8000/api/v1';
@@ -12,14 +13,14 @@ export const proposalService = {
       let url = `${API_BASE_URL}/proposals/my`;
       if (status) {
         url += `?status=${status}`;
+        // 已封存的舊提案可能已移到歸檔區，需明確要求才會一併查詢
+        if (status === 'archived') {
+          url += '&include_archived=true';
+        }
       }
 
-      const response = await fetch(url, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(url, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       const data = await response.json();
@@ -41,12 +42,8 @@ export const proposalService = {
   // 根據 ID 獲取單個提案
   async getProposalById(proposalId) {
     try {
-      const response = await fetch(`${API_BASE_URL}/proposals/${proposalId}`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/proposals/${proposalId}`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       const data = await response.json();
@@ -94,6 +91,7 @@ export const proposalService = {
         throw new Error(data.detail || '建立提案失敗');
       }
 
+      apiCache.invalidate('/proposals', '/counters');
       return { success: true, proposal: data };
     } catch (error) {
       return { success: false, error: error.message };
@@ -127,6 +125,7 @@ export const proposalService = {
         throw new Error(data.detail || '更新提案失敗');
       }
 
+      apiCache.invalidate('/proposals');
       return { success: true, proposal: data };
     } catch (error) {
       return { success: false, error: error.message };
@@ -159,6 +158,7 @@ export const proposalService = {
         throw new Error(data.detail || '提交提案失敗');
       }
 
+      apiCache.invalidate('/proposals', '/counters');
       return { success: true, proposal: data };
     } catch (error) {
       return { success: false, error: error.message };
@@ -191,6 +191,7 @@ export const proposalService = {
         throw new Error(data.detail || '重新提交失敗');
       }
 
+      apiCache.invalidate('/proposals', '/counters');
       return { success: true, proposal: data };
     } catch (error) {
       return { success: false, error: error.message };
@@ -225,6 +226,7 @@ export const proposalService = {
         throw new Error(data.detail || '刪除提案失敗');
       }
 
+      apiCache.invalidate('/proposals', '/counters');
       return { success: true };
     } catch (error) {
       return { success: false, error: error.message };
@@ -257,6 +259,7 @@ export const proposalService = {
         throw new Error(data.detail || '歸檔提案失敗');
       }
 
+      apiCache.invalidate('/proposals', '/counters');
       return { success: true, proposal: data };
     } catch (error) {
       return { success: false, error: error.message };
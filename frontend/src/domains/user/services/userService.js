@@ -1,5 +1,6 @@
 // src/domains/user/services/userService.js
 import { tokenManager } from '../../auth/utils/tokenManager';
+import { apiCache } from '../../../shared/api/apiCache';
 
 const API_BASE_URL = 'http://localhost:8000/api/v1';
 
@@ -11,11 +12,8 @@ export const userService = {
     try {
       console.log('🔄 獲取買方列表 API 呼叫開始');
       
-      const response = await fetch(`${API_BASE_URL}/users/buyers`, {
-        method: 'GET',
-        headers: {
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/users/buyers`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       console.log('📥 獲取買方列表回應狀態:', response.status);
@@ -55,11 +53,8 @@ export const userService = {
     try {
       console.log('🔄 獲取我的用戶資料...');
       
-      const response = await fetch(`${API_BASE_URL}/users/me`, {
-        method: 'GET',
-        headers: {
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/users/me`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       console.log('📥 獲取用戶資料回應狀態:', response.status);
@@ -113,6 +108,7 @@ export const userService = {
 
       const result = await response.json();
       console.log('✅ 更新用戶資料成功');
+      apiCache.invalidate('/users');
       return { success: true, data: result };
     } catch (error) {
       console.error('❌ 更新用戶資料錯誤:', error);
@@ -127,11 +123,8 @@ export const userService = {
     try {
       console.log('🔄 獲取用戶檔案:', userId);
       
-      const response = await fetch(`${API_BASE_URL}/users/profile/${userId}`, {
-        method: 'GET',
-        headers: {
-          ...tokenManager.getAuthHeader(),
-        },
+      const response = await apiCache.get(`${API_BASE_URL}/users/profile/${userId}`, {
+        headers: tokenManager.getAuthHeader(),
       });
 
       console.log('📥 獲取用戶檔案回應狀態:', response.status);
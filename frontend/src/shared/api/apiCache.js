@@ -0,0 +1,160 @@
+// src/shared/api/apiCache.js
+
+// 前端共用的 GET 快取層
+// - stale-while-revalidate：新鮮期內直接用快取；過期但仍在 stale 期內先回快取，背景重新驗證
+// - 相同的 GET 同時只發一個請求
+// - 以 ETag / If-None-Match 重新驗證，資料沒變時後端只回空的 304
+// - 寫入操作成功後由各 service 呼叫 invalidate() 清除相關快取
+//
+// 回傳的物件與 fetch 的 Response 用法相同 (ok / status / json())；
+// 快取的資料會被多個畫面共用，請不要直接修改。
+
+const FRESH_MS = 10 * 1000;          // 新鮮期：不發請求
+const MAX_STALE_MS = 5 * 60 * 1000;  // stale 期：先回快取，背景重新驗證
+const MAX_ENTRIES = 200;
+
+const API_PREFIX = '/api/v1';
+
+class CachedResponse {
+  constructor(status, data) {
+    this.status = status;
+    this.data = data;
+  }
+
+  get ok() {
+    return this.status >= 200 && this.status < 300;
+  }
+
+  async json() {
+    return this.data;
+  }
+}
+
+const entries = new Map();   // key → { path, response, etag, fetchedAt }
+const inFlight = new Map();  // key → { path, promise }
+let generation = 0;          // invalidate 時遞增，之前發出的請求結果不再寫入快取
+
+const stats = {
+  requests: 0,     // 實際送出的請求
+  hits: 0,         // 新鮮期內直接回快取
+  stale: 0,        // 回 stale 快取並在背景重新驗證
+  notModified: 0,  // 重新驗證得到 304
+  deduped: 0,      // 併入進行中的相同請求
+};
+
+function pathOf(url) {
+  const { pathname, search } = new URL(url, window.location.origin);
+  const path = pathname.startsWith(API_PREFIX) ? pathname.slice(API_PREFIX.length) : pathname;
+  return path + search;
+}
+
+function cacheKey(url, headers) {
+  // 不同登入身分的回應不能共用
+  return `${headers.Authorization || ''} ${url}`;
+}
+
+function store(key, entry) {
+  entries.delete(key);
+  entries.set(key, entry);
+  if (entries.size > MAX_ENTRIES) {
+    entries.delete(entries.keys().next().value);
+  }
+}
+
+function revalidate(key, url, headers) {
+  const pending = inFlight.get(key);
+  if (pending) {
+    stats.deduped += 1;
+    return pending.promise;
+  }
+
+  const startGeneration = generation;
+  const path = pathOf(url);
+  const promise = (async () => {
+    const cached = entries.get(key);
+    const requestHeaders = { ...headers };
+    if (cached?.etag) {
+      requestHeaders['If-None-Match'] = cached.etag;
+    }
+
+    stats.requests += 1;
+    const response = await fetch(url, { method: 'GET', headers: requestHeaders });
+
+    if (response.status === 304 && cached) {
+      stats.notModified += 1;
+      if (generation === startGeneration) {
+        store(key, { ...cached, fetchedAt: Date.now() });
+      }
+      return cached.response;
+    }
+
+    const data = await response.json().catch(() => ({}));
+    const result = new CachedResponse(response.status, data);
+    if (response.ok && generation === startGeneration) {
+      store(key, { path, response: result, etag: response.headers.get('ETag'), fetchedAt: Date.now() });
+    }
+    return result;
+  })().finally(() => {
+    if (inFlight.get(key)?.promise === promise) {
+      inFlight.delete(key);
+    }
+  });
+
+  inFlight.set(key, { path, promise });
+  return promise;
+}
+
+export const apiCache = {
+  stats,
+
+  /**
+   * 快取的 GET
+   * @param {string} url
+   * @param {Object} options - { headers, freshMs?, maxStaleMs? }
+   *   即時性要求高的資料 (例如留言) 可傳 freshMs: 0, maxStaleMs: 0，每次都以 ETag 重新驗證
+   */
+  async get(url, { headers = {}, freshMs = FRESH_MS, maxStaleMs = MAX_STALE_MS } = {}) {
+    const key = cacheKey(url, headers);
+    const entry = entries.get(key);
+    const age = entry ? Date.now() - entry.fetchedAt : Infinity;
+
+    if (age < freshMs) {
+      stats.hits += 1;
+      return entry.response;
+    }
+
+    if (age < maxStaleMs) {
+      stats.stale += 1;
+      revalidate(key, url, headers).catch(() => {});
+      return entry.response;
+    }
+
+    return revalidate(key, url, headers);
+  },
+
+  /**
+   * 清除路徑以 prefix 開頭的快取 (相對於 /api/v1，例如 '/proposals')
+   */
+  invalidate(...prefixes) {
+    generation += 1;
+    const matches = (path) => prefixes.some((prefix) => path.startsWith(prefix));
+    for (const [key, entry] of entries) {
+      if (matches(entry.path)) {
+        entries.delete(key);
+      }
+    }
+    // 寫入之前發出的請求可能拿到舊資料，之後的讀取不再併入
+    for (const [key, pending] of inFlight) {
+      if (matches(pending.path)) {
+        inFlight.delete(key);
+      }
+    }
+  },
+
+  // 登入/登出時清空
+  clear() {
+    generation += 1;
+    entries.clear();
+    inFlight.clear();
+  },
+};
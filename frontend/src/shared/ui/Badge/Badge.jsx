@@ -14,6 +14,7 @@ const STATUS_CONFIG = {
   created: { variant: 'info', label: '已建立' },
   interested: { variant: 'primary', label: '有興趣' },
   nda_signed: { variant: 'success', label: '已簽NDA' },
+  expired: { variant: 'neutral', label: '已逾期' },
   in_negotiation: { variant: 'warning', label: '洽談中' },
   completed: { variant: 'success', label: '已完成' },
   cancelled: { variant: 'neutral', label: '已取消' },